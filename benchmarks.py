@@ -0,0 +1,259 @@
+# GBPBot - benchmarks.py
+# Version: 1.1.1
+# Last Updated: 2026-10-17
+# Notes:
+# - Local micro-benchmarks for performance-sensitive paths (no Discord connection needed).
+# - Uses a throwaway SQLite file in a temp directory; never touches the real DB_FILE.
+# - Usage: python benchmarks.py db [--users 100000] [--ops 20000]
+#          python benchmarks.py render [--users 10000]
+# -----------------------
+# CHANGE LOG
+# -----------------------
+# [2026-10-17] v1.1.1 - render benchmark also times the delivery-side OutboxWorker._build per recipient
+#                      (Embed.from_dict + name token), which the shared template doesn't avoid; --users defaults
+#                      per benchmark (db 100000, render 10000); --ops only applies to db.
+# [2026-10-17] v1.1.0 - Added render benchmark: per-recipient daily reminder render cost
+#                      (per-user Embed vs shared bucket template).
+# [2026-10-17] v1.0.1 - db benchmark also reports concurrent throughput and event-loop lag during a full scan.
+# [2026-10-17] v1.0.0 - Initial db benchmark: connect-per-call vs pooled connections on a 100k-user DB.
+
+import argparse
+import asyncio
+import os
+import random
+import sqlite3
+import sys
+import tempfile
+import time
+
+
+def _report(label: str, ops: int, seconds: float) -> float:
+    rate = ops / seconds if seconds > 0 else float("inf")
+    print(f"  {label:<40} {ops:>8} ops in {seconds:7.3f}s  ->  {rate:>10.0f} ops/sec")
+    return rate
+
+
+def _seed_users(db_file: str, users: int) -> None:
+    conn = sqlite3.connect(db_file)
+    conn.executemany(
+        "INSERT OR REPLACE INTO users (user_id, region, zodiac, reminder_hour, reminder_days, subscribed, daily) "
+        "VALUES (?, ?, ?, ?, ?, ?, ?)",
+        (
+            (uid, random.choice(["Europe", "Africa", "North America"]), "Leo",
+             random.randrange(24), "Mon,Tue,Wed,Thu,Fri,Sat,Sun", 1, 1)
+            for uid in range(1, users + 1)
+        )
+    )
+    conn.commit()
+    conn.close()
+
+
+# -----------------------
+# Legacy (connect-per-call) reference implementations
+# -----------------------
+def _legacy_get(db_file: str, user_id: int):
+    conn = sqlite3.connect(db_file)
+    cursor = conn.cursor()
+    cursor.execute(
+        "SELECT region, zodiac, reminder_hour, reminder_days, subscribed, daily FROM users WHERE user_id = ?",
+        (user_id,)
+    )
+    row = cursor.fetchone()
+    conn.close()
+    return row
+
+
+def _legacy_toggle(db_file: str, user_id: int):
+    conn = sqlite3.connect(db_file)
+    cursor = conn.cursor()
+    cursor.execute(
+        "SELECT region, zodiac, reminder_hour, reminder_days, subscribed, daily FROM users WHERE user_id = ?",
+        (user_id,)
+    )
+    region, zodiac, hour, days, sub, daily = cursor.fetchone()
+    cursor.execute(
+        "INSERT OR REPLACE INTO users (user_id, region, zodiac, reminder_hour, reminder_days, subscribed, daily) "
+        "VALUES (?, ?, ?, ?, ?, ?, ?)",
+        (user_id, region, zodiac, hour, days, sub, int(not daily))
+    )
+    conn.commit()
+    conn.close()
+
+
+def _legacy_render(user_name: str, region_data: dict, today, quote: str, prompt: str) -> dict:
+    """Per-recipient render as send_daily_reminder did it: ephem moon + a fresh Embed for every user."""
+    import discord
+    import ephem
+    from reminders import format_date
+
+    phase = ephem.Moon(ephem.Date(today)).phase
+    if phase < 10:
+        moon_emoji = "🌑"
+    elif phase < 50:
+        moon_emoji = "🌒"
+    elif phase < 60:
+        moon_emoji = "🌕"
+    elif phase < 90:
+        moon_emoji = "🌘"
+    else:
+        moon_emoji = "🌑"
+    embed = discord.Embed(
+        title=f"{region_data['emoji']} Daily Reminder",
+        description=(
+            f"Good morning, {user_name}! 🌞\n"
+            f"Today is **{format_date(today)}** {moon_emoji}\n"
+            f"Region: **{region_data['name']}** | Timezone: **{region_data['tz']}**\n\n"
+            f"💫 Quote: {quote}\n"
+            f"📝 Journal Prompt: {prompt}"
+        ),
+        color=region_data.get("color", 0x2F3136)
+    )
+    return embed.to_dict()
+
+
+# -----------------------
+# Benchmarks
+# -----------------------
+async def _max_loop_lag(coro, interval: float = 0.001) -> float:
+    """Runs coro while a ticker measures the worst event-loop scheduling delay."""
+    worst = 0.0
+    done = False
+
+    async def ticker():
+        nonlocal worst
+        while not done:
+            start = time.perf_counter()
+            await asyncio.sleep(interval)
+            worst = max(worst, time.perf_counter() - start - interval)
+
+    task = asyncio.create_task(ticker())
+    await asyncio.sleep(0)
+    try:
+        await coro
+    finally:
+        done = True
+        await task
+    return worst
+
+
+async def bench_db(users: int = 100_000, ops: int = 20_000) -> None:
+    tmp = tempfile.mkdtemp(prefix="gbpbot-bench-")
+    os.environ["DB_FILE"] = os.path.join(tmp, "bench.db")
+
+    # Import after DB_FILE is set so the pool points at the temp DB
+    import db
+
+    await db.init_db()
+    _seed_users(db.DB_FILE, users)
+    ids = [random.randint(1, users) for _ in range(ops)]
+    write_ops = max(1, ops // 10)
+
+    print(f"DB benchmark: {users} users, {ops} reads, {write_ops} toggles ({db.DB_FILE})")
+
+    print("before (connect-per-call):")
+    start = time.perf_counter()
+    for uid in ids:
+        _legacy_get(db.DB_FILE, uid)
+    before_read = _report("get_user_preferences", ops, time.perf_counter() - start)
+
+    start = time.perf_counter()
+    for uid in ids[:write_ops]:
+        _legacy_toggle(db.DB_FILE, uid)
+    before_write = _report("toggle daily (read + write)", write_ops, time.perf_counter() - start)
+
+    print("after (pooled connections):")
+    start = time.perf_counter()
+    for uid in ids:
+        await db.get_user_preferences(uid)
+    after_read = _report("get_user_preferences", ops, time.perf_counter() - start)
+
+    start = time.perf_counter()
+    for uid in ids[:write_ops]:
+        prefs = await db.get_user_preferences(uid)
+        await db.set_daily(uid, not prefs["daily"])
+    after_write = _report("toggle daily (read + write)", write_ops, time.perf_counter() - start)
+
+    start = time.perf_counter()
+    for i in range(0, ops, 64):
+        await asyncio.gather(*(db.get_user_preferences(uid) for uid in ids[i:i + 64]))
+    _report("get_user_preferences (64 in flight)", ops, time.perf_counter() - start)
+
+    # Event loop responsiveness while a full subscriber scan runs on the DB executor
+    lag = await _max_loop_lag(db.get_all_subscribed_users())
+    print(f"  max event loop lag during full scan: {lag * 1000:.1f} ms (stats: {db.get_db_stats()})")
+
+    print(f"speedup: reads x{after_read / before_read:.1f}, toggles x{after_write / before_write:.1f}")
+    db.close_db()
+
+
+async def bench_render(users: int = 10_000) -> None:
+    import datetime
+    from constants import REGIONS
+    from db import DEFAULT_PROMPTS, DEFAULT_QUOTES
+    from lunar import lunar_calendar
+    from outbox import OutboxWorker
+    from reminders import render_daily_reminder
+
+    region = "Europe"
+    today = datetime.date.today()
+    picks = [(random.choice(DEFAULT_QUOTES), random.choice(DEFAULT_PROMPTS)) for _ in range(users)]
+    print(f"Render benchmark: daily reminders for {users} recipients in one bucket ({region}, {today})")
+    # The lunar year is built once per year, not per bucket; keep it out of the timing
+    lunar_calendar.year(today.year)
+
+    start = time.perf_counter()
+    for uid, (quote, prompt) in enumerate(picks):
+        _legacy_render(f"user{uid}", REGIONS[region], today, quote, prompt)
+    before = time.perf_counter() - start
+    _report("before (per-user Embed + moon)", users, before)
+
+    start = time.perf_counter()
+    items = [
+        render_daily_reminder(uid, region, today, quote, prompt)
+        for uid, (quote, prompt) in enumerate(picks)
+    ]
+    rendered = time.perf_counter() - start
+    _report("after: render (shared bucket template)", users, rendered)
+
+    # Delivery still builds an Embed and fills in the name for every recipient
+    start = time.perf_counter()
+    for uid, item in enumerate(items):
+        OutboxWorker._build(item["payload"], f"user{uid}")
+    built = time.perf_counter() - start
+    _report("after: delivery (_build per recipient)", users, built)
+
+    after = rendered + built
+    print(
+        f"per recipient: {before / users * 1e6:.1f} us -> {after / users * 1e6:.1f} us "
+        f"(x{before / after:.1f})"
+    )
+
+
+BENCHMARKS = {
+    "db": bench_db,
+    "render": bench_render,
+}
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description="GBPBot micro-benchmarks")
+    parser.add_argument("name", choices=sorted(BENCHMARKS))
+    parser.add_argument("--users", type=int, help="users/recipients (default: db 100000, render 10000)")
+    parser.add_argument("--ops", type=int, help="operations per phase (db only; default 20000)")
+    args = parser.parse_args(argv)
+
+    kwargs = {}
+    if args.users is not None:
+        kwargs["users"] = args.users
+    if args.ops is not None:
+        if args.name != "db":
+            parser.error("--ops only applies to the db benchmark")
+        kwargs["ops"] = args.ops
+
+    random.seed(1234)
+    asyncio.run(BENCHMARKS[args.name](**kwargs))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,6 +1,6 @@
 # GBPBot - bot.py
-# Version: 1.9.5.1
-# Last Updated: 2026-01-18
+# Version: 1.9.7.0
+# Last Updated: 2026-10-17
 # Notes:
 # - Loads .env via python-dotenv before importing local modules (required when host doesn't inject env vars).
 # - Exposes GUILD_ID on the bot instance for cogs that reference bot.GUILD_ID.
@@ -9,6 +9,9 @@
 # -----------------------
 # CHANGE LOG
 # -----------------------
+# [2026-10-17] v1.9.7.0 - Metrics: interaction listeners (metrics.instrument_bot) and the optional /metrics endpoint
+#                      (METRICS_PORT) started in setup_hook, stopped in close().
+# [2026-10-17] v1.9.6.0 - Close pooled DB connections on shutdown (MyBot.close -> db.close_db).
 # [2026-01-18] v1.9.5.1 - Flat-structure refactor: switch utils.logger -> logger, and cogs.* extensions -> flat module names.
 # [2026-01-18] v1.9.5.0 - Attach self.GUILD_ID to bot instance (fixes CommandsCog "GUILD_ID not found on bot instance").
 #                      - Add 403 Forbidden (Missing Access) fallback: if guild sync fails, fall back to global sync.
@@ -39,8 +42,9 @@ from discord.ext import commands
 import asyncio
 import traceback
 
-from db import init_db as db_init
+from db import init_db as db_init, close_db
 from logger import robust_log
+from metrics import instrument_bot, start_metrics_server, stop_metrics_server
 from version_tracker import GBPBot_version, get_file_version
 
 # -----------------------
@@ -113,6 +117,15 @@ class MyBot(commands.Bot):
                 f"[ERROR] Invalid GUILD_ID value: {GUILD_ID_RAW!r}. Must be a number. Will fall back to global sync."
             )
 
+        # Metrics (no-op endpoint unless METRICS_PORT is set)
+        instrument_bot(self)
+        try:
+            port = await start_metrics_server()
+            if port:
+                await robust_log(self, f"📈 Metrics endpoint listening on port {port}")
+        except Exception as e:
+            await robust_log(self, "[ERROR] Failed to start metrics endpoint", exc=e)
+
         # Initialize database
         try:
             await db_init(self)
@@ -176,6 +189,12 @@ class MyBot(commands.Bot):
                 cog.daily_loop.start()
                 await robust_log(self, "🌙 Daily reminder loop started.")
 
+    async def close(self):
+        await stop_metrics_server()
+        await super().close()
+        # Release pooled SQLite connections (flushes WAL on last close)
+        close_db()
+
     async def on_command_error(self, ctx, error):
         tb = traceback.format_exc()
         await robust_log(self, f"[UNHANDLED COMMAND ERROR] {error}\n{tb}")
@@ -1,14 +1,26 @@
 # GBPBot - commands.py
-# Version: 1.9.4.0
-# Last Updated: 2026-01-18
+# Version: 1.9.8.1
+# Last Updated: 2026-10-17
 # Notes:
 # - /profile is DM-only and shows user-facing preferences in an embed.
 # - /profile now includes interactive edit buttons (refresh, toggle daily, toggle subscription, onboarding guidance).
-# - Admin-only restrictions for /onboarding_status and /test (guild-only + administrator).
+# - Admin-only restrictions for /onboarding_status, /test and /profiler (guild-only + administrator).
 # - Command syncing is centralized in bot.py (setup_hook); no syncing in this cog to avoid duplicates.
 # -----------------------
 # CHANGE LOG
 # -----------------------
+# [2026-10-17] v1.9.8.1
+# - /profiler: dropped a placeholder-less f-string in the failure log.
+# [2026-10-17] v1.9.8.0
+# - Added /profiler (admin): cProfile the next N daily_loop buckets, sabbat_loop runs, outbox batches or slash
+#   commands; replies with an ephemeral hotspot embed and the .prof stats file. Nothing is hooked while idle.
+# [2026-10-17] v1.9.7.0
+# - /reminder attaches the shared persistent reminder_view(region) instead of a new ReminderButtons per call.
+# [2026-10-17] v1.9.6.0
+# - /onboarding_status resolves all members with one get_user_preferences_many() call (was one query per member).
+# [2026-10-17] v1.9.5.0
+# - /reminder picks its quote/prompt via db.random_quote()/random_prompt() (cached corpus).
+# - Fixed leftover pre-flat imports (utils.safe_send, utils.logger, utils.constants, cogs.reminders).
 # [2026-01-18] v1.9.4.0
 # - Added ProfileEditView buttons to /profile (DM-only): Refresh, Toggle Daily, Toggle Subscription, Re-run Onboarding guidance.
 # - /profile now renders via a shared embed builder for consistent refresh/update behavior.
@@ -28,29 +40,39 @@
 import discord
 from discord.ext import commands
 from discord import app_commands
-import random
 import datetime
 from zoneinfo import ZoneInfo
 
-from utils.safe_send import safe_send
-from utils.logger import robust_log
+from safe_send import safe_send
+from logger import robust_log
+from profiler import ProfileSession
 
 from db import (
-    get_user_preferences, set_subscription, set_daily,
+    get_user_preferences, get_user_preferences_many, set_subscription, set_daily,
     add_quote, add_journal_prompt,
-    get_all_quotes, get_all_journal_prompts,
+    random_quote, random_prompt,
     clear_user_preferences
 )
 
 # Source-of-truth constants live here
-from utils.constants import REGIONS
+from constants import REGIONS
 
-# ReminderButtons is defined in reminders.py
-from cogs.reminders import ReminderButtons
+# Persistent reminder buttons are defined in reminders.py
+from reminders import reminder_view
 
 # Version tracking (current API)
 from version_tracker import FILE_VERSIONS, get_file_version
 
+# /profiler targets: name -> description (resolved to an async callable in CommandsCog._profile_target)
+PROFILE_TARGETS = {
+    "daily_loop": "daily_loop bucket work (sleep excluded)",
+    "sabbat_loop": "sabbat_loop iterations",
+    "outbox": "outbox delivery batches",
+    "interactions": "slash command handling",
+}
+# Interaction tokens expire after 15 minutes; the follow-up must be sent before then
+PROFILE_MAX_WAIT = 840
+
 
 def _format_date(d: datetime.date) -> str:
     """Portable date formatting (avoids %-d issues)."""
@@ -207,8 +229,8 @@ class CommandsCog(commands.Cog):
             tz = region_data["tz"]
             today = datetime.datetime.now(ZoneInfo(tz)).date()
 
-            quotes = await get_all_quotes()
-            prompts = await get_all_journal_prompts()
+            quote = await random_quote()
+            prompt = await random_prompt()
 
             embed = discord.Embed(
                 title=f"{region_data['emoji']} Daily Reminder",
@@ -216,12 +238,12 @@ class CommandsCog(commands.Cog):
                     f"Good morning, {interaction.user.name}! 🌞\n"
                     f"Today is **{_format_date(today)}**\n"
                     f"Region: **{region_data['name']}** | Timezone: **{tz}**\n\n"
-                    f"💫 Quote: {random.choice(quotes) if quotes else 'No quotes available.'}\n"
-                    f"📝 Journal Prompt: {random.choice(prompts) if prompts else 'No prompts available.'}"
+                    f"💫 Quote: {quote}\n"
+                    f"📝 Journal Prompt: {prompt}"
                 ),
                 color=region_data["color"]
             )
-            await safe_send(interaction, embed=embed, view=ReminderButtons(region_data))
+            await safe_send(interaction, embed=embed, view=reminder_view(region_data["name"]))
         except Exception as e:
             await robust_log(self.bot, f"[ERROR] /reminder command failed", exc=e)
             await safe_send(interaction, "⚠️ Could not send your reminder. Try again later.")
@@ -280,6 +302,7 @@ class CommandsCog(commands.Cog):
             embed.add_field(name="/clear_onboarding", value="Clear your onboarding status to start again.", inline=False)
             embed.add_field(name="/version", value="Show the bot's current version.", inline=False)
             embed.add_field(name="/test", value="(Admin) Test if the bot is responsive.", inline=False)
+            embed.add_field(name="/profiler", value="(Admin) Profile the next loop runs or commands.", inline=False)
             embed.set_footer(text="Use `/onboard` in DMs to start your onboarding process.")
 
             await safe_send(interaction.user, embed=embed)
@@ -303,11 +326,10 @@ class CommandsCog(commands.Cog):
                 await safe_send(interaction, "⚠️ This command can only be used in a server.", ephemeral=True)
                 return
 
-            for member in interaction.guild.members:
-                if member.bot:
-                    continue
-                prefs = await get_user_preferences(member.id)
-                if prefs:
+            members = [m for m in interaction.guild.members if not m.bot]
+            prefs_by_id = await get_user_preferences_many(m.id for m in members)
+            for member in members:
+                if member.id in prefs_by_id:
                     onboarded.append(member.name)
                 else:
                     not_onboarded.append(member.name)
@@ -365,6 +387,91 @@ class CommandsCog(commands.Cog):
         except Exception as e:
             await robust_log(self.bot, f"[ERROR] /test command failed", exc=e)
 
+    # -----------------------
+    # /profiler Command (ADMIN ONLY)
+    # -----------------------
+    def _profile_target(self, target: str):
+        """(owner, attribute) whose next calls get profiled, or None if that part of the bot isn't loaded."""
+        if target == "interactions":
+            return self.bot.tree, "_call"
+        reminders = self.bot.get_cog("RemindersCog")
+        if reminders is None:
+            return None
+        if target == "daily_loop":
+            # The bucket work only; the loop body itself mostly sleeps until the next bucket
+            return reminders, "send_due_reminders"
+        if target == "sabbat_loop":
+            return reminders.sabbat_loop, "coro"
+        if target == "outbox":
+            return reminders.outbox, "drain_once"
+        return None
+
+    @app_commands.command(name="profiler", description="(Admin) Profile the next loop runs or slash commands")
+    @app_commands.describe(
+        target="What to profile",
+        count="How many runs/commands to profile (1-50)",
+        wait="Seconds to wait for them before reporting what was captured (max 840)"
+    )
+    @app_commands.choices(target=[
+        app_commands.Choice(name=description, value=name) for name, description in PROFILE_TARGETS.items()
+    ])
+    @app_commands.guild_only()
+    @app_commands.default_permissions(administrator=True)
+    async def profiler(
+        self,
+        interaction: discord.Interaction,
+        target: str,
+        count: app_commands.Range[int, 1, 50] = 1,
+        wait: app_commands.Range[int, 10, PROFILE_MAX_WAIT] = 300
+    ):
+        try:
+            # Profiles expose internals; don't rely on default_permissions alone
+            perms = getattr(interaction.user, "guild_permissions", None)
+            if perms is None or not perms.administrator:
+                await safe_send(interaction, "⚠️ Administrators only.", ephemeral=True)
+                return
+
+            resolved = self._profile_target(target)
+            if resolved is None:
+                await safe_send(interaction, f"⚠️ `{target}` isn't available (RemindersCog not loaded).", ephemeral=True)
+                return
+
+            session = ProfileSession(*resolved, count=count, label=target)
+            await interaction.response.defer(ephemeral=True, thinking=True)
+            try:
+                completed = await session.run(timeout=wait)
+            except RuntimeError as e:
+                await interaction.followup.send(f"⚠️ Could not start: {e}.", ephemeral=True)
+                return
+
+            if not session.finished:
+                await interaction.followup.send(
+                    f"⏱️ No `{target}` runs finished within {wait}s; nothing to report.", ephemeral=True
+                )
+                return
+
+            embed = discord.Embed(
+                title=f"🔬 Profile: {PROFILE_TARGETS[target]}",
+                description=f"```{session.hotspots()}```",
+                color=0x3498db
+            )
+            embed.add_field(
+                name="Profiled",
+                value=f"{session.finished} of {count} run(s), {session.wall:.2f}s wall"
+                + ("" if completed else f" (stopped after {wait}s)"),
+                inline=False
+            )
+            embed.set_footer(text="Top 15 by cumulative time. Includes other event-loop work during awaits.")
+            stamp = discord.utils.utcnow().strftime("%Y%m%d-%H%M%S")
+            await interaction.followup.send(
+                embed=embed,
+                file=discord.File(session.dump(), filename=f"{target}-{stamp}.prof"),
+                ephemeral=True
+            )
+        except Exception as e:
+            await robust_log(self.bot, "[ERROR] /profiler failed", exc=e)
+            await safe_send(interaction, "⚠️ Profiling failed. Check the logs.", ephemeral=True)
+
 
 # -----------------------
 # Cog Setup
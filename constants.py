@@ -1,13 +1,17 @@
 # GBPBot - constants.py
-# Version: 1.0.2
-# Last Updated: 2026-01-18
+# Version: 1.0.4
+# Last Updated: 2026-10-17
 # Notes:
 # - Centralized constants for regions, zodiac signs, emojis, and other shared references.
 # - Includes hemisphere support for sabbat reminders.
 # - Adds "name" field inside each region for consistent display usage across cogs.
+# - SABBAT_LONGITUDES drives the astronomical sabbat calendar (sabbat_calendar.py).
 # -----------------------
 # CHANGE LOG
 # -----------------------
+# [2026-10-17] v1.0.4 - Removed SABBATS_HEMISPHERES (unused; sabbat_calendar.py is the only source of sabbat dates).
+# [2026-10-17] v1.0.3 - Added SABBAT_LONGITUDES (solar ecliptic longitude per sabbat, northern hemisphere).
+#                      SABBATS_HEMISPHERES kept as the fixed-date approximation.
 # [2026-01-18] v1.0.2 - Added "name" field to each region entry (prevents KeyError in reminder buttons/embeds).
 # [2025-09-21] v1.0.1 - Fixed missing commas in REGIONS, added hemisphere field for all regions.
 # [2025-09-21] v1.0.0 - Initial creation of constants.py with regions, zodiac signs, emojis, and related references.
@@ -73,25 +77,15 @@ ZODIAC_SIGNS = {
 # -----------------------
 # Sabbats
 # -----------------------
-SABBATS_HEMISPHERES = {
-    "north": {
-        "Yule": (12, 21),
-        "Imbolc": (2, 1),
-        "Ostara": (3, 21),
-        "Beltane": (5, 1),
-        "Litha": (6, 21),
-        "Lammas": (8, 1),
-        "Mabon": (9, 21),
-        "Samhain": (10, 31),
-    },
-    "south": {
-        "Yule": (6, 21),
-        "Imbolc": (8, 1),
-        "Ostara": (9, 21),
-        "Beltane": (11, 1),
-        "Litha": (12, 21),
-        "Lammas": (2, 1),
-        "Mabon": (3, 21),
-        "Samhain": (4, 30),
-    }
+# Solar ecliptic longitude (degrees) at which each sabbat falls in the northern hemisphere:
+# equinoxes/solstices at the quarters, cross-quarters halfway between. The south is 180 degrees opposite.
+SABBAT_LONGITUDES = {
+    "Ostara": 0,
+    "Beltane": 45,
+    "Litha": 90,
+    "Lammas": 135,
+    "Mabon": 180,
+    "Samhain": 225,
+    "Yule": 270,
+    "Imbolc": 315,
 }
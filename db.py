@@ -1,15 +1,97 @@
 # GBPBot - db.py
-# Version: 1.0.5.0
-# Last Updated: 2026-01-18
+# Version: 1.2.7.0
+# Last Updated: 2026-10-17
 # Notes:
 # - Flat-structure imports: uses logger.py directly (no utils/).
 # - DB_FILE is env-driven (DB_FILE) with safe default, and auto-creates directories.
 # - robust_log usage fixed: pass exc=<Exception>.
-# - Keeps 'daily' column support with auto-ALTER TABLE if missing.
+# - Schema changes are versioned migrations keyed on PRAGMA user_version (see _MIGRATIONS).
 # - Added set_daily() helper (uses save_user_preferences; no aiosqlite dependency).
+# - All queries go through a long-lived connection pool (one writer + small reader pool, WAL mode).
+# - Blocking sqlite3 work runs on dedicated DB worker threads; coroutines await results (event loop never blocks).
+# - get_user_preferences is fronted by a bounded LRU cache invalidated by every write.
+# - Quotes/prompts are served from an in-memory corpus cache (random_quote()/random_prompt()).
+# - outbox table backs durable reminder delivery (enqueue/claim/finish helpers; see outbox.py).
+# - sent_reminders ledger makes reminder enqueueing idempotent per (user, kind, local date); an entry is released
+#   if its outbox row is dead-lettered for a transient reason.
+# - Every executor call is timed (gbpbot_db_call_seconds by public function name) and failures counted (metrics.py).
 # -----------------------
 # CHANGE LOG
 # -----------------------
+# [2026-10-17] v1.2.7.0
+# - Migration v9: outbox.ledger_user_id/ledger_kind/ledger_date (the sent_reminders key a row was queued under).
+# - finish_outbox results carry release_ledger: True deletes that ledger entry in the same transaction.
+# [2026-10-17] v1.2.6.4
+# - claim_outbox rows also carry due_at (next_attempt_at), so the outbox can report completion latency per batch.
+# [2026-10-17] v1.2.6.3
+# - get_due_users raises on DB errors instead of returning [] (a failed query looked like an empty bucket);
+#   enqueue_outbox(raise_errors=True) likewise re-raises after logging.
+# [2026-10-17] v1.2.6.2
+# - Preference cache hits/misses exported as a counter (gbpbot_prefs_cache_lookups_total), incremented on lookup.
+# [2026-10-17] v1.2.6.1
+# - DB metrics are labelled with the public call's name, passed explicitly to _DBExecutor.run / _run*
+#   (shared workers such as _execute_write_sync used to lump add_quote, set_state, the purges etc. together).
+# [2026-10-17] v1.2.6.0
+# - Metrics: per-function call latency (queue wait + run) and error/timeout counters in _DBExecutor.run;
+#   executor queue depth and preference cache hits/misses refreshed at scrape time.
+# [2026-10-17] v1.2.5.0
+# - Migration v8: users.dm_channel_id (each user's DM channel, so sends skip fetch_user/create_dm).
+# - Added get_dm_channel_ids(user_ids) (chunked IN query) and save_dm_channel_ids(pairs) (one transaction).
+# [2026-10-17] v1.2.4.0
+# - Migration v7: sabbat_announcements marker table (hemisphere, sabbat, delta, local_date).
+# - enqueue_outbox items may carry announcement=(hemisphere, sabbat, delta, local_date): queued only if
+#   that marker is new (marker and enqueue share the transaction, like the reminder ledger).
+# [2026-10-17] v1.2.3.0
+# - Added get_subscribed_ids_by_region(): every subscriber grouped by region in one covering-index query.
+# [2026-10-17] v1.2.2.0
+# - Migration v6: sent_reminders ledger (user_id, kind, local_date primary key, WITHOUT ROWID) + bot_state table.
+# - enqueue_outbox items may carry ledger=(user_id, kind, local_date); the ledger claim (INSERT OR IGNORE)
+#   and the outbox insert share one transaction, so duplicates are skipped.
+# - Added purge_sent_reminders, get_state/set_state.
+# [2026-10-17] v1.2.1.0
+# - Migration v5: outbox table + idx_outbox_due (status, next_attempt_at).
+# - Added enqueue_outbox (one transaction per batch), claim_outbox (atomic pending -> sending),
+#   finish_outbox, requeue_inflight_outbox, purge_outbox and get_outbox_counts.
+# [2026-10-17] v1.2.0.0
+# - init_db now runs a migration registry keyed on PRAGMA user_version; each pending step runs in its own
+#   transaction and a warm start is a single pragma read.
+# - Replaced the expected-to-fail ALTER TABLE try/except blocks with PRAGMA table_info checks.
+# - Existing (pre-versioning) databases are brought to the latest version without data changes.
+# [2026-10-17] v1.1.7.0
+# - Added get_user_preferences_many(user_ids) -> {user_id: prefs} using chunked IN queries in one executor call.
+# [2026-10-17] v1.1.6.0
+# - save_user_preferences is a single INSERT ... ON CONFLICT DO UPDATE with COALESCE partial updates
+#   (no SELECT + INSERT OR REPLACE round trip, no row delete/reinsert, no lost updates between clicks).
+# - Added save_user_preferences_many() for bulk admin updates in one transaction.
+# [2026-10-17] v1.1.5.0
+# - Added _CorpusCache + random_quote()/random_prompt() (constant-time pick from cached tuples).
+# - add_quote/add_journal_prompt invalidate the cached corpus once the insert commits.
+# - get_all_quotes/get_all_journal_prompts no longer prepend DEFAULT_QUOTES/DEFAULT_PROMPTS
+#   (init_db already seeds them into the tables, so every default appeared twice).
+# [2026-10-17] v1.1.4.0
+# - Added _PrefsCache: bounded LRU for get_user_preferences (PREFS_CACHE_SIZE env, 0 disables).
+# - Write-through invalidation from save_user_preferences (and set_daily/set_subscription) and clear_user_preferences,
+#   applied on the loop thread as soon as the write commits (_DBExecutor on_complete hook).
+# - Generation counter prevents a read racing a write from caching stale data.
+# - Added get_prefs_cache_stats() (hits, misses, size, capacity).
+# [2026-10-17] v1.1.3.0
+# - reminder_days stored as a 7-bit reminder_days_mask column (Mon=bit 0 ... Sun=bit 6).
+# - init_db adds the column and backfills it from the legacy text in one UPDATE.
+# - get_due_users(region, hour, weekday) takes date.weekday() and tests the day bit on idx_users_due_days.
+# - get_user_preferences still returns day-name lists (precomputed mask table, no string splitting).
+# - get_all_subscribed_users/get_due_users rows now carry reminder_days_mask in place of reminder_days.
+# [2026-10-17] v1.1.2.0
+# - Added get_due_users(region, hour, weekday) backed by idx_users_due (subscribed, daily, region, reminder_hour).
+# [2026-10-17] v1.1.1.0
+# - Added _DBExecutor: worker threads fed by a request queue; every public coroutine awaits its result.
+# - DB_WORKERS / DB_TIMEOUT env vars (worker count, per-call timeout in seconds).
+# - Added get_db_stats() (queue depth, max depth, completed calls, timeouts); close_db() stops the workers.
+# - Public function signatures unchanged.
+# [2026-10-17] v1.1.0.0
+# - Added _ConnectionPool: one long-lived writer connection plus a bounded reader pool.
+# - Connections use WAL journal mode and tuned synchronous/cache_size/mmap_size pragmas.
+# - SQL moved into module-level constants so sqlite3's per-connection statement cache reuses them.
+# - Added close_db() for clean shutdown. DB_READERS env var controls the reader pool size.
 # [2026-01-18] v1.0.5.0
 # - Added set_daily(user_id, daily) helper using save_user_preferences (consistent with set_subscription).
 # - Removed accidental aiosqlite/utils.logger usage in set_daily (flat-structure + zero extra deps).
@@ -20,17 +102,52 @@
 # [2025-09-20] v1.0.3b2 - Automatic ALTER TABLE to add 'daily' if missing; backward-compatible with set_user_preferences.
 # [2025-09-20] v1.0.3b3 - Minor fixes for async DB operations and exception logging.
 
+import asyncio
+import json
 import os
+import queue
+import random
+import time
 import sqlite3
-from typing import List, Optional, Tuple
+import threading
 import traceback
+from collections import OrderedDict
+from contextlib import contextmanager
+from typing import Any, Callable, Dict, Iterable, Iterator, List, Optional, Tuple
 
 from logger import robust_log
+from metrics import REGISTRY
 from version_tracker import GBPBot_version, FILE_VERSIONS, get_file_version
 
 
 DEFAULT_DAYS = "Mon,Tue,Wed,Thu,Fri,Sat,Sun"
 
+# reminder_days_mask: bit i set => reminders on DAY_NAMES[i] (Mon=bit 0 ... Sun=bit 6, matches date.weekday())
+DAY_NAMES = ("Mon", "Tue", "Wed", "Thu", "Fri", "Sat", "Sun")
+ALL_DAYS_MASK = 0b1111111
+
+# mask -> day-name list, precomputed for all 128 masks so reads never split strings
+_MASK_TO_DAYS = tuple(
+    tuple(name for i, name in enumerate(DAY_NAMES) if mask & (1 << i))
+    for mask in range(ALL_DAYS_MASK + 1)
+)
+
+
+def days_to_mask(days) -> int:
+    """["Mon", "Wed"] -> 0b0000101. Unknown names are ignored."""
+    mask = 0
+    for d in days:
+        if d in DAY_NAMES:
+            mask |= 1 << DAY_NAMES.index(d)
+    return mask
+
+
+def mask_to_days(mask: Optional[int]) -> List[str]:
+    """0b0000101 -> ["Mon", "Wed"]. NULL masks mean every day."""
+    if mask is None:
+        mask = ALL_DAYS_MASK
+    return list(_MASK_TO_DAYS[mask & ALL_DAYS_MASK])
+
 DEFAULT_QUOTES = [
     "🌿 May the Wheel of the Year turn in your favor.",
     "🌕 Reflect, release, and renew under the Moon's light.",
@@ -54,6 +171,16 @@ def _get_env(name: str):
     return v if v else None
 
 
+def _get_int_env(name: str, default: int) -> int:
+    raw = _get_env(name)
+    if not raw:
+        return default
+    try:
+        return int(raw)
+    except ValueError:
+        return default
+
+
 def _get_db_file() -> str:
     """
     DB file path:
@@ -71,76 +198,663 @@ if _db_dir:
     os.makedirs(_db_dir, exist_ok=True)
 
 
+# -----------------------
+# Connection Pool
+# -----------------------
+# Number of pooled reader connections (writes always use the single writer connection)
+DB_READERS = max(1, _get_int_env("DB_READERS", 4))
+
+# Worker threads executing DB calls off the event loop, and how long a caller waits (seconds)
+DB_WORKERS = max(1, _get_int_env("DB_WORKERS", 2))
+DB_TIMEOUT = max(1, _get_int_env("DB_TIMEOUT", 10))
+
+# Per-connection prepared statement cache (sqlite3 reuses statements keyed by SQL text)
+DB_STATEMENT_CACHE = 256
+
+# Applied to every pooled connection when it is opened
+_CONNECTION_PRAGMAS = (
+    "PRAGMA journal_mode=WAL",
+    "PRAGMA synchronous=NORMAL",      # safe with WAL; fsync only at checkpoints
+    "PRAGMA cache_size=-8000",        # ~8 MB page cache per connection
+    "PRAGMA mmap_size=67108864",      # 64 MB memory-mapped reads
+    "PRAGMA temp_store=MEMORY",
+    "PRAGMA busy_timeout=5000",
+)
+
+
+class _ConnectionPool:
+    """
+    Long-lived SQLite connections shared by every db.py function.
+
+    - One writer connection, serialized by a lock (SQLite allows a single writer anyway).
+    - Up to DB_READERS reader connections, opened lazily and reused.
+    - WAL mode lets readers proceed while a write is in progress.
+    """
+
+    def __init__(self, path: str, readers: int = DB_READERS):
+        self.path = path
+        self._writer: Optional[sqlite3.Connection] = None
+        self._writer_lock = threading.Lock()
+        self._readers: "queue.LifoQueue[sqlite3.Connection]" = queue.LifoQueue()
+        self._reader_slots = threading.BoundedSemaphore(readers)
+        self._all: List[sqlite3.Connection] = []
+        self._all_lock = threading.Lock()
+
+    def _open(self) -> sqlite3.Connection:
+        conn = sqlite3.connect(
+            self.path,
+            check_same_thread=False,
+            cached_statements=DB_STATEMENT_CACHE
+        )
+        for pragma in _CONNECTION_PRAGMAS:
+            conn.execute(pragma)
+        with self._all_lock:
+            self._all.append(conn)
+        return conn
+
+    @contextmanager
+    def write(self) -> Iterator[sqlite3.Connection]:
+        """Exclusive access to the writer connection; commits on success, rolls back on error."""
+        with self._writer_lock:
+            if self._writer is None:
+                self._writer = self._open()
+            conn = self._writer
+            try:
+                yield conn
+                conn.commit()
+            except BaseException:
+                conn.rollback()
+                raise
+
+    @contextmanager
+    def read(self) -> Iterator[sqlite3.Connection]:
+        """Borrow a reader connection from the pool (opens one if the pool is not yet full)."""
+        with self._reader_slots:
+            try:
+                conn = self._readers.get_nowait()
+            except queue.Empty:
+                conn = self._open()
+            try:
+                yield conn
+            finally:
+                self._readers.put(conn)
+
+    def close(self) -> None:
+        with self._writer_lock, self._all_lock:
+            for conn in self._all:
+                try:
+                    conn.close()
+                except Exception:
+                    pass
+            self._all.clear()
+            self._writer = None
+            self._readers = queue.LifoQueue()
+
+
+_pool = _ConnectionPool(DB_FILE)
+
+
+# -----------------------
+# DB Executor
+# -----------------------
+def _resolve(
+    fut: "asyncio.Future",
+    result: Any,
+    error: Optional[BaseException],
+    on_complete: Optional[Callable[[], None]] = None
+) -> None:
+    # Runs on the event loop thread (scheduled via call_soon_threadsafe)
+    if on_complete is not None:
+        # Runs even if the caller timed out: the work itself did finish
+        on_complete()
+    if fut.cancelled():
+        return
+    if error is not None:
+        fut.set_exception(error)
+    else:
+        fut.set_result(result)
+
+
+# fn label = the public db.py call (passed to _DBExecutor.run), not the shared worker function it runs
+_DB_SECONDS = REGISTRY.histogram(
+    "gbpbot_db_call_seconds", "DB executor calls by function (queue wait plus run time)", ["fn"]
+)
+_DB_ERRORS = REGISTRY.counter("gbpbot_db_call_errors_total", "DB executor calls that raised or timed out", ["fn", "error"])
+
+
+class _DBExecutor:
+    """
+    Dedicated worker threads fed by a request queue.
+
+    Every public db.py coroutine submits its blocking sqlite3 work here and awaits
+    the result, so the event loop (gateway heartbeats, interactions) never blocks on I/O.
+    """
+
+    def __init__(self, workers: int = DB_WORKERS):
+        self._workers = workers
+        self._queue: "queue.Queue" = queue.Queue()
+        self._threads: List[threading.Thread] = []
+        self._start_lock = threading.Lock()
+        self.completed = 0
+        self.timeouts = 0
+        self.max_queue_depth = 0
+
+    def _ensure_started(self) -> None:
+        if self._threads:
+            return
+        with self._start_lock:
+            if self._threads:
+                return
+            for n in range(self._workers):
+                t = threading.Thread(target=self._work, name=f"gbpbot-db-{n}", daemon=True)
+                t.start()
+                self._threads.append(t)
+
+    def _work(self) -> None:
+        while True:
+            item = self._queue.get()
+            if item is None:
+                return
+            loop, fut, fn, args, on_complete = item
+            if fut.cancelled():
+                # Caller already timed out; don't run stale work
+                continue
+            result, error = None, None
+            try:
+                result = fn(*args)
+            except BaseException as e:
+                error = e
+            self.completed += 1
+            try:
+                loop.call_soon_threadsafe(_resolve, fut, result, error, on_complete)
+            except RuntimeError:
+                # Event loop closed while the call was running
+                pass
+
+    async def run(
+        self,
+        name: str,
+        fn: Callable,
+        *args,
+        timeout: Optional[float] = None,
+        on_complete: Optional[Callable[[], None]] = None
+    ):
+        """
+        Queue fn(*args) for a worker thread and await its result.
+        name labels the call's metrics (the public function, e.g. "add_quote").
+        on_complete (if given) runs on the event loop thread once the work has finished.
+        """
+        self._ensure_started()
+        loop = asyncio.get_running_loop()
+        fut = loop.create_future()
+        self._queue.put((loop, fut, fn, args, on_complete))
+        depth = self._queue.qsize()
+        if depth > self.max_queue_depth:
+            self.max_queue_depth = depth
+        started = time.perf_counter()
+        try:
+            return await asyncio.wait_for(fut, DB_TIMEOUT if timeout is None else timeout)
+        except asyncio.TimeoutError:
+            self.timeouts += 1
+            _DB_ERRORS.labels(fn=name, error="timeout").inc()
+            raise
+        except Exception as e:
+            _DB_ERRORS.labels(fn=name, error=e.__class__.__name__).inc()
+            raise
+        finally:
+            _DB_SECONDS.labels(fn=name).observe(time.perf_counter() - started)
+
+    def queue_depth(self) -> int:
+        return self._queue.qsize()
+
+    def shutdown(self, wait: float = 5.0) -> None:
+        threads, self._threads = self._threads, []
+        for _ in threads:
+            self._queue.put(None)
+        deadline = time.monotonic() + wait
+        for t in threads:
+            t.join(max(0.0, deadline - time.monotonic()))
+
+
+_executor = _DBExecutor()
+
+
+async def _run(name: str, fn: Callable, *args):
+    """Runs a blocking DB function on the DB executor and awaits its result (name: the public caller)."""
+    return await _executor.run(name, fn, *args)
+
+
+async def _run_user_write(name: str, user_id: int, fn: Callable, *args):
+    """
+    Like _run for writes to a user's row: the user's cached preferences are dropped on the
+    event loop thread right after the write commits (before the caller resumes, and even if it timed out).
+    """
+    return await _executor.run(name, fn, *args, on_complete=lambda: _prefs_cache.invalidate(user_id))
+
+
+def get_db_stats() -> dict:
+    """Executor metrics: current/max request queue depth, completed calls, timeouts."""
+    return {
+        "queue_depth": _executor.queue_depth(),
+        "max_queue_depth": _executor.max_queue_depth,
+        "workers": DB_WORKERS,
+        "completed": _executor.completed,
+        "timeouts": _executor.timeouts,
+    }
+
+
+def close_db() -> None:
+    """Stops the DB executor and closes all pooled connections (call on shutdown)."""
+    _executor.shutdown()
+    _pool.close()
+
+
+# -----------------------
+# Preference Cache
+# -----------------------
+# Max cached users (0 disables the cache)
+PREFS_CACHE_SIZE = max(0, _get_int_env("PREFS_CACHE_SIZE", 5000))
+
+_NOT_CACHED = object()
+
+_PREFS_CACHE = REGISTRY.counter("gbpbot_prefs_cache_lookups_total", "Preference cache lookups by result", ["result"])
+_PREFS_CACHE_HIT = _PREFS_CACHE.labels(result="hit")
+_PREFS_CACHE_MISS = _PREFS_CACHE.labels(result="miss")
+
+
+class _PrefsCache:
+    """
+    Bounded LRU of user_id -> preferences dict (None = "no row", also cached).
+
+    Only touched from the event loop thread. Every write invalidates the user's entry and bumps
+    a generation counter; a read that started before a write never stores its (possibly stale)
+    result, so a cached value is never older than the last completed write.
+    """
+
+    def __init__(self, maxsize: int = PREFS_CACHE_SIZE):
+        self.maxsize = maxsize
+        self._data: "OrderedDict[int, Optional[dict]]" = OrderedDict()
+        self.generation = 0
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, user_id: int):
+        try:
+            value = self._data[user_id]
+        except KeyError:
+            self.misses += 1
+            _PREFS_CACHE_MISS.inc()
+            return _NOT_CACHED
+        self._data.move_to_end(user_id)
+        self.hits += 1
+        _PREFS_CACHE_HIT.inc()
+        return value
+
+    def put(self, user_id: int, value: Optional[dict], generation: int) -> None:
+        if self.maxsize <= 0 or generation != self.generation:
+            return
+        self._data[user_id] = value
+        self._data.move_to_end(user_id)
+        while len(self._data) > self.maxsize:
+            self._data.popitem(last=False)
+
+    def invalidate(self, user_id: Optional[int] = None) -> None:
+        self.generation += 1
+        if user_id is None:
+            self._data.clear()
+        else:
+            self._data.pop(user_id, None)
+
+    def invalidate_many(self, user_ids: Iterable[int]) -> None:
+        self.generation += 1
+        for user_id in user_ids:
+            self._data.pop(user_id, None)
+
+
+_prefs_cache = _PrefsCache()
+
+
+def _copy_prefs(prefs: Optional[dict]) -> Optional[dict]:
+    # Callers may mutate what they get back; never hand out the cached object itself
+    if prefs is None:
+        return None
+    return {**prefs, "days": list(prefs["days"])}
+
+
+def get_prefs_cache_stats() -> dict:
+    """Preference cache metrics: hits, misses, current size, capacity."""
+    return {
+        "hits": _prefs_cache.hits,
+        "misses": _prefs_cache.misses,
+        "size": len(_prefs_cache._data),
+        "maxsize": _prefs_cache.maxsize,
+    }
+
+
+_DB_QUEUE_DEPTH = REGISTRY.gauge("gbpbot_db_queue_depth", "DB executor requests waiting for a worker")
+
+
+async def _collect_metrics() -> None:
+    _DB_QUEUE_DEPTH.set(_executor.queue_depth())
+
+
+REGISTRY.add_collector(_collect_metrics)
+
+
+# -----------------------
+# Quote / Prompt Corpus Cache
+# -----------------------
+class _CorpusCache:
+    """
+    In-memory copy of the quotes and journal_prompts tables as tuples (O(1) random choice).
+
+    The tables are the single source of truth (init_db seeds DEFAULT_QUOTES/DEFAULT_PROMPTS into them);
+    the in-code defaults are only a fallback when a table is empty or unreadable.
+    Loaded lazily; add_quote/add_journal_prompt invalidate it once their insert commits.
+    """
+
+    def __init__(self):
+        self._items = {}
+        self._generation = {}
+
+    def get(self, table: str) -> Optional[Tuple[str, ...]]:
+        return self._items.get(table)
+
+    def generation(self, table: str) -> int:
+        return self._generation.get(table, 0)
+
+    def put(self, table: str, items: Tuple[str, ...], generation: int) -> None:
+        if generation == self.generation(table):
+            self._items[table] = items
+
+    def invalidate(self, table: str) -> None:
+        self._generation[table] = self.generation(table) + 1
+        self._items.pop(table, None)
+
+
+_corpus = _CorpusCache()
+
+
+# -----------------------
+# SQL
+# -----------------------
+_SQL_SELECT_PREFS = (
+    "SELECT region, zodiac, reminder_hour, reminder_days_mask, subscribed, daily FROM users WHERE user_id = ?"
+)
+# Atomic partial upsert: NULL parameters keep the stored value (or the column default for new rows).
+# reminder_days (legacy text) is still written so older builds reading the same DB stay consistent.
+_SQL_UPSERT_PREFS = f"""
+    INSERT INTO users
+    (user_id, region, zodiac, reminder_hour, reminder_days, reminder_days_mask, subscribed, daily)
+    VALUES (
+        :user_id, :region, :zodiac,
+        COALESCE(:hour, 9), COALESCE(:days, '{DEFAULT_DAYS}'), COALESCE(:days_mask, {ALL_DAYS_MASK}),
+        COALESCE(:subscribed, 1), COALESCE(:daily, 1)
+    )
+    ON CONFLICT(user_id) DO UPDATE SET
+        region = COALESCE(:region, region),
+        zodiac = COALESCE(:zodiac, zodiac),
+        reminder_hour = COALESCE(:hour, reminder_hour),
+        reminder_days = COALESCE(:days, reminder_days),
+        reminder_days_mask = COALESCE(:days_mask, reminder_days_mask),
+        subscribed = COALESCE(:subscribed, subscribed),
+        daily = COALESCE(:daily, daily)
+"""
+# Chunk size for IN (...) lookups (stays well under SQLite's bound-parameter limit)
+_IN_CHUNK = 500
+_SQL_SELECT_PREFS_IN = (
+    "SELECT user_id, region, zodiac, reminder_hour, reminder_days_mask, subscribed, daily "
+    "FROM users WHERE user_id IN ({placeholders})"
+)
+_SQL_SELECT_DM_CHANNELS_IN = (
+    "SELECT user_id, dm_channel_id FROM users WHERE dm_channel_id IS NOT NULL AND user_id IN ({placeholders})"
+)
+_SQL_UPDATE_DM_CHANNEL = "UPDATE users SET dm_channel_id = ? WHERE user_id = ?"
+_SQL_DELETE_USER = "DELETE FROM users WHERE user_id = ?"
+_SQL_INSERT_QUOTE = "INSERT INTO quotes (quote) VALUES (?)"
+_SQL_SELECT_QUOTES = "SELECT quote FROM quotes"
+_SQL_INSERT_PROMPT = "INSERT INTO journal_prompts (prompt) VALUES (?)"
+_SQL_SELECT_PROMPTS = "SELECT prompt FROM journal_prompts"
+_SQL_SELECT_SUBSCRIBED = (
+    "SELECT user_id, region, zodiac, reminder_hour, reminder_days_mask, daily FROM users WHERE subscribed = 1"
+)
+# Covered by idx_users_due_days (subscribed leads; user_id is the rowid)
+_SQL_SELECT_SUBSCRIBED_IDS = "SELECT region, user_id FROM users WHERE subscribed = 1"
+# Served by idx_users_due_days: equality on the leading columns, weekday bit tested on index entries
+_SQL_SELECT_DUE = """
+    SELECT user_id, region, zodiac, reminder_hour, reminder_days_mask, daily FROM users
+    WHERE subscribed = 1 AND daily = 1 AND region = ? AND reminder_hour = ?
+      AND (reminder_days_mask & ?) != 0
+"""
+# One-off backfill of reminder_days_mask from the legacy comma-separated text
+_SQL_BACKFILL_DAYS_MASK = "UPDATE users SET reminder_days_mask = " + " + ".join(
+    f"(instr(COALESCE(reminder_days, '{DEFAULT_DAYS}'), '{name}') > 0) * {1 << i}"
+    for i, name in enumerate(DAY_NAMES)
+)
+# Outbox (durable delivery queue); claim/count queries are served by idx_outbox_due
+_SQL_INSERT_OUTBOX = """
+    INSERT INTO outbox (
+        target_kind, target_id, kind, payload, status, attempts, next_attempt_at, created_at, updated_at,
+        ledger_user_id, ledger_kind, ledger_date
+    )
+    VALUES (?, ?, ?, ?, 'pending', 0, ?, ?, ?, ?, ?, ?)
+"""
+_SQL_SELECT_OUTBOX_DUE = """
+    SELECT id, target_kind, target_id, kind, payload, attempts, created_at, next_attempt_at FROM outbox
+    WHERE status = 'pending' AND next_attempt_at <= ?
+    ORDER BY next_attempt_at, id LIMIT ?
+"""
+_SQL_CLAIM_OUTBOX = (
+    "UPDATE outbox SET status = 'sending', attempts = attempts + 1, updated_at = ? WHERE id = ?"
+)
+_SQL_FINISH_OUTBOX = (
+    "UPDATE outbox SET status = ?, next_attempt_at = ?, last_error = ?, updated_at = ? WHERE id = ?"
+)
+_SQL_REQUEUE_OUTBOX = "UPDATE outbox SET status = 'pending', updated_at = ? WHERE status = 'sending'"
+_SQL_PURGE_OUTBOX = "DELETE FROM outbox WHERE status = 'sent' AND updated_at < ?"
+_SQL_COUNT_OUTBOX = "SELECT status, COUNT(*) FROM outbox GROUP BY status"
+# Sent-reminder ledger: the primary key makes a second claim for the same (user, kind, local date) a no-op
+_SQL_CLAIM_LEDGER = "INSERT OR IGNORE INTO sent_reminders (user_id, kind, local_date, sent_at) VALUES (?, ?, ?, ?)"
+_SQL_PURGE_LEDGER = "DELETE FROM sent_reminders WHERE local_date < ?"
+# Un-marks the reminder an outbox row was queued for (so it can be queued again)
+_SQL_RELEASE_LEDGER = """
+    DELETE FROM sent_reminders WHERE (user_id, kind, local_date) IN (
+        SELECT ledger_user_id, ledger_kind, ledger_date FROM outbox WHERE id = ? AND ledger_kind IS NOT NULL
+    )
+"""
+_SQL_CLAIM_ANNOUNCEMENT = (
+    "INSERT OR IGNORE INTO sabbat_announcements (hemisphere, sabbat, delta, local_date, announced_at) "
+    "VALUES (?, ?, ?, ?, ?)"
+)
+_SQL_SELECT_STATE = "SELECT value FROM bot_state WHERE key = ?"
+_SQL_UPSERT_STATE = (
+    "INSERT INTO bot_state (key, value) VALUES (?, ?) ON CONFLICT(key) DO UPDATE SET value = excluded.value"
+)
+
+
+# -----------------------
+# Schema Migrations
+# -----------------------
+# Registry of (version, description, step). PRAGMA user_version records the last applied version,
+# so a warm start is a single pragma read. Add new steps at the end with the next version number;
+# never edit a step that has shipped.
+_MIGRATIONS: List[Tuple[int, str, Callable[[sqlite3.Connection], None]]] = []
+
+
+def _migration(version: int, description: str):
+    def register(step: Callable[[sqlite3.Connection], None]):
+        _MIGRATIONS.append((version, description, step))
+        _MIGRATIONS.sort(key=lambda m: m[0])
+        return step
+    return register
+
+
+def _column_exists(conn: sqlite3.Connection, table: str, column: str) -> bool:
+    return any(row[1] == column for row in conn.execute(f"PRAGMA table_info({table})"))
+
+
+@_migration(1, "base tables (users, quotes, journal_prompts) + users.daily")
+def _migrate_base_tables(conn: sqlite3.Connection) -> None:
+    # IF NOT EXISTS / column checks: databases created before versioning already have some of this
+    conn.execute("""
+        CREATE TABLE IF NOT EXISTS users (
+            user_id INTEGER PRIMARY KEY,
+            region TEXT,
+            zodiac TEXT,
+            reminder_hour INTEGER DEFAULT 9,
+            reminder_days TEXT DEFAULT 'Mon,Tue,Wed,Thu,Fri,Sat,Sun',
+            subscribed INTEGER DEFAULT 1
+        )
+    """)
+    if not _column_exists(conn, "users", "daily"):
+        conn.execute("ALTER TABLE users ADD COLUMN daily INTEGER DEFAULT 1")
+
+    conn.execute("""
+        CREATE TABLE IF NOT EXISTS quotes (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            quote TEXT
+        )
+    """)
+    conn.execute("""
+        CREATE TABLE IF NOT EXISTS journal_prompts (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            prompt TEXT
+        )
+    """)
+
+
+@_migration(2, "seed default quotes and journal prompts")
+def _migrate_seed_corpus(conn: sqlite3.Connection) -> None:
+    if conn.execute("SELECT COUNT(*) FROM quotes").fetchone()[0] == 0:
+        conn.executemany(_SQL_INSERT_QUOTE, [(q,) for q in DEFAULT_QUOTES])
+    if conn.execute("SELECT COUNT(*) FROM journal_prompts").fetchone()[0] == 0:
+        conn.executemany(_SQL_INSERT_PROMPT, [(p,) for p in DEFAULT_PROMPTS])
+
+
+@_migration(3, "users.reminder_days_mask (backfilled from reminder_days)")
+def _migrate_days_mask(conn: sqlite3.Connection) -> None:
+    if not _column_exists(conn, "users", "reminder_days_mask"):
+        conn.execute(f"ALTER TABLE users ADD COLUMN reminder_days_mask INTEGER DEFAULT {ALL_DAYS_MASK}")
+        conn.execute(_SQL_BACKFILL_DAYS_MASK)
+
+
+@_migration(4, "idx_users_due_days for the per-bucket due-users query")
+def _migrate_due_index(conn: sqlite3.Connection) -> None:
+    # Mask included so the weekday bit test runs on index entries, not table rows
+    conn.execute("DROP INDEX IF EXISTS idx_users_due")
+    conn.execute(
+        "CREATE INDEX IF NOT EXISTS idx_users_due_days "
+        "ON users (subscribed, daily, region, reminder_hour, reminder_days_mask)"
+    )
+
+
+@_migration(5, "outbox table (durable reminder delivery queue)")
+def _migrate_outbox(conn: sqlite3.Connection) -> None:
+    # status: pending -> sending -> sent | pending (retry with backoff) | dead (gave up)
+    conn.execute("""
+        CREATE TABLE IF NOT EXISTS outbox (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            target_kind TEXT NOT NULL,
+            target_id INTEGER NOT NULL,
+            kind TEXT NOT NULL,
+            payload TEXT NOT NULL,
+            status TEXT NOT NULL DEFAULT 'pending',
+            attempts INTEGER NOT NULL DEFAULT 0,
+            next_attempt_at REAL NOT NULL,
+            last_error TEXT,
+            created_at REAL NOT NULL,
+            updated_at REAL NOT NULL
+        )
+    """)
+    conn.execute("CREATE INDEX IF NOT EXISTS idx_outbox_due ON outbox (status, next_attempt_at)")
+
+
+@_migration(6, "sent_reminders ledger + bot_state key/value table")
+def _migrate_ledger(conn: sqlite3.Connection) -> None:
+    # WITHOUT ROWID: the (user_id, kind, local_date) key is the whole row's identity and its only index
+    conn.execute("""
+        CREATE TABLE IF NOT EXISTS sent_reminders (
+            user_id INTEGER NOT NULL,
+            kind TEXT NOT NULL,
+            local_date TEXT NOT NULL,
+            sent_at REAL NOT NULL,
+            PRIMARY KEY (user_id, kind, local_date)
+        ) WITHOUT ROWID
+    """)
+    conn.execute("""
+        CREATE TABLE IF NOT EXISTS bot_state (
+            key TEXT PRIMARY KEY,
+            value TEXT
+        )
+    """)
+
+
+@_migration(7, "sabbat_announcements marker table (one channel post per announcement)")
+def _migrate_sabbat_announcements(conn: sqlite3.Connection) -> None:
+    conn.execute("""
+        CREATE TABLE IF NOT EXISTS sabbat_announcements (
+            hemisphere TEXT NOT NULL,
+            sabbat TEXT NOT NULL,
+            delta INTEGER NOT NULL,
+            local_date TEXT NOT NULL,
+            announced_at REAL NOT NULL,
+            PRIMARY KEY (hemisphere, sabbat, delta, local_date)
+        ) WITHOUT ROWID
+    """)
+
+
+@_migration(8, "users.dm_channel_id")
+def _migrate_dm_channel(conn: sqlite3.Connection) -> None:
+    if not _column_exists(conn, "users", "dm_channel_id"):
+        conn.execute("ALTER TABLE users ADD COLUMN dm_channel_id INTEGER")
+
+
+@_migration(9, "outbox ledger key columns (release a reminder's ledger entry when its row dies)")
+def _migrate_outbox_ledger(conn: sqlite3.Connection) -> None:
+    for column, decl in (("ledger_user_id", "INTEGER"), ("ledger_kind", "TEXT"), ("ledger_date", "TEXT")):
+        if not _column_exists(conn, "outbox", column):
+            conn.execute(f"ALTER TABLE outbox ADD COLUMN {column} {decl}")
+
+
+def _schema_version_sync() -> int:
+    with _pool.read() as conn:
+        return conn.execute("PRAGMA user_version").fetchone()[0]
+
+
+def _apply_migrations_sync() -> List[str]:
+    """Applies pending migrations, each in its own transaction. Returns descriptions of applied steps."""
+    applied = []
+    latest = _MIGRATIONS[-1][0] if _MIGRATIONS else 0
+    if _schema_version_sync() >= latest:
+        return applied
+
+    for version, description, step in _MIGRATIONS:
+        with _pool.write() as conn:
+            conn.execute("BEGIN IMMEDIATE")
+            # Re-check under the write lock (another process may have migrated meanwhile)
+            if conn.execute("PRAGMA user_version").fetchone()[0] >= version:
+                continue
+            step(conn)
+            conn.execute(f"PRAGMA user_version = {int(version)}")
+        applied.append(f"v{version}: {description}")
+    return applied
+
+
 # -----------------------
 # Initialization
 # -----------------------
 async def init_db(bot=None) -> None:
     """
     Async DB initialization.
-    Creates tables and pre-populates quotes and prompts.
-    Automatically adds 'daily' column if missing.
+    Applies any pending schema migrations (see _MIGRATIONS); a DB that is already
+    up to date costs a single PRAGMA user_version read.
     """
-    conn = None
     try:
-        conn = sqlite3.connect(DB_FILE)
-        cursor = conn.cursor()
-
-        # Users table
-        cursor.execute("""
-            CREATE TABLE IF NOT EXISTS users (
-                user_id INTEGER PRIMARY KEY,
-                region TEXT,
-                zodiac TEXT,
-                reminder_hour INTEGER DEFAULT 9,
-                reminder_days TEXT DEFAULT 'Mon,Tue,Wed,Thu,Fri,Sat,Sun',
-                subscribed INTEGER DEFAULT 1
-            )
-        """)
-
-        # Ensure daily column exists
-        try:
-            cursor.execute("ALTER TABLE users ADD COLUMN daily INTEGER DEFAULT 1")
-        except sqlite3.OperationalError:
-            # Column already exists
-            pass
-
-        # Quotes table
-        cursor.execute("""
-            CREATE TABLE IF NOT EXISTS quotes (
-                id INTEGER PRIMARY KEY AUTOINCREMENT,
-                quote TEXT
-            )
-        """)
-
-        # Journal Prompts table
-        cursor.execute("""
-            CREATE TABLE IF NOT EXISTS journal_prompts (
-                id INTEGER PRIMARY KEY AUTOINCREMENT,
-                prompt TEXT
-            )
-        """)
-
-        conn.commit()
-
-        # Pre-populate quotes
-        cursor.execute("SELECT COUNT(*) FROM quotes")
-        if cursor.fetchone()[0] == 0:
-            cursor.executemany(
-                "INSERT INTO quotes (quote) VALUES (?)",
-                [(q,) for q in DEFAULT_QUOTES]
-            )
-            conn.commit()
-
-        # Pre-populate prompts
-        cursor.execute("SELECT COUNT(*) FROM journal_prompts")
-        if cursor.fetchone()[0] == 0:
-            cursor.executemany(
-                "INSERT INTO journal_prompts (prompt) VALUES (?)",
-                [(p,) for p in DEFAULT_PROMPTS]
-            )
-            conn.commit()
+        applied = await _run("init_db", _apply_migrations_sync)
 
         if bot:
+            if applied:
+                await robust_log(bot, "🗃️ Applied DB migrations:\n" + "\n".join(applied))
             await robust_log(bot, "✅ Database initialized successfully.")
 
     except Exception as e:
@@ -149,14 +863,39 @@ async def init_db(bot=None) -> None:
         else:
             print(f"DB init error: {e}\n{traceback.format_exc()}")
 
-    finally:
-        if conn:
-            conn.close()
-
 
 # -----------------------
 # User Preferences
 # -----------------------
+def _prefs_params(
+    user_id: int,
+    region: Optional[str] = None,
+    zodiac: Optional[str] = None,
+    hour: Optional[int] = None,
+    days: Optional[List[str]] = None,
+    subscribed: Optional[bool] = None,
+    daily: Optional[bool] = None
+) -> dict:
+    """Named parameters for _SQL_UPSERT_PREFS; None means "leave unchanged"."""
+    mask = days_to_mask(days) if days is not None else None
+    return {
+        "user_id": user_id,
+        "region": region,
+        "zodiac": zodiac,
+        "hour": hour,
+        "days": ",".join(mask_to_days(mask)) if mask is not None else None,
+        "days_mask": mask,
+        "subscribed": int(subscribed) if subscribed is not None else None,
+        "daily": int(daily) if daily is not None else None,
+    }
+
+
+def _upsert_prefs_sync(params: List[dict]) -> None:
+    # One transaction for the whole batch
+    with _pool.write() as conn:
+        conn.executemany(_SQL_UPSERT_PREFS, params)
+
+
 async def save_user_preferences(
     user_id: int,
     region: Optional[str] = None,
@@ -169,79 +908,120 @@ async def save_user_preferences(
 ) -> None:
     """
     Upsert preserving existing values when parameters are None.
+    Single INSERT ... ON CONFLICT DO UPDATE statement (atomic; no read-modify-write race).
     """
-    conn = None
     try:
-        conn = sqlite3.connect(DB_FILE)
-        cursor = conn.cursor()
+        params = _prefs_params(user_id, region, zodiac, hour, days, subscribed, daily)
+        await _run_user_write("save_user_preferences", user_id, _upsert_prefs_sync, [params])
 
-        cursor.execute(
-            "SELECT region, zodiac, reminder_hour, reminder_days, subscribed, daily FROM users WHERE user_id = ?",
-            (user_id,)
-        )
-        row = cursor.fetchone()
-        if row:
-            cur_region, cur_zodiac, cur_hour, cur_days, cur_sub, cur_daily = row
+    except Exception as e:
+        if bot:
+            await robust_log(bot, f"❌ Failed to save user preferences for {user_id}: {e}", exc=e)
         else:
-            cur_region, cur_zodiac, cur_hour, cur_days, cur_sub, cur_daily = (None, None, 9, DEFAULT_DAYS, 1, 1)
+            print(f"Save user prefs error: {e}\n{traceback.format_exc()}")
 
-        new_region = region if region is not None else cur_region
-        new_zodiac = zodiac if zodiac is not None else cur_zodiac
-        new_hour = hour if hour is not None else cur_hour
-        new_days = ",".join(days) if days is not None else cur_days
-        new_subscribed = int(subscribed) if subscribed is not None else cur_sub
-        new_daily = int(daily) if daily is not None else cur_daily
 
-        cursor.execute("""
-            INSERT OR REPLACE INTO users
-            (user_id, region, zodiac, reminder_hour, reminder_days, subscribed, daily)
-            VALUES (?, ?, ?, ?, ?, ?, ?)
-        """, (user_id, new_region, new_zodiac, new_hour, new_days, new_subscribed, new_daily))
+async def save_user_preferences_many(changes: Iterable[Tuple[int, dict]], bot=None) -> int:
+    """
+    Bulk variant of save_user_preferences for admin operations.
 
-        conn.commit()
+    changes: (user_id, {"region": ..., "hour": ..., "days": [...], "subscribed": ..., "daily": ...}) pairs;
+    omitted keys (or None) keep their stored values. All rows are written in one transaction.
+    Returns the number of users written (0 on failure).
+    """
+    try:
+        params = [_prefs_params(user_id, **fields) for user_id, fields in changes]
+        if not params:
+            return 0
+        user_ids = [p["user_id"] for p in params]
+        await _executor.run(
+            "save_user_preferences_many", _upsert_prefs_sync, params,
+            on_complete=lambda: _prefs_cache.invalidate_many(user_ids)
+        )
+        return len(params)
 
     except Exception as e:
         if bot:
-            await robust_log(bot, f"❌ Failed to save user preferences for {user_id}: {e}", exc=e)
+            await robust_log(bot, f"❌ Failed bulk save of user preferences: {e}", exc=e)
         else:
-            print(f"Save user prefs error: {e}\n{traceback.format_exc()}")
+            print(f"Bulk save user prefs error: {e}\n{traceback.format_exc()}")
+        return 0
 
-    finally:
-        if conn:
-            conn.close()
+
+def _get_user_preferences_sync(user_id: int) -> Optional[tuple]:
+    with _pool.read() as conn:
+        return conn.execute(_SQL_SELECT_PREFS, (user_id,)).fetchone()
+
+
+def _row_to_prefs(row: Optional[tuple]) -> Optional[dict]:
+    if not row:
+        return None
+    region, zodiac, hour, days_mask, subscribed, daily = row
+    return {
+        "region": region,
+        "zodiac": zodiac,
+        "hour": hour,
+        "days": mask_to_days(days_mask),
+        "subscribed": bool(subscribed),
+        "daily": bool(daily)
+    }
 
 
 async def get_user_preferences(user_id: int) -> Optional[dict]:
-    conn = None
-    try:
-        conn = sqlite3.connect(DB_FILE)
-        cursor = conn.cursor()
+    """Served from the LRU preference cache when possible (see _PrefsCache)."""
+    cached = _prefs_cache.get(user_id)
+    if cached is not _NOT_CACHED:
+        return _copy_prefs(cached)
 
-        cursor.execute(
-            "SELECT region, zodiac, reminder_hour, reminder_days, subscribed, daily FROM users WHERE user_id = ?",
-            (user_id,)
-        )
-        row = cursor.fetchone()
-        if row:
-            region, zodiac, hour, days, subscribed, daily = row
-            return {
-                "region": region,
-                "zodiac": zodiac,
-                "hour": hour,
-                "days": days.split(",") if days else DEFAULT_DAYS.split(","),
-                "subscribed": bool(subscribed),
-                "daily": bool(daily)
-            }
+    try:
+        generation = _prefs_cache.generation
+        prefs = _row_to_prefs(await _run("get_user_preferences", _get_user_preferences_sync, user_id))
+        _prefs_cache.put(user_id, prefs, generation)
+        return _copy_prefs(prefs)
 
     except Exception as e:
         print(f"Get user prefs error: {e}\n{traceback.format_exc()}")
 
-    finally:
-        if conn:
-            conn.close()
     return None
 
 
+def _get_user_preferences_many_sync(user_ids: List[int]) -> List[tuple]:
+    rows = []
+    with _pool.read() as conn:
+        for i in range(0, len(user_ids), _IN_CHUNK):
+            chunk = user_ids[i:i + _IN_CHUNK]
+            sql = _SQL_SELECT_PREFS_IN.format(placeholders=",".join("?" * len(chunk)))
+            rows.extend(conn.execute(sql, chunk).fetchall())
+    return rows
+
+
+async def get_user_preferences_many(user_ids: Iterable[int]) -> Dict[int, dict]:
+    """
+    Bulk get_user_preferences for guild-wide commands (e.g. iterating interaction.guild.members).
+
+    Returns {user_id: prefs} for users that have a row; ids without preferences are absent.
+    Cached entries are used, the rest are fetched in chunked IN queries in a single executor call.
+    Results are not added to the LRU so one big scan doesn't evict the hot entries.
+    """
+    result: Dict[int, dict] = {}
+    missing: List[int] = []
+    for user_id in dict.fromkeys(user_ids):
+        cached = _prefs_cache.get(user_id)
+        if cached is _NOT_CACHED:
+            missing.append(user_id)
+        elif cached is not None:
+            result[user_id] = _copy_prefs(cached)
+
+    if missing:
+        try:
+            for row in await _run("get_user_preferences_many", _get_user_preferences_many_sync, missing):
+                result[row[0]] = _row_to_prefs(row[1:])
+        except Exception as e:
+            print(f"Get user prefs (bulk) error: {e}\n{traceback.format_exc()}")
+
+    return result
+
+
 async def set_subscription(user_id: int, status: bool, bot=None) -> None:
     """
     Enable/disable subscription (used by /unsubscribe and profile toggle).
@@ -260,14 +1040,25 @@ async def set_daily(user_id: int, daily: bool, bot=None) -> None:
 # -----------------------
 # Clear User Preferences
 # -----------------------
+def _execute_write_sync(sql: str, params: tuple) -> None:
+    with _pool.write() as conn:
+        conn.execute(sql, params)
+
+
+def _execute_write_count_sync(sql: str, params: tuple) -> int:
+    with _pool.write() as conn:
+        return conn.execute(sql, params).rowcount
+
+
+def _fetch_column_sync(sql: str) -> List:
+    with _pool.read() as conn:
+        return [r[0] for r in conn.execute(sql).fetchall()]
+
+
 async def clear_user_preferences(user_id: int, bot=None) -> None:
     """Deletes a user's preferences from the DB."""
-    conn = None
     try:
-        conn = sqlite3.connect(DB_FILE)
-        cursor = conn.cursor()
-        cursor.execute("DELETE FROM users WHERE user_id = ?", (user_id,))
-        conn.commit()
+        await _run_user_write("clear_user_preferences", user_id, _execute_write_sync, _SQL_DELETE_USER, (user_id,))
 
         if bot:
             await robust_log(bot, f"✅ Cleared preferences for user {user_id}.")
@@ -278,21 +1069,33 @@ async def clear_user_preferences(user_id: int, bot=None) -> None:
         else:
             print(f"Clear user prefs error: {e}\n{traceback.format_exc()}")
 
-    finally:
-        if conn:
-            conn.close()
+
+# -----------------------
+# Corpus loading
+# -----------------------
+async def _get_corpus(table: str, sql: str, defaults: List[str]) -> Tuple[str, ...]:
+    items = _corpus.get(table)
+    if items is not None:
+        return items
+
+    generation = _corpus.generation(table)
+    # Shared by get_all_*/random_* (whichever misses the cache first), so labelled by table
+    items = tuple(await _run(f"load_{table}", _fetch_column_sync, sql)) or tuple(defaults)
+    _corpus.put(table, items, generation)
+    return items
+
+
+async def _run_corpus_write(name: str, table: str, fn: Callable, *args):
+    """Runs a write to a corpus table; the cached corpus is dropped as soon as it commits."""
+    return await _executor.run(name, fn, *args, on_complete=lambda: _corpus.invalidate(table))
 
 
 # -----------------------
 # Quotes
 # -----------------------
 async def add_quote(quote: str, bot=None) -> None:
-    conn = None
     try:
-        conn = sqlite3.connect(DB_FILE)
-        cursor = conn.cursor()
-        cursor.execute("INSERT INTO quotes (quote) VALUES (?)", (quote,))
-        conn.commit()
+        await _run_corpus_write("add_quote", "quotes", _execute_write_sync, _SQL_INSERT_QUOTE, (quote,))
 
     except Exception as e:
         if bot:
@@ -300,30 +1103,28 @@ async def add_quote(quote: str, bot=None) -> None:
         else:
             print(f"Add quote error: {e}\n{traceback.format_exc()}")
 
-    finally:
-        if conn:
-            conn.close()
-
 
 async def get_all_quotes() -> List[str]:
-    conn = sqlite3.connect(DB_FILE)
-    cursor = conn.cursor()
-    cursor.execute("SELECT quote FROM quotes")
-    rows = [r[0] for r in cursor.fetchall()]
-    conn.close()
-    return DEFAULT_QUOTES + rows
+    return list(await _get_corpus("quotes", _SQL_SELECT_QUOTES, DEFAULT_QUOTES))
+
+
+async def random_quote() -> str:
+    """Random quote from the cached corpus (falls back to DEFAULT_QUOTES if the DB is unavailable)."""
+    try:
+        return random.choice(await _get_corpus("quotes", _SQL_SELECT_QUOTES, DEFAULT_QUOTES))
+    except Exception as e:
+        print(f"Random quote error: {e}\n{traceback.format_exc()}")
+        return random.choice(DEFAULT_QUOTES)
 
 
 # -----------------------
 # Journal Prompts
 # -----------------------
 async def add_journal_prompt(prompt: str, bot=None) -> None:
-    conn = None
     try:
-        conn = sqlite3.connect(DB_FILE)
-        cursor = conn.cursor()
-        cursor.execute("INSERT INTO journal_prompts (prompt) VALUES (?)", (prompt,))
-        conn.commit()
+        await _run_corpus_write(
+            "add_journal_prompt", "journal_prompts", _execute_write_sync, _SQL_INSERT_PROMPT, (prompt,)
+        )
 
     except Exception as e:
         if bot:
@@ -331,45 +1132,279 @@ async def add_journal_prompt(prompt: str, bot=None) -> None:
         else:
             print(f"Add journal prompt error: {e}\n{traceback.format_exc()}")
 
-    finally:
-        if conn:
-            conn.close()
-
 
 async def get_all_journal_prompts() -> List[str]:
-    conn = sqlite3.connect(DB_FILE)
-    cursor = conn.cursor()
-    cursor.execute("SELECT prompt FROM journal_prompts")
-    rows = [r[0] for r in cursor.fetchall()]
-    conn.close()
-    return DEFAULT_PROMPTS + rows
+    return list(await _get_corpus("journal_prompts", _SQL_SELECT_PROMPTS, DEFAULT_PROMPTS))
+
+
+async def random_prompt() -> str:
+    """Random journal prompt from the cached corpus (falls back to DEFAULT_PROMPTS if the DB is unavailable)."""
+    try:
+        return random.choice(await _get_corpus("journal_prompts", _SQL_SELECT_PROMPTS, DEFAULT_PROMPTS))
+    except Exception as e:
+        print(f"Random prompt error: {e}\n{traceback.format_exc()}")
+        return random.choice(DEFAULT_PROMPTS)
 
 
 # -----------------------
 # Subscribed Users
 # -----------------------
+def _get_all_subscribed_users_sync() -> List[Tuple]:
+    with _pool.read() as conn:
+        return conn.execute(_SQL_SELECT_SUBSCRIBED).fetchall()
+
+
 async def get_all_subscribed_users() -> List[Tuple]:
     """
     Return list of rows for subscribed users:
-    (user_id, region, zodiac, reminder_hour, reminder_days, daily)
+    (user_id, region, zodiac, reminder_hour, reminder_days_mask, daily)
+    Use mask_to_days() to turn reminder_days_mask into day names.
     """
-    conn = None
     try:
-        conn = sqlite3.connect(DB_FILE)
-        cursor = conn.cursor()
-        cursor.execute(
-            "SELECT user_id, region, zodiac, reminder_hour, reminder_days, daily FROM users WHERE subscribed = 1"
-        )
-        rows = cursor.fetchall()
-        return rows
+        return await _run("get_all_subscribed_users", _get_all_subscribed_users_sync)
 
     except Exception as e:
         print(f"Get subscribed users error: {e}\n{traceback.format_exc()}")
         return []
 
-    finally:
-        if conn:
-            conn.close()
+
+def _get_subscribed_ids_by_region_sync() -> Dict[str, List[int]]:
+    grouped: Dict[str, List[int]] = {}
+    with _pool.read() as conn:
+        for region, user_id in conn.execute(_SQL_SELECT_SUBSCRIBED_IDS):
+            grouped.setdefault(region, []).append(user_id)
+    return grouped
+
+
+async def get_subscribed_ids_by_region() -> Dict[str, List[int]]:
+    """{region: [user_id, ...]} for every subscribed user, in one query (grouped on the DB thread)."""
+    try:
+        return await _run("get_subscribed_ids_by_region", _get_subscribed_ids_by_region_sync)
+
+    except Exception as e:
+        print(f"Get subscribed ids error: {e}\n{traceback.format_exc()}")
+        return {}
+
+
+def _get_due_users_sync(region: str, hour: int, weekday: int) -> List[Tuple]:
+    with _pool.read() as conn:
+        return conn.execute(_SQL_SELECT_DUE, (region, hour, 1 << weekday)).fetchall()
+
+
+async def get_due_users(region: str, hour: int, weekday: int) -> List[Tuple]:
+    """
+    Return subscribed users with daily reminders on, in `region`, whose reminder_hour is `hour`
+    and whose reminder days include `weekday` (0=Mon ... 6=Sun, as date.weekday()).
+    Same row shape as get_all_subscribed_users().
+    Raises on DB errors (unlike the other readers): an empty result would look like an empty bucket,
+    so the daily loop must be able to tell a failure apart and retry.
+    """
+    return await _run("get_due_users", _get_due_users_sync, region, hour, weekday)
+
+
+# -----------------------
+# Outbox
+# -----------------------
+def _enqueue_outbox_sync(rows: List[Tuple]) -> int:
+    queued = 0
+    with _pool.write() as conn:
+        for ledger, announcement, row in rows:
+            # Ledger claim and enqueue commit together: a reminder is queued at most once, ever
+            if ledger is not None and conn.execute(_SQL_CLAIM_LEDGER, ledger).rowcount == 0:
+                continue
+            if announcement is not None and conn.execute(_SQL_CLAIM_ANNOUNCEMENT, announcement).rowcount == 0:
+                continue
+            conn.execute(_SQL_INSERT_OUTBOX, row)
+            queued += 1
+    return queued
+
+
+async def enqueue_outbox(items: Iterable[dict], bot=None, raise_errors: bool = False) -> int:
+    """
+    Queue rendered messages for delivery, all in one transaction. Each item is a dict with
+    target_kind ("user" | "channel"), target_id, kind (e.g. "daily") and payload (JSON-serializable dict).
+    An item may also carry ledger=(user_id, kind, local_date): it is only queued if that entry is not
+    already in the sent_reminders ledger (the entry is recorded in the same transaction).
+    Likewise announcement=(hemisphere, sabbat, delta, local_date) against sabbat_announcements.
+    Returns the number of rows queued (0 on failure; ledger duplicates are not counted).
+    raise_errors=True re-raises after logging, for callers that must retry rather than read a failure
+    as "nothing queued".
+    """
+    try:
+        now = time.time()
+        rows = []
+        for item in items:
+            ledger = _ledger_params(item.get("ledger"), now)
+            rows.append((
+                ledger,
+                _announcement_params(item.get("announcement"), now),
+                (
+                    item["target_kind"], int(item["target_id"]), item["kind"],
+                    json.dumps(item["payload"], separators=(",", ":")), now, now, now,
+                    *(ledger[:3] if ledger is not None else (None, None, None))
+                )
+            ))
+        if not rows:
+            return 0
+        return await _run("enqueue_outbox", _enqueue_outbox_sync, rows)
+
+    except Exception as e:
+        if bot:
+            await robust_log(bot, f"❌ Failed to enqueue outbox items: {e}", exc=e)
+        else:
+            print(f"Enqueue outbox error: {e}\n{traceback.format_exc()}")
+        if raise_errors:
+            raise
+        return 0
+
+
+def _ledger_params(ledger: Optional[tuple], now: float) -> Optional[tuple]:
+    if ledger is None:
+        return None
+    user_id, kind, local_date = ledger
+    return (int(user_id), kind, str(local_date), now)
+
+
+def _announcement_params(announcement: Optional[tuple], now: float) -> Optional[tuple]:
+    if announcement is None:
+        return None
+    hemisphere, sabbat, delta, local_date = announcement
+    return (hemisphere, sabbat, int(delta), str(local_date), now)
+
+
+def _claim_outbox_sync(limit: int, now: float) -> List[Tuple]:
+    with _pool.write() as conn:
+        # Select + mark in one write transaction so a row is only ever claimed once
+        conn.execute("BEGIN IMMEDIATE")
+        rows = conn.execute(_SQL_SELECT_OUTBOX_DUE, (now, limit)).fetchall()
+        conn.executemany(_SQL_CLAIM_OUTBOX, [(now, row[0]) for row in rows])
+    return rows
+
+
+async def claim_outbox(limit: int) -> List[Tuple]:
+    """
+    Atomically claim up to `limit` due pending rows (status -> sending, attempts + 1).
+    Returns rows of (id, target_kind, target_id, kind, payload dict, attempts, created_at, due_at),
+    where attempts already counts this delivery attempt and due_at is when the row became due.
+    """
+    rows = await _run("claim_outbox", _claim_outbox_sync, limit, time.time())
+    return [
+        (row_id, target_kind, target_id, kind, json.loads(payload), attempts + 1, created_at, due_at)
+        for row_id, target_kind, target_id, kind, payload, attempts, created_at, due_at in rows
+    ]
+
+
+def _finish_outbox_sync(rows: List[Tuple], release: List[Tuple]) -> None:
+    with _pool.write() as conn:
+        conn.executemany(_SQL_FINISH_OUTBOX, rows)
+        conn.executemany(_SQL_RELEASE_LEDGER, release)
+
+
+async def finish_outbox(results: Iterable[Tuple[int, str, float, Optional[str], bool]]) -> None:
+    """
+    Record delivery outcomes in one transaction: (id, status, next_attempt_at, last_error, release_ledger) per row.
+    release_ledger=True also deletes the sent_reminders entry the row was queued under (a reminder that was
+    never delivered shouldn't count as sent, so catch-up or a later pass can queue it again).
+    """
+    now = time.time()
+    rows, release = [], []
+    for row_id, status, next_at, error, release_ledger in results:
+        rows.append((status, next_at, error, now, row_id))
+        if release_ledger:
+            release.append((row_id,))
+    if rows:
+        await _run("finish_outbox", _finish_outbox_sync, rows, release)
+
+
+async def requeue_inflight_outbox() -> int:
+    """Put rows left in "sending" (bot stopped mid-delivery) back to "pending". Returns how many."""
+    return await _run("requeue_inflight_outbox", _execute_write_count_sync, _SQL_REQUEUE_OUTBOX, (time.time(),))
+
+
+async def purge_outbox(before: float) -> int:
+    """Delete delivered rows last updated before the `before` unix timestamp. Returns how many."""
+    return await _run("purge_outbox", _execute_write_count_sync, _SQL_PURGE_OUTBOX, (before,))
+
+
+def _count_outbox_sync() -> Dict[str, int]:
+    with _pool.read() as conn:
+        return dict(conn.execute(_SQL_COUNT_OUTBOX).fetchall())
+
+
+async def get_outbox_counts() -> Dict[str, int]:
+    """Queue depth by status, e.g. {"pending": 12, "sending": 8, "sent": 340, "dead": 1}."""
+    return await _run("get_outbox_counts", _count_outbox_sync)
+
+
+# -----------------------
+# DM Channels
+# -----------------------
+def _get_dm_channel_ids_sync(user_ids: List[int]) -> Dict[int, int]:
+    found: Dict[int, int] = {}
+    with _pool.read() as conn:
+        for i in range(0, len(user_ids), _IN_CHUNK):
+            chunk = user_ids[i:i + _IN_CHUNK]
+            sql = _SQL_SELECT_DM_CHANNELS_IN.format(placeholders=",".join("?" * len(chunk)))
+            found.update(conn.execute(sql, chunk).fetchall())
+    return found
+
+
+async def get_dm_channel_ids(user_ids: Iterable[int]) -> Dict[int, int]:
+    """{user_id: dm_channel_id} for the given users that have a stored DM channel (one executor call)."""
+    ids = list(dict.fromkeys(user_ids))
+    if not ids:
+        return {}
+    try:
+        return await _run("get_dm_channel_ids", _get_dm_channel_ids_sync, ids)
+
+    except Exception as e:
+        print(f"Get DM channel ids error: {e}\n{traceback.format_exc()}")
+        return {}
+
+
+def _save_dm_channel_ids_sync(rows: List[Tuple]) -> None:
+    with _pool.write() as conn:
+        conn.executemany(_SQL_UPDATE_DM_CHANNEL, rows)
+
+
+async def save_dm_channel_ids(pairs: Iterable[Tuple[int, Optional[int]]]) -> None:
+    """Store (user_id, dm_channel_id) pairs in one transaction; None clears a stale id."""
+    rows = [(channel_id, user_id) for user_id, channel_id in pairs]
+    if not rows:
+        return
+    try:
+        await _run("save_dm_channel_ids", _save_dm_channel_ids_sync, rows)
+
+    except Exception as e:
+        print(f"Save DM channel ids error: {e}\n{traceback.format_exc()}")
+
+
+# -----------------------
+# Sent-Reminder Ledger & Bot State
+# -----------------------
+async def purge_sent_reminders(before_local_date) -> int:
+    """Delete ledger entries for local dates before `before_local_date` (date or ISO string). Returns how many."""
+    return await _run("purge_sent_reminders", _execute_write_count_sync, _SQL_PURGE_LEDGER, (str(before_local_date),))
+
+
+def _get_state_sync(key: str) -> Optional[str]:
+    with _pool.read() as conn:
+        row = conn.execute(_SQL_SELECT_STATE, (key,)).fetchone()
+    return row[0] if row else None
+
+
+async def get_state(key: str) -> Optional[str]:
+    """Small persisted bot state (e.g. the daily scheduler cursor). None if unset or unreadable."""
+    try:
+        return await _run("get_state", _get_state_sync, key)
+
+    except Exception as e:
+        print(f"Get state error: {e}\n{traceback.format_exc()}")
+        return None
+
+
+async def set_state(key: str, value: str) -> None:
+    await _run("set_state", _execute_write_sync, _SQL_UPSERT_STATE, (key, value))
 
 
 # -----------------------
@@ -0,0 +1,113 @@
+# GBPBot - fanout.py
+# Version: 1.1.2
+# Last Updated: 2026-10-17
+# Notes:
+# - Concurrent, rate-limit-aware delivery of many messages (daily reminders, sabbat DMs).
+# - Bounded concurrency (a fixed pool of worker coroutines) instead of one-after-another awaits.
+# - Global pacing is done by safe_send's token buckets (shared by every send in the process);
+#   jobs sharing a route key (same channel) are serialized so one route never bursts.
+# - discord.py still handles any 429 it receives; this keeps us from provoking them.
+# - Reports per-batch throughput and completion latency (relative to when the batch was due).
+# -----------------------
+# CHANGE LOG
+# -----------------------
+# [2026-10-17] v1.1.2 - Removed FanOutStats.summary() (unused; the outbox reports batch stats in its drain summary).
+# [2026-10-17] v1.1.1 - Removed the FANOUT_CONCURRENCY env var: the only caller (outbox) passes OUTBOX_WORKERS,
+#                      so it never had an effect. FanOut's default concurrency is a plain constant.
+# [2026-10-17] v1.1.0 - Removed the fan-out's own global pacer (FANOUT_GLOBAL_RATE); safe_send's token buckets
+#                      now pace every send process-wide, so fan-out jobs aren't throttled twice.
+# [2026-10-17] v1.0.0 - Initial creation: FanOut.run() with worker pool, global pacer, per-route locks, FanOutStats.
+
+import asyncio
+import datetime
+import time
+from dataclasses import dataclass
+from typing import Awaitable, Callable, Hashable, Iterable, Optional, Tuple
+
+from logger import robust_log
+
+
+# Max sends in flight per fan-out, unless the caller says otherwise (the outbox uses OUTBOX_WORKERS)
+DEFAULT_CONCURRENCY = 8
+
+# A job: (route key, zero-arg coroutine factory). The coroutine returns True (sent),
+# False (failed) or None (skipped, e.g. user no longer eligible).
+Job = Tuple[Hashable, Callable[[], Awaitable[Optional[bool]]]]
+
+
+@dataclass
+class FanOutStats:
+    label: str
+    total: int = 0
+    sent: int = 0
+    failed: int = 0
+    skipped: int = 0
+    started: float = 0.0
+    finished: float = 0.0
+    due: Optional[datetime.datetime] = None
+    completed_at: Optional[datetime.datetime] = None
+
+    @property
+    def duration(self) -> float:
+        return max(0.0, self.finished - self.started)
+
+    @property
+    def throughput(self) -> float:
+        """Delivered messages per second."""
+        return self.sent / self.duration if self.duration > 0 else float(self.sent)
+
+    @property
+    def completion_latency(self) -> Optional[float]:
+        """Seconds between when the batch was due and its last send finishing."""
+        if self.due is None or self.completed_at is None:
+            return None
+        return (self.completed_at - self.due).total_seconds()
+
+
+class FanOut:
+    """
+    Runs many send jobs with bounded concurrency (pacing comes from safe_send's token buckets).
+
+    Usage:
+        stats = await FanOut().run("daily Europe 09:00", jobs, due=bucket.when)
+    """
+
+    def __init__(self, concurrency: int = DEFAULT_CONCURRENCY, bot=None):
+        self.concurrency = max(1, concurrency)
+        self.bot = bot
+
+    async def run(
+        self,
+        label: str,
+        jobs: Iterable[Job],
+        due: Optional[datetime.datetime] = None
+    ) -> FanOutStats:
+        jobs = list(jobs)
+        stats = FanOutStats(label=label, total=len(jobs), due=due, started=time.monotonic())
+        route_locks = {}
+        pending = iter(jobs)
+
+        async def worker():
+            for route, send in pending:
+                lock = route_locks.get(route)
+                if lock is None:
+                    lock = route_locks[route] = asyncio.Lock()
+                async with lock:
+                    try:
+                        outcome = await send()
+                    except Exception as e:
+                        outcome = False
+                        await robust_log(self.bot, f"[ERROR] Fan-out job failed ({label}, route={route})", exc=e)
+                if outcome is None:
+                    stats.skipped += 1
+                elif outcome:
+                    stats.sent += 1
+                else:
+                    stats.failed += 1
+
+        # Workers share one iterator, so each job is taken exactly once
+        await asyncio.gather(*(worker() for _ in range(min(self.concurrency, len(jobs)) or 1)))
+
+        stats.finished = time.monotonic()
+        stats.completed_at = datetime.datetime.now(datetime.timezone.utc)
+        return stats
@@ -1,22 +1,47 @@
 # GBPBot - logger.py
-# Version: 1.1.0
-# Last Updated: 2026-01-18
+# Version: 1.3.0
+# Last Updated: 2026-10-17
 # Notes:
-# - Centralized logging utilities for GBPBot.
+# - Centralized logging utilities for GBPBot, built on the stdlib logging module (logger "gbpbot").
 # - Provides robust_log function for consistent error/info logging across all cogs and bot events.
+# - Levels: robust_log infers INFO / WARNING / ERROR from the message ("[ERROR]", "[WARN") and exception,
+#   or takes level= explicitly. Tracebacks are only rendered for ERROR and above.
+# - Records go through a QueueHandler; a QueueListener thread does the formatting and console I/O, so the
+#   event loop only builds a LogRecord. Console output is JSON lines (LOG_FORMAT=json, default) or text.
+# - Per-key rate limiting: at most LOG_RATE_BURST records per key per LOG_RATE_WINDOW seconds (key defaults to
+#   the message with numbers masked); the next record let through carries the suppressed count.
 # - Logs to console and optionally to a Discord log channel (LOG_CHANNEL_ID from env).
 # - Safe: never crashes if LOG_CHANNEL_ID is missing/invalid or if bot/channel isn't available.
+# - Channel logging is buffered: lines are queued (bounded queue, LOG_QUEUE_SIZE) and a background flusher
+#   packs them into code blocks of at most 1900 chars every LOG_FLUSH_SECONDS.
+# - At most LOG_MESSAGES_PER_FLUSH messages go out per flush; over budget, [ERROR] lines are kept first and
+#   the rest are dropped with a "N line(s) dropped" note. Callers never wait on Discord I/O.
 # -----------------------
 # CHANGE LOG
 # -----------------------
+# [2026-10-17] v1.3.0 - Rebuilt on stdlib logging: levels, JSON-lines console output, QueueHandler/QueueListener
+#                      (formatting off the event loop), per-key rate limiting; robust_log gains level=/key=.
+# [2026-10-17] v1.2.0 - Buffered channel logging: bounded queue + background flusher (LogShipper) that batches
+#                      lines into <=1900-char code blocks per interval and drops over budget; console unchanged.
 # [2026-01-18] v1.1.0 - Read LOG_CHANNEL_ID from env (no hardcoding).
 #                    - Support both error= and exc= args for backward compatibility.
 #                    - Safer formatting and sending (won't crash if bot/channel missing).
 # [2025-09-21] v1.0.0 - Initial creation with robust_log function for centralized logging.
 
+import asyncio
+import atexit
+import json
+import logging
+import logging.handlers
 import os
+import queue
+import re
+import sys
+import threading
+import time
 import traceback
-from datetime import datetime
+from datetime import datetime, timezone
+from typing import Dict, List, Optional
 
 
 def _get_env(name: str):
@@ -37,56 +62,347 @@ def _get_log_channel_id():
         return None
 
 
-async def robust_log(bot, message: str, error: Exception = None, exc: Exception = None):
+def _get_float_env(name: str, default: float) -> float:
+    raw = _get_env(name)
+    if not raw:
+        return default
+    try:
+        return float(raw)
+    except ValueError:
+        return default
+
+
+LOGGER_NAME = "gbpbot"
+# Minimum level logged, and console format ("json" or "text")
+LOG_LEVEL = logging.getLevelName((_get_env("LOG_LEVEL") or "INFO").upper())
+if not isinstance(LOG_LEVEL, int):
+    LOG_LEVEL = logging.INFO
+LOG_FORMAT = (_get_env("LOG_FORMAT") or "json").lower()
+# Records allowed per key per window before the rest are suppressed
+LOG_RATE_WINDOW = max(1.0, _get_float_env("LOG_RATE_WINDOW", 60))
+LOG_RATE_BURST = max(1, int(_get_float_env("LOG_RATE_BURST", 5)))
+
+# Seconds between channel flushes, lines buffered before new ones are dropped, messages per flush
+LOG_FLUSH_SECONDS = max(1.0, _get_float_env("LOG_FLUSH_SECONDS", 5))
+LOG_QUEUE_SIZE = max(10, int(_get_float_env("LOG_QUEUE_SIZE", 1000)))
+LOG_MESSAGES_PER_FLUSH = max(1, int(_get_float_env("LOG_MESSAGES_PER_FLUSH", 2)))
+
+# Discord's limit is 2000; leave room for the code fence
+_BLOCK_CHARS = 1900
+# A single entry (e.g. a long traceback) never takes more than half a block
+_ENTRY_CHARS = _BLOCK_CHARS // 2
+
+# Masks ids, counts and timings so "failed for user 123" and "... user 456" share a rate-limit key
+_NUMBERS = re.compile(r"\d+(?:\.\d+)?")
+
+
+# -----------------------
+# Formatting
+# -----------------------
+def _exception_fields(record: logging.LogRecord) -> dict:
+    if not record.exc_info or record.exc_info[1] is None:
+        return {}
+    exc_type, exc, tb = record.exc_info
+    fields = {"exc_type": exc_type.__name__, "exc": str(exc)}
+    # Expected failures (below ERROR) don't pay for a traceback
+    if record.levelno >= logging.ERROR:
+        fields["traceback"] = "".join(traceback.format_exception(exc_type, exc, tb))
+    return fields
+
+
+class JsonFormatter(logging.Formatter):
+    """One JSON object per line: ts, level, logger, msg, plus exception fields and suppressed count."""
+
+    def format(self, record: logging.LogRecord) -> str:
+        data = {
+            "ts": datetime.fromtimestamp(record.created, timezone.utc).isoformat(timespec="milliseconds"),
+            "level": record.levelname,
+            "logger": record.name,
+            "msg": record.getMessage(),
+        }
+        data.update(_exception_fields(record))
+        suppressed = getattr(record, "suppressed", 0)
+        if suppressed:
+            data["suppressed"] = suppressed
+        return json.dumps(data, ensure_ascii=False)
+
+
+class TextFormatter(logging.Formatter):
+    """The classic "[YYYY-mm-dd HH:MM:SS UTC] message" layout (console text mode and the log channel)."""
+
+    def format(self, record: logging.LogRecord) -> str:
+        timestamp = datetime.fromtimestamp(record.created, timezone.utc).strftime("%Y-%m-%d %H:%M:%S")
+        message = record.getMessage()
+        if record.levelno >= logging.WARNING and not message.startswith("["):
+            message = f"[{record.levelname}] {message}"
+        line = f"[{timestamp} UTC] {message}"
+        suppressed = getattr(record, "suppressed", 0)
+        if suppressed:
+            line += f" (+{suppressed} similar suppressed)"
+        fields = _exception_fields(record)
+        if fields:
+            line += f"\nException: {fields['exc_type']}: {fields['exc']}"
+            if "traceback" in fields:
+                line += f"\nTraceback:\n{fields['traceback']}"
+        return line
+
+
+# -----------------------
+# Rate Limiting
+# -----------------------
+class RateLimitFilter(logging.Filter):
+    """
+    Lets at most `burst` records per key through per `window` seconds.
+    The key is record.rate_key if set, else (level, message with numbers masked).
     """
-    Robust logging function:
-    - Prints logs to console
-    - Optionally sends logs to LOG_CHANNEL_ID (from env)
-    - Includes traceback if an exception is provided
 
-    Args:
-        bot: discord.Client / commands.Bot (or None)
-        message: log message
-        error: optional exception (legacy param)
-        exc: optional exception (preferred param)
+    def __init__(self, window: float = LOG_RATE_WINDOW, burst: int = LOG_RATE_BURST):
+        super().__init__()
+        self.window = window
+        self.burst = burst
+        self._lock = threading.Lock()
+        # key -> [window start, records in window, suppressed since last let through]
+        self._keys: Dict[tuple, list] = {}
+        self.suppressed = 0
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        key = getattr(record, "rate_key", None)
+        if key is None:
+            key = (record.levelno, _NUMBERS.sub("#", record.getMessage())[:200])
+        now = time.monotonic()
+        with self._lock:
+            state = self._keys.get(key)
+            if state is None:
+                if len(self._keys) >= 10000:
+                    self._prune(now)
+                state = self._keys[key] = [now, 0, 0]
+            elif now - state[0] >= self.window:
+                state[0], state[1] = now, 0
+            state[1] += 1
+            if state[1] > self.burst:
+                state[2] += 1
+                self.suppressed += 1
+                return False
+            record.suppressed, state[2] = state[2], 0
+        return True
+
+    def _prune(self, now: float) -> None:
+        for key in [k for k, (start, _, _) in self._keys.items() if now - start >= self.window]:
+            del self._keys[key]
+
+
+# -----------------------
+# Channel Shipping
+# -----------------------
+class LogShipper:
     """
-    # Prefer exc if provided, else fall back to error
-    exception = exc or error
+    Batches log lines for LOG_CHANNEL_ID.
 
-    timestamp = datetime.utcnow().strftime("%Y-%m-%d %H:%M:%S")
-    log_msg = f"[{timestamp} UTC] {message}"
+    Usage:
+        shipper.submit(line)   # never blocks; drops when the queue is full (call on the event loop)
+    """
 
-    if exception:
-        # If we're inside an exception handler, format_exc() will include the active traceback.
-        # Otherwise, we still show the exception string.
-        tb = traceback.format_exc()
-        if tb.strip() == "NoneType: None":
-            tb = "".join(traceback.format_exception(type(exception), exception, exception.__traceback__))
-        log_msg += f"\nException: {exception}\nTraceback:\n{tb}"
+    def __init__(self, bot, channel_id: int):
+        self.bot = bot
+        self.channel_id = channel_id
+        self._queue: asyncio.Queue = asyncio.Queue(maxsize=LOG_QUEUE_SIZE)
+        self._task: Optional[asyncio.Task] = None
+        self.dropped = 0   # lines not shipped (queue full or over a flush's budget)
+        self.shipped = 0   # lines shipped
 
-    print(log_msg)
+    def submit(self, line: str) -> None:
+        if len(line) > _ENTRY_CHARS:
+            line = line[:_ENTRY_CHARS] + "\n...[truncated]"
+        try:
+            self._queue.put_nowait(line.replace("```", "``\u200b`"))
+        except asyncio.QueueFull:
+            self.dropped += 1
+        if self._task is None or self._task.done():
+            self._task = asyncio.create_task(self._run(), name="gbpbot-log-shipper")
 
-    # Discord channel logging (optional)
-    channel_id = _get_log_channel_id()
-    if not channel_id or bot is None:
-        return
+    async def _run(self) -> None:
+        while not self.bot.is_closed():
+            await asyncio.sleep(LOG_FLUSH_SECONDS)
+            lines = []
+            while not self._queue.empty():
+                lines.append(self._queue.get_nowait())
+            if not lines:
+                continue
+            try:
+                await self._flush(lines)
+            except Exception as e:
+                print(f"[ERROR] Failed to send log to channel: {e}")
 
-    try:
-        channel = bot.get_channel(channel_id)
+    def _pack(self, lines: List[str]) -> List[str]:
+        """Code blocks for as many lines as the budget allows (errors first, original order kept)."""
+        # Pick lines by total size (errors first), then fill blocks in order; anything that still
+        # doesn't fit in LOG_MESSAGES_PER_FLUSH blocks is dropped too
+        budget = LOG_MESSAGES_PER_FLUSH * _BLOCK_CHARS - 64
+        keep = set()
+        for i in sorted(range(len(lines)), key=lambda i: "[ERROR]" not in lines[i]):
+            cost = len(lines[i]) + 1
+            if cost <= budget:
+                keep.add(i)
+                budget -= cost
+
+        blocks: List[str] = []
+        current = ""
+        shipped = 0
+        for i in sorted(keep):
+            line = lines[i]
+            if current and len(current) + len(line) + 1 > _BLOCK_CHARS:
+                if len(blocks) + 1 == LOG_MESSAGES_PER_FLUSH:
+                    break
+                blocks.append(current)
+                current = ""
+            current = f"{current}\n{line}" if current else line
+            shipped += 1
+
+        dropped = len(lines) - shipped
+        if dropped:
+            note = f"... {dropped} line(s) dropped (log budget)"
+            current = f"{current}\n{note}" if len(current) + len(note) + 1 <= _BLOCK_CHARS else current
+        if current:
+            blocks.append(current)
+        self.shipped += shipped
+        self.dropped += dropped
+        return blocks
+
+    async def _flush(self, lines: List[str]) -> None:
+        channel = self.bot.get_channel(self.channel_id)
         if channel is None:
             # Try fetching if cache misses (requires guild intents and permissions)
-            try:
-                channel = await bot.fetch_channel(channel_id)
-            except Exception:
-                channel = None
+            channel = await self.bot.fetch_channel(self.channel_id)
+        for block in self._pack(lines):
+            await channel.send(f"```{block}```")
+
+    def stats(self) -> dict:
+        return {"queued": self._queue.qsize(), "shipped": self.shipped, "dropped": self.dropped}
+
+
+_shipper: Optional[LogShipper] = None
+
+
+class _ChannelHandler(logging.Handler):
+    """Runs on the listener thread: formats records marked for the channel and hands them to the loop."""
+
+    def __init__(self):
+        super().__init__(level=logging.INFO)
+        self.loop: Optional[asyncio.AbstractEventLoop] = None
+        self.shipper: Optional[LogShipper] = None
+
+    def emit(self, record: logging.LogRecord) -> None:
+        loop, shipper = self.loop, self.shipper
+        if loop is None or shipper is None or not getattr(record, "ship", False):
+            return
+        try:
+            loop.call_soon_threadsafe(shipper.submit, self.format(record))
+        except RuntimeError:
+            # Loop closed during shutdown
+            pass
+
+
+class _DeferredQueueHandler(logging.handlers.QueueHandler):
+    """Enqueues the record as-is; the listener thread does all formatting (incl. tracebacks)."""
+
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        return record
+
+
+_rate_limit = RateLimitFilter()
+_channel_handler = _ChannelHandler()
+_listener: Optional[logging.handlers.QueueListener] = None
+_configure_lock = threading.Lock()
+
+
+def get_logger() -> logging.Logger:
+    """The "gbpbot" logger, wired to the queue listener on first use."""
+    global _listener
+    log = logging.getLogger(LOGGER_NAME)
+    if _listener is not None:
+        return log
+    with _configure_lock:
+        if _listener is None:
+            records = queue.SimpleQueue()
+            handler = _DeferredQueueHandler(records)
+            handler.addFilter(_rate_limit)
+            log.addHandler(handler)
+            log.setLevel(LOG_LEVEL)
+            log.propagate = False
+
+            console = logging.StreamHandler(sys.stdout)
+            console.setFormatter(JsonFormatter() if LOG_FORMAT == "json" else TextFormatter())
+            _channel_handler.setFormatter(TextFormatter())
+            _listener = logging.handlers.QueueListener(records, console, _channel_handler, respect_handler_level=True)
+            _listener.start()
+            # Drain whatever is still queued at interpreter exit
+            atexit.register(_listener.stop)
+    return log
 
-        if channel:
-            # Prevent extremely long messages from failing
-            payload = log_msg
-            if len(payload) > 1900:
-                payload = payload[:1900] + "\n...[truncated]"
 
-            await channel.send(f"```{payload}```")
+def _attach_channel(bot) -> None:
+    """Point the channel handler at this bot's LOG_CHANNEL_ID (called on the event loop)."""
+    global _shipper
+    channel_id = _get_log_channel_id()
+    if not channel_id:
+        _channel_handler.shipper = None
+        return
+    if _shipper is None or _shipper.bot is not bot or _shipper.channel_id != channel_id:
+        _shipper = LogShipper(bot, channel_id)
+        _channel_handler.loop = asyncio.get_running_loop()
+        _channel_handler.shipper = _shipper
+
+
+def get_log_stats() -> dict:
+    """Channel shipping counters (once a bot has logged) and records suppressed by rate limiting."""
+    stats = _shipper.stats() if _shipper is not None else {}
+    stats["suppressed"] = _rate_limit.suppressed
+    return stats
+
+
+def _infer_level(message: str, exception: Optional[BaseException]) -> int:
+    if message.startswith("[WARN") or "[WARNING]" in message:
+        return logging.WARNING
+    if exception is not None or "[ERROR]" in message:
+        return logging.ERROR
+    return logging.INFO
+
+
+async def robust_log(
+    bot,
+    message: str,
+    error: Exception = None,
+    exc: Exception = None,
+    level: Optional[int] = None,
+    key: Optional[str] = None
+):
+    """
+    Robust logging function:
+    - Logs through the "gbpbot" logger (JSON lines on the console; formatting happens off the event loop)
+    - Optionally queues logs for LOG_CHANNEL_ID (from env); a background task sends them in batches
+    - Includes traceback if an exception is provided (ERROR level and above)
+
+    Args:
+        bot: discord.Client / commands.Bot (or None for console only)
+        message: log message
+        error: optional exception (legacy param)
+        exc: optional exception (preferred param)
+        level: optional logging level (default: inferred from message/exception)
+        key: optional rate-limit key (default: message with numbers masked)
+    """
+    # Prefer exc if provided, else fall back to error
+    exception = exc or error
+    if level is None:
+        level = _infer_level(message, exception)
+
+    log = get_logger()
+    if not log.isEnabledFor(level):
+        return
 
-    except Exception as send_exc:
-        print(f"[ERROR] Failed to send log to channel: {send_exc}")
+    if bot is not None:
+        _attach_channel(bot)
+    extra = {"ship": bot is not None}
+    if key is not None:
+        extra["rate_key"] = key
+    exc_info = (type(exception), exception, exception.__traceback__) if exception else None
+    log.log(level, message, exc_info=exc_info, extra=extra)
@@ -0,0 +1,201 @@
+# GBPBot - lunar.py
+# Version: 1.0.0
+# Last Updated: 2026-10-17
+# Notes:
+# - Precomputed lunar calendar: one ephem pass per calendar year instead of an ephem.Moon / full-moon
+#   search per reminder or button click.
+# - Per year: daily illumination (percent) and waxing flags in compact arrays, plus the principal phase
+#   instants (new, first quarter, full, last quarter) with a margin into the neighbouring years.
+# - Per timezone (built on first use): day-indexed phase codes and next-full/new-moon ordinals, so lookups
+#   are constant-time. A principal phase is shown on the local day it occurs; days in between get the
+#   intermediate phase (waxing crescent, waxing gibbous, waning gibbous, waning crescent).
+# - Years are built lazily on first lookup (rollover included); the two most recent years stay cached.
+# -----------------------
+# CHANGE LOG
+# -----------------------
+# [2026-10-17] v1.0.0 - Initial creation: LunarCalendar (illumination/waxing arrays, phase instants,
+#                      8-phase emoji, next full/new moon per timezone).
+
+import bisect
+import datetime
+import threading
+from array import array
+from collections import OrderedDict
+from typing import Dict, List, Tuple
+from zoneinfo import ZoneInfo
+
+import ephem
+
+UTC = datetime.timezone.utc
+
+# Phase codes: principal phases are even, the stretch after each principal phase is the next odd code
+PHASE_NEW, PHASE_FIRST_QUARTER, PHASE_FULL, PHASE_LAST_QUARTER = 0, 2, 4, 6
+PHASE_EMOJIS = ("🌑", "🌒", "🌓", "🌔", "🌕", "🌖", "🌗", "🌘")
+PHASE_NAMES = (
+    "New Moon", "Waxing Crescent", "First Quarter", "Waxing Gibbous",
+    "Full Moon", "Waning Gibbous", "Last Quarter", "Waning Crescent",
+)
+
+_PRINCIPAL_SEARCHES = (
+    (PHASE_NEW, ephem.next_new_moon),
+    (PHASE_FIRST_QUARTER, ephem.next_first_quarter_moon),
+    (PHASE_FULL, ephem.next_full_moon),
+    (PHASE_LAST_QUARTER, ephem.next_last_quarter_moon),
+)
+
+# Phase instants are collected this far either side of the year (covers "next full moon" in late December)
+_MARGIN_DAYS = 45
+# Years kept in memory (covers lookups straddling New Year across timezones)
+_CACHED_YEARS = 2
+
+
+def _utc_datetime(d: float) -> datetime.datetime:
+    return ephem.Date(d).datetime().replace(tzinfo=UTC)
+
+
+class _LunarYear:
+    """Arrays for one calendar year; per-timezone indexes are built on first use."""
+
+    def __init__(self, year: int):
+        self.year = year
+        self.first = datetime.date(year, 1, 1)
+        self.start_ordinal = self.first.toordinal()
+        self.days = datetime.date(year + 1, 1, 1).toordinal() - self.start_ordinal
+
+        # Daily samples at 12:00 UTC
+        self.illumination = array("B")  # percent lit, 0..100
+        self.waxing = bytearray()       # 1 while illumination is increasing
+        moon = ephem.Moon()
+        noon = ephem.Date(datetime.datetime(year, 1, 1, 12))
+        for day in range(self.days):
+            moon.compute(noon + day)
+            lit = moon.moon_phase
+            moon.compute(noon + day + 0.25)
+            self.illumination.append(round(lit * 100))
+            self.waxing.append(1 if moon.moon_phase > lit else 0)
+
+        # Principal phase instants, sorted: (unix timestamp, phase code)
+        lo = ephem.Date(datetime.datetime(year, 1, 1)) - _MARGIN_DAYS
+        hi = ephem.Date(datetime.datetime(year + 1, 1, 1)) + _MARGIN_DAYS
+        phases: List[Tuple[float, int]] = []
+        for code, search in _PRINCIPAL_SEARCHES:
+            d = search(lo)
+            while d < hi:
+                phases.append((_utc_datetime(d).timestamp(), code))
+                d = search(d)
+        phases.sort()
+        self.phases = phases
+        self._phase_times = [ts for ts, _ in phases]
+
+        self._lock = threading.Lock()
+        # tz -> (phase code per local day, next full moon ordinal per day, next new moon ordinal per day)
+        self._zones: Dict[str, Tuple[bytearray, array, array]] = {}
+
+    def zone(self, tz: str) -> Tuple[bytearray, array, array]:
+        index = self._zones.get(tz)
+        if index is None:
+            with self._lock:
+                index = self._zones.get(tz)
+                if index is None:
+                    index = self._zones[tz] = self._build_zone(tz)
+        return index
+
+    def _build_zone(self, tz: str) -> Tuple[bytearray, array, array]:
+        zone = ZoneInfo(tz)
+        # Local date of each principal phase
+        local = [
+            (datetime.datetime.fromtimestamp(ts, zone).date().toordinal(), code)
+            for ts, code in self.phases
+        ]
+        codes = bytearray()
+        next_full = array("I")
+        next_new = array("I")
+        i = 0  # first principal phase on or after the current day
+        for day in range(self.days):
+            ordinal = self.start_ordinal + day
+            while local[i][0] < ordinal:
+                i += 1
+            if local[i][0] == ordinal:
+                codes.append(local[i][1])
+            else:
+                # Between principal phases: the intermediate phase after the previous one
+                codes.append((local[i - 1][1] + 1) % 8)
+            next_full.append(next(o for o, c in local[i:] if c == PHASE_FULL))
+            next_new.append(next(o for o, c in local[i:] if c == PHASE_NEW))
+        return codes, next_full, next_new
+
+
+class LunarCalendar:
+    """
+    Constant-time moon lookups backed by per-year precomputed arrays.
+
+    Usage:
+        lunar_calendar.phase_emoji(date, "Europe/London")
+        lunar_calendar.next_full_moon("America/New_York", today)
+    """
+
+    def __init__(self, cached_years: int = _CACHED_YEARS):
+        self.cached_years = max(1, cached_years)
+        self._years: "OrderedDict[int, _LunarYear]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def year(self, year: int) -> _LunarYear:
+        """The year's arrays, computing them on first use (call from a worker thread to prewarm)."""
+        data = self._years.get(year)
+        if data is not None:
+            return data
+        with self._lock:
+            data = self._years.get(year)
+            if data is None:
+                data = _LunarYear(year)
+                self._years[year] = data
+                while len(self._years) > self.cached_years:
+                    self._years.popitem(last=False)
+        return data
+
+    def _day(self, local_date: datetime.date, tz: str):
+        data = self.year(local_date.year)
+        return data, data.zone(tz), local_date.toordinal() - data.start_ordinal
+
+    def phase_index(self, local_date: datetime.date, tz: str = "UTC") -> int:
+        """Phase code 0..7 (PHASE_NAMES / PHASE_EMOJIS index) for a local date."""
+        _, (codes, _, _), day = self._day(local_date, tz)
+        return codes[day]
+
+    def phase_emoji(self, local_date: datetime.date, tz: str = "UTC") -> str:
+        return PHASE_EMOJIS[self.phase_index(local_date, tz)]
+
+    def phase_name(self, local_date: datetime.date, tz: str = "UTC") -> str:
+        return PHASE_NAMES[self.phase_index(local_date, tz)]
+
+    def illumination(self, day: datetime.date) -> float:
+        """Fraction of the disc lit at 12:00 UTC on `day` (0.0..1.0)."""
+        data = self.year(day.year)
+        return data.illumination[day.toordinal() - data.start_ordinal] / 100.0
+
+    def is_waxing(self, day: datetime.date) -> bool:
+        data = self.year(day.year)
+        return bool(data.waxing[day.toordinal() - data.start_ordinal])
+
+    def next_full_moon(self, tz: str, local_date: datetime.date) -> datetime.date:
+        """Local date of the first full moon on or after local_date in tz."""
+        _, (_, next_full, _), day = self._day(local_date, tz)
+        return datetime.date.fromordinal(next_full[day])
+
+    def next_new_moon(self, tz: str, local_date: datetime.date) -> datetime.date:
+        """Local date of the first new moon on or after local_date in tz."""
+        _, (_, _, next_new), day = self._day(local_date, tz)
+        return datetime.date.fromordinal(next_new[day])
+
+    def principal_phases(self, year: int) -> List[Tuple[datetime.datetime, str]]:
+        """(UTC instant, phase name) of every new/quarter/full moon in the calendar year."""
+        data = self.year(year)
+        lo = bisect.bisect_left(data._phase_times, datetime.datetime(year, 1, 1, tzinfo=UTC).timestamp())
+        hi = bisect.bisect_left(data._phase_times, datetime.datetime(year + 1, 1, 1, tzinfo=UTC).timestamp())
+        return [
+            (datetime.datetime.fromtimestamp(ts, UTC), PHASE_NAMES[code])
+            for ts, code in data.phases[lo:hi]
+        ]
+
+
+lunar_calendar = LunarCalendar()
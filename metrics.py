@@ -0,0 +1,366 @@
+# GBPBot - metrics.py
+# Version: 1.0.0
+# Last Updated: 2026-10-17
+# Notes:
+# - In-process metrics registry (counters, gauges, histograms) with Prometheus text exposition.
+# - No dependencies beyond discord.py's bundled aiohttp; the HTTP endpoint is optional (METRICS_PORT).
+# - Instrumented modules declare their metrics at import time and update them inline (no I/O, no awaits);
+#   values that live elsewhere (outbox depth, executor queue) are refreshed by collectors at scrape time.
+# - Everything works without a Discord connection: REGISTRY.render() / await collect_and_render() return the
+#   exposition text, and start_metrics_server() serves it with or without a bot.
+# -----------------------
+# CHANGE LOG
+# -----------------------
+# [2026-10-17] v1.0.0 - Initial creation: Counter/Gauge/Histogram, registry + collectors, aiohttp /metrics endpoint,
+#                      interaction listeners (instrument_bot).
+
+import bisect
+import datetime
+import math
+import os
+import threading
+import time
+import traceback
+from typing import Awaitable, Callable, Dict, List, Optional, Sequence, Tuple
+
+from aiohttp import web
+
+
+def _get_env(name: str):
+    v = os.getenv(name)
+    if v is None:
+        return None
+    v = v.strip()
+    return v if v else None
+
+
+def _get_int_env(name: str, default: int) -> int:
+    raw = _get_env(name)
+    if not raw:
+        return default
+    try:
+        return int(raw)
+    except ValueError:
+        return default
+
+
+# HTTP endpoint (0 = disabled). Binds to localhost unless METRICS_HOST says otherwise.
+METRICS_PORT = max(0, _get_int_env("METRICS_PORT", 0))
+METRICS_HOST = _get_env("METRICS_HOST") or "127.0.0.1"
+
+# Seconds; covers a 1 ms DB read up to a minute-long loop iteration
+DEFAULT_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0)
+
+
+def _format_value(value: float) -> str:
+    if value == math.inf:
+        return "+Inf"
+    if float(value).is_integer():
+        return str(int(value))
+    return repr(float(value))
+
+
+def _escape(value: str) -> str:
+    return str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+# -----------------------
+# Metric Types
+# -----------------------
+class _Metric:
+    kind = "untyped"
+
+    def __init__(self, name: str, help_text: str, labels: Sequence[str] = ()):
+        self.name = name
+        self.help = help_text
+        self.label_names = tuple(labels)
+        self._lock = threading.Lock()
+        self._children: Dict[Tuple[str, ...], object] = {}
+
+    def labels(self, *values, **kw):
+        """The child for one label combination (cached; keep the returned object for hot paths)."""
+        if kw:
+            values = tuple(kw[name] for name in self.label_names)
+        key = tuple(str(v) for v in values)
+        if len(key) != len(self.label_names):
+            raise ValueError(f"{self.name} expects labels {self.label_names}, got {key}")
+        child = self._children.get(key)
+        if child is None:
+            with self._lock:
+                child = self._children.get(key)
+                if child is None:
+                    child = self._children[key] = self._new_child()
+        return child
+
+    def _new_child(self):
+        raise NotImplementedError
+
+    def _label_str(self, key: Tuple[str, ...], extra: Optional[Tuple[str, str]] = None) -> str:
+        pairs = list(zip(self.label_names, key))
+        if extra:
+            pairs.append(extra)
+        if not pairs:
+            return ""
+        return "{" + ",".join(f'{n}="{_escape(v)}"' for n, v in pairs) + "}"
+
+    def _default(self):
+        # Unlabelled metrics expose their single child directly
+        return self.labels()
+
+    def samples(self) -> List[str]:
+        raise NotImplementedError
+
+    def render(self) -> str:
+        lines = [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} {self.kind}"]
+        lines.extend(self.samples())
+        return "\n".join(lines)
+
+
+class _Value:
+    __slots__ = ("value",)
+
+    def __init__(self):
+        self.value = 0.0
+
+    def inc(self, amount: float = 1.0) -> None:
+        self.value += amount
+
+    def dec(self, amount: float = 1.0) -> None:
+        self.value -= amount
+
+    def set(self, value: float) -> None:
+        self.value = float(value)
+
+
+class Counter(_Metric):
+    """Monotonic count. counter.inc() or counter.labels(outcome="sent").inc()."""
+
+    kind = "counter"
+
+    def _new_child(self):
+        return _Value()
+
+    def inc(self, amount: float = 1.0) -> None:
+        self._default().inc(amount)
+
+    def samples(self) -> List[str]:
+        return [
+            f"{self.name}{self._label_str(key)} {_format_value(child.value)}"
+            for key, child in sorted(self._children.items())
+        ]
+
+
+class Gauge(Counter):
+    """Point-in-time value: set/inc/dec."""
+
+    kind = "gauge"
+
+    def set(self, value: float) -> None:
+        self._default().set(value)
+
+    def dec(self, amount: float = 1.0) -> None:
+        self._default().dec(amount)
+
+
+class _HistogramChild:
+    __slots__ = ("bounds", "counts", "sum", "count")
+
+    def __init__(self, bounds: Tuple[float, ...]):
+        self.bounds = bounds
+        self.counts = [0] * len(bounds)
+        self.sum = 0.0
+        self.count = 0
+
+    def observe(self, value: float) -> None:
+        i = bisect.bisect_left(self.bounds, value)
+        if i < len(self.counts):
+            self.counts[i] += 1
+        self.sum += value
+        self.count += 1
+
+    def time(self) -> "_Timer":
+        return _Timer(self)
+
+
+class _Timer:
+    """Context manager observing elapsed seconds (works in sync and async code)."""
+
+    __slots__ = ("_child", "_start")
+
+    def __init__(self, child: _HistogramChild):
+        self._child = child
+
+    def __enter__(self):
+        self._start = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        self._child.observe(time.perf_counter() - self._start)
+        return False
+
+
+class Histogram(_Metric):
+    """Distribution of observations in fixed buckets. histogram.observe(0.12) or .labels(...).time()."""
+
+    kind = "histogram"
+
+    def __init__(self, name: str, help_text: str, labels: Sequence[str] = (), buckets=DEFAULT_BUCKETS):
+        super().__init__(name, help_text, labels)
+        self.buckets = tuple(sorted(float(b) for b in buckets))
+
+    def _new_child(self):
+        return _HistogramChild(self.buckets)
+
+    def observe(self, value: float) -> None:
+        self._default().observe(value)
+
+    def time(self) -> _Timer:
+        return self._default().time()
+
+    def samples(self) -> List[str]:
+        lines = []
+        for key, child in sorted(self._children.items()):
+            cumulative = 0
+            for bound, count in zip(child.bounds, child.counts):
+                cumulative += count
+                lines.append(
+                    f"{self.name}_bucket{self._label_str(key, ('le', _format_value(bound)))} {cumulative}"
+                )
+            lines.append(f"{self.name}_bucket{self._label_str(key, ('le', '+Inf'))} {child.count}")
+            lines.append(f"{self.name}_sum{self._label_str(key)} {_format_value(child.sum)}")
+            lines.append(f"{self.name}_count{self._label_str(key)} {child.count}")
+        return lines
+
+
+# -----------------------
+# Registry
+# -----------------------
+class Registry:
+    """
+    Named metrics plus async collectors run before each scrape.
+
+    Usage:
+        SENDS = REGISTRY.counter("gbpbot_sends_total", "Sends by outcome", ["outcome"])
+        REGISTRY.add_collector(refresh_outbox_gauges)
+        text = await REGISTRY.collect_and_render()
+    """
+
+    def __init__(self):
+        self._metrics: Dict[str, _Metric] = {}
+        self._collectors: List[Callable[[], Awaitable[None]]] = []
+        self._lock = threading.Lock()
+
+    def _register(self, metric: _Metric) -> _Metric:
+        with self._lock:
+            existing = self._metrics.get(metric.name)
+            if existing is not None:
+                # Re-importing a module (extension reload) keeps the original series
+                if type(existing) is not type(metric) or existing.label_names != metric.label_names:
+                    raise ValueError(f"metric {metric.name} already registered with a different shape")
+                return existing
+            self._metrics[metric.name] = metric
+            return metric
+
+    def counter(self, name: str, help_text: str, labels: Sequence[str] = ()) -> Counter:
+        return self._register(Counter(name, help_text, labels))
+
+    def gauge(self, name: str, help_text: str, labels: Sequence[str] = ()) -> Gauge:
+        return self._register(Gauge(name, help_text, labels))
+
+    def histogram(self, name: str, help_text: str, labels: Sequence[str] = (), buckets=DEFAULT_BUCKETS) -> Histogram:
+        return self._register(Histogram(name, help_text, labels, buckets))
+
+    def add_collector(self, collector: Callable[[], Awaitable[None]]) -> None:
+        """Register a coroutine function that refreshes gauges before each scrape."""
+        if collector not in self._collectors:
+            self._collectors.append(collector)
+
+    def remove_collector(self, collector: Callable[[], Awaitable[None]]) -> None:
+        if collector in self._collectors:
+            self._collectors.remove(collector)
+
+    def render(self) -> str:
+        """Prometheus text exposition of every metric that has at least one series."""
+        blocks = [m.render() for _, m in sorted(self._metrics.items()) if m._children]
+        return "\n".join(blocks) + "\n"
+
+    async def collect_and_render(self) -> str:
+        for collector in list(self._collectors):
+            try:
+                await collector()
+            except Exception as e:
+                # A broken collector must not take the endpoint down
+                print(f"[metrics] Collector {getattr(collector, '__qualname__', collector)} failed: {e}\n{traceback.format_exc()}")
+        return self.render()
+
+
+REGISTRY = Registry()
+
+PROCESS_START = REGISTRY.gauge("gbpbot_process_start_time_seconds", "Unix time the process started")
+PROCESS_START.set(time.time())
+
+
+# -----------------------
+# Interactions
+# -----------------------
+INTERACTIONS = REGISTRY.counter("gbpbot_interactions_total", "Interactions received by type", ["type"])
+INTERACTION_SECONDS = REGISTRY.histogram(
+    "gbpbot_interaction_seconds",
+    "Seconds from interaction creation to the app command handler finishing",
+    ["command"],
+)
+
+
+def _since(created_at: datetime.datetime) -> float:
+    return (datetime.datetime.now(datetime.timezone.utc) - created_at).total_seconds()
+
+
+def instrument_bot(bot) -> None:
+    """Count every interaction and time slash command handling (call once, e.g. from setup_hook)."""
+
+    async def on_interaction(interaction):
+        INTERACTIONS.labels(type=interaction.type.name).inc()
+
+    async def on_app_command_completion(interaction, command):
+        INTERACTION_SECONDS.labels(command=command.qualified_name).observe(_since(interaction.created_at))
+
+    bot.add_listener(on_interaction)
+    bot.add_listener(on_app_command_completion)
+
+
+# -----------------------
+# HTTP Endpoint
+# -----------------------
+_CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+_runner: Optional[web.AppRunner] = None
+
+
+async def _handle_metrics(request: web.Request) -> web.Response:
+    text = await REGISTRY.collect_and_render()
+    return web.Response(body=text.encode("utf-8"), headers={"Content-Type": _CONTENT_TYPE})
+
+
+async def start_metrics_server(port: int = METRICS_PORT, host: str = METRICS_HOST) -> Optional[int]:
+    """
+    Serve GET /metrics on host:port (port 0 leaves the endpoint off). Returns the bound port, or None.
+    Safe to call more than once; only the first call starts a server.
+    """
+    global _runner
+    if _runner is not None:
+        return port
+    if not port:
+        return None
+    app = web.Application()
+    app.router.add_get("/metrics", _handle_metrics)
+    runner = web.AppRunner(app, access_log=None)
+    await runner.setup()
+    await web.TCPSite(runner, host, port).start()
+    _runner = runner
+    return port
+
+
+async def stop_metrics_server() -> None:
+    global _runner
+    runner, _runner = _runner, None
+    if runner is not None:
+        await runner.cleanup()
@@ -0,0 +1,451 @@
+# GBPBot - outbox.py
+# Version: 1.0.13
+# Last Updated: 2026-10-17
+# Notes:
+# - Durable delivery for reminder DMs and channel posts: senders enqueue rendered messages into the
+#   SQLite outbox table (db.enqueue_outbox) and OutboxWorker drains it in the background.
+# - Claimed rows are delivered through fanout.FanOut (bounded worker pool, per-target serialization;
+#   safe_send's token buckets do the pacing).
+# - Failed sends retry with exponential backoff (plus jitter); after OUTBOX_MAX_ATTEMPTS a row is dead-lettered.
+#   Permanent failures (Forbidden: DMs closed, NotFound: deleted channel/user) are dead-lettered on the first attempt;
+#   retrying them only adds invalid requests.
+# - Rows left "sending" by a crash or restart go back to "pending" when the worker starts.
+# - DM targets come from recipients.RecipientResolver (LRU + persisted DM channel ids), prefetched per batch,
+#   so steady-state deliveries make no fetch_user / create_dm calls.
+# - Observable: get_stats() reports sends/sec (last minute), totals, queue depth by status and resolver counters;
+#   the same figures are exported through metrics.py (deliveries inline, depth at scrape time; resolver counts by recipients.py).
+# -----------------------
+# CHANGE LOG
+# -----------------------
+# [2026-10-17] v1.0.13 - Rows dead-lettered for transient reasons release their sent_reminders ledger entry
+#                       (finish_outbox release_ledger); permanent failures keep it.
+# [2026-10-17] v1.0.12 - Recording delivery outcomes (finish_outbox) is retried with backoff; outcomes that still can't
+#                       be written are kept in memory and retried before the next claim (and on stop), instead of
+#                       leaving delivered rows "sending" to be re-sent after a restart.
+# [2026-10-17] v1.0.11 - Batches pass their due time (earliest claimed row's next_attempt_at) to FanOut.run, so
+#                       completion latency is recorded (gbpbot_outbox_batch_latency_seconds, drain summary).
+# [2026-10-17] v1.0.10 - DM resolver counts are exported by recipients.py as a counter (no longer gauges set here).
+# [2026-10-17] v1.0.9 - Per-batch FanOutStats are kept: batch count and busy time go into the drain summary
+#                      (sends/sec while sending), and batch durations into gbpbot_outbox_batch_seconds.
+# [2026-10-17] v1.0.8 - OUTBOX_MAX_ATTEMPTS default 5 -> 10: transient failures now retry for ~3h (past
+#                      REMINDER_CATCHUP_HOURS) instead of ~7.5 minutes, so an outage doesn't dead-letter a ledgered bucket.
+# [2026-10-17] v1.0.7 - Only a NotFound DM send (stale channel id) forgets the stored DM channel; that row is retried
+#                      with a fresh DM channel. Rate-limit rejections and transient errors keep the id.
+# [2026-10-17] v1.0.6 - Permanent failures (safe_send.PERMANENT_OUTCOMES, missing targets) dead-letter immediately.
+# [2026-10-17] v1.0.5 - Metrics: gbpbot_outbox_deliveries_total{outcome}, outbox depth by status and DM resolver counters.
+# [2026-10-17] v1.0.4 - DM targets resolved through RecipientResolver (persisted DM channel ids, one prefetch
+#                      per batch); a failed DM forgets the cached target; resolver stats in get_stats().
+# [2026-10-17] v1.0.3 - outbox_item(embed=...) also accepts a pre-rendered embed dict (shared templates).
+# [2026-10-17] v1.0.2 - outbox_item(announcement=...) marks a once-only channel broadcast.
+# [2026-10-17] v1.0.1 - outbox_item(ledger=...) marks an item as a once-only reminder (see db.enqueue_outbox).
+# [2026-10-17] v1.0.0 - Initial creation: outbox items, view registry, OutboxWorker (claim -> fan out -> record),
+#                      backoff/dead-letter, restart resume, stats and drain summaries.
+
+import asyncio
+import collections
+import datetime
+import os
+import random
+import time
+from typing import Callable, Dict, List, Optional
+
+import discord
+
+from db import claim_outbox, finish_outbox, get_outbox_counts, purge_outbox, requeue_inflight_outbox
+from fanout import FanOut
+from logger import robust_log
+from metrics import REGISTRY
+from recipients import RecipientResolver
+from safe_send import PERMANENT_OUTCOMES, send_outcome
+
+
+def _get_env(name: str):
+    v = os.getenv(name)
+    if v is None:
+        return None
+    v = v.strip()
+    return v if v else None
+
+
+def _get_float_env(name: str, default: float) -> float:
+    raw = _get_env(name)
+    if not raw:
+        return default
+    try:
+        return float(raw)
+    except ValueError:
+        return default
+
+
+# Concurrent deliveries per batch, and rows claimed per batch
+OUTBOX_WORKERS = max(1, int(_get_float_env("OUTBOX_WORKERS", 8)))
+OUTBOX_BATCH = max(1, int(_get_float_env("OUTBOX_BATCH", 200)))
+# Delivery attempts before a row is dead-lettered. With the default backoff, 10 attempts keep retrying for
+# ~3 hours, so a Discord outage rarely kills a reminder; one that still dies releases its sent_reminders entry
+# (catch-up or a later sabbat pass can queue it again). Permanent failures don't retry at all.
+OUTBOX_MAX_ATTEMPTS = max(1, int(_get_float_env("OUTBOX_MAX_ATTEMPTS", 10)))
+# Retry delay: base * 2^(attempt-1) seconds, capped
+OUTBOX_BACKOFF_BASE = max(1.0, _get_float_env("OUTBOX_BACKOFF_BASE", 30))
+OUTBOX_BACKOFF_MAX = max(OUTBOX_BACKOFF_BASE, _get_float_env("OUTBOX_BACKOFF_MAX", 3600))
+# Idle poll interval (enqueue wakes the worker immediately; polling picks up due retries)
+OUTBOX_POLL_SECONDS = max(0.5, _get_float_env("OUTBOX_POLL_SECONDS", 5))
+# How long delivered rows are kept before purging
+OUTBOX_RETENTION_HOURS = max(1.0, _get_float_env("OUTBOX_RETENTION_HOURS", 24))
+
+# Replaced with the recipient's name at delivery time (rendering doesn't need to fetch the user)
+USER_NAME_TOKEN = "{user_name}"
+
+# Window for the sends/sec figure
+_RATE_WINDOW = 60.0
+# Writing a batch's outcomes: attempts per try and the first retry delay (doubling)
+_FINISH_ATTEMPTS = 5
+_FINISH_BACKOFF = 0.5
+
+_DELIVERIES = REGISTRY.counter("gbpbot_outbox_deliveries_total", "Outbox delivery attempts by outcome", ["outcome"])
+_BATCH_SECONDS = REGISTRY.histogram("gbpbot_outbox_batch_seconds", "Time to deliver one claimed outbox batch")
+_BATCH_LATENCY = REGISTRY.histogram(
+    "gbpbot_outbox_batch_latency_seconds", "Seconds from a batch's earliest due row to its last send finishing"
+)
+_DEPTH = REGISTRY.gauge("gbpbot_outbox_rows", "Outbox rows by status", ["status"])
+
+
+# -----------------------
+# Items & Views
+# -----------------------
+# name -> factory(**args) returning a discord.ui.View; views can't be stored, so rows keep (name, args)
+_VIEW_FACTORIES: Dict[str, Callable[..., discord.ui.View]] = {}
+
+
+def register_view(name: str, factory: Callable[..., discord.ui.View]) -> None:
+    """Make a view buildable at delivery time from an outbox payload's {"name": ..., "args": {...}}."""
+    _VIEW_FACTORIES[name] = factory
+
+
+def outbox_item(
+    target_kind: str,
+    target_id: int,
+    kind: str,
+    content: Optional[str] = None,
+    embed=None,
+    view: Optional[str] = None,
+    ledger: Optional[tuple] = None,
+    announcement: Optional[tuple] = None,
+    **view_args
+) -> dict:
+    """
+    A rendered message ready for db.enqueue_outbox().
+    target_kind is "user" (DM) or "channel"; embed is a discord.Embed or its to_dict() form;
+    view names a register_view() factory, called with view_args.
+    ledger=(user_id, kind, local_date) queues the item only if that reminder wasn't queued before;
+    announcement=(hemisphere, sabbat, delta, local_date) does the same for a channel broadcast.
+    """
+    return {
+        "ledger": ledger,
+        "announcement": announcement,
+        "target_kind": target_kind,
+        "target_id": target_id,
+        "kind": kind,
+        "payload": {
+            "content": content,
+            "embed": embed.to_dict() if isinstance(embed, discord.Embed) else embed,
+            "view": {"name": view, "args": view_args} if view else None,
+        },
+    }
+
+
+def _backoff(attempts: int) -> float:
+    delay = min(OUTBOX_BACKOFF_MAX, OUTBOX_BACKOFF_BASE * (2 ** (attempts - 1)))
+    # Jitter keeps a burst of failures from retrying in lockstep
+    return delay * random.uniform(1.0, 1.25)
+
+
+# -----------------------
+# Worker
+# -----------------------
+class OutboxWorker:
+    """
+    Background task that drains the outbox.
+
+    Usage:
+        worker = OutboxWorker(bot); worker.start()
+        await enqueue_outbox(items); worker.notify()
+    """
+
+    def __init__(self, bot, workers: int = OUTBOX_WORKERS, batch_size: int = OUTBOX_BATCH):
+        self.bot = bot
+        self.batch_size = max(1, batch_size)
+        self.fanout = FanOut(concurrency=workers, bot=bot)
+        self.recipients = RecipientResolver(bot)
+        self._task: Optional[asyncio.Task] = None
+        self._wakeup = asyncio.Event()
+        self._recent = collections.deque()  # monotonic times of recent deliveries
+        self._last_purge = 0.0
+        # Totals since start
+        self.sent = 0
+        self.retried = 0
+        self.dead = 0
+        # Current busy period (reported once the queue is drained)
+        self._period = None
+        # Outcomes finish_outbox couldn't write yet (their rows are still "sending")
+        self._unrecorded: List[tuple] = []
+
+    def start(self) -> None:
+        if self._task is None or self._task.done():
+            self._task = asyncio.create_task(self._run(), name="gbpbot-outbox")
+        REGISTRY.add_collector(self._collect_metrics)
+
+    async def stop(self) -> None:
+        REGISTRY.remove_collector(self._collect_metrics)
+        task, self._task = self._task, None
+        if task is None:
+            return
+        task.cancel()
+        try:
+            await task
+        except asyncio.CancelledError:
+            pass
+        if self._unrecorded:
+            await self._record([])
+
+    def notify(self) -> None:
+        """Wake the worker now (call after enqueueing)."""
+        self._wakeup.set()
+
+    async def _run(self) -> None:
+        await self.bot.wait_until_ready()
+        try:
+            resumed = await requeue_inflight_outbox()
+            if resumed:
+                await robust_log(self.bot, f"📮 Outbox: resumed {resumed} message(s) interrupted by the last shutdown")
+        except Exception as e:
+            await robust_log(self.bot, "[ERROR] Outbox: failed to resume in-flight messages", exc=e)
+
+        while not self.bot.is_closed():
+            # Cleared before claiming so an enqueue during the batch still wakes the next wait
+            self._wakeup.clear()
+            try:
+                claimed = await self.drain_once()
+            except Exception as e:
+                claimed = 0
+                await robust_log(self.bot, "[ERROR] Outbox drain failed", exc=e)
+
+            if claimed:
+                continue
+            await self._finish_period()
+            await self._maybe_purge()
+            try:
+                await asyncio.wait_for(self._wakeup.wait(), OUTBOX_POLL_SECONDS)
+            except asyncio.TimeoutError:
+                pass
+
+    async def drain_once(self) -> int:
+        """Claim one batch of due rows, deliver them, record outcomes. Returns the number claimed."""
+        # Earlier outcomes first: claiming more while those rows are unrecorded would only grow the backlog
+        if self._unrecorded and not await self._record([]):
+            return 0
+        rows = await claim_outbox(self.batch_size)
+        if not rows:
+            return 0
+
+        if self._period is None:
+            self._period = {
+                "started": time.monotonic(), "sent": 0, "retried": 0, "dead": 0, "max_age": 0.0,
+                "batches": 0, "busy": 0.0, "max_latency": 0.0,
+            }
+        await self.recipients.prefetch([row[2] for row in rows if row[1] == "user"])
+        results: List[tuple] = []
+        jobs = [
+            ((row[1], row[2]), lambda r=row: self._deliver(r, results))
+            for row in rows
+        ]
+        due = datetime.datetime.fromtimestamp(min(row[7] for row in rows), datetime.timezone.utc)
+        stats = await self.fanout.run(f"outbox batch of {len(rows)}", jobs, due=due)
+        _BATCH_SECONDS.observe(stats.duration)
+        _BATCH_LATENCY.observe(stats.completion_latency)
+        self._period["batches"] += 1
+        self._period["busy"] += stats.duration
+        self._period["max_latency"] = max(self._period["max_latency"], stats.completion_latency)
+        await self._record(results)
+        try:
+            await self.recipients.flush()
+        except Exception as e:
+            await robust_log(self.bot, "[ERROR] Outbox: failed to save DM channel ids", exc=e)
+        return len(rows)
+
+    async def _record(self, results: List[tuple]) -> bool:
+        """
+        finish_outbox with retries (the outcomes are in memory). A row left "sending" is re-sent after a
+        restart, so outcomes that still can't be written are kept and retried before the next claim.
+        """
+        pending = self._unrecorded + results
+        if not pending:
+            return True
+        error = None
+        for attempt in range(1, _FINISH_ATTEMPTS + 1):
+            try:
+                await finish_outbox(pending)
+                self._unrecorded = []
+                return True
+            except Exception as e:
+                error = e
+                if attempt < _FINISH_ATTEMPTS:
+                    await asyncio.sleep(_FINISH_BACKOFF * 2 ** (attempt - 1))
+        self._unrecorded = pending
+        await robust_log(
+            self.bot,
+            f"[ERROR] Outbox: failed to record {len(pending)} delivery outcome(s) after {_FINISH_ATTEMPTS} attempts; "
+            "will retry before the next batch",
+            exc=error
+        )
+        return False
+
+    async def _deliver(self, row, results: List[tuple]) -> bool:
+        row_id, target_kind, target_id, kind, payload, attempts, created_at, due_at = row
+        error = None
+        permanent = False
+        try:
+            target = await self._resolve_target(target_kind, target_id)
+            if target is None:
+                error = f"{target_kind} {target_id} not found"
+                permanent = True
+            else:
+                message = self._build(payload, self._name(target_kind, target_id, target))
+                outcome = await send_outcome(target, bot=self.bot, **message)
+                if outcome != "sent":
+                    error = f"send {outcome}"
+                    permanent = outcome in PERMANENT_OUTCOMES
+                    if outcome == "not_found" and target_kind == "user":
+                        # The user exists (resolved above), so it's the DM channel id that's stale:
+                        # drop it and retry with a fresh DM channel
+                        self.recipients.forget(target_id)
+                        permanent = False
+        except Exception as e:
+            error = f"{e.__class__.__name__}: {e}"
+            # e.g. create_dm refused
+            permanent = isinstance(e, (discord.Forbidden, discord.NotFound))
+
+        now = time.time()
+        if error is None:
+            results.append((row_id, "sent", now, None, False))
+            self.sent += 1
+            _DELIVERIES.labels(outcome="sent").inc()
+            self._recent.append(time.monotonic())
+            self._period["sent"] += 1
+            self._period["max_age"] = max(self._period["max_age"], now - created_at)
+            return True
+
+        if permanent or attempts >= OUTBOX_MAX_ATTEMPTS:
+            # Never delivered: a transient death releases the reminder's ledger entry so it can be queued again
+            # (a permanent one keeps it; re-queuing to closed DMs would just fail again)
+            results.append((row_id, "dead", now, error, not permanent))
+            self.dead += 1
+            _DELIVERIES.labels(outcome="dead").inc()
+            self._period["dead"] += 1
+            if permanent:
+                await robust_log(
+                    self.bot,
+                    f"[WARN] Outbox: dropped {kind} to {target_kind} {target_id} ({error})"
+                )
+            else:
+                await robust_log(
+                    self.bot,
+                    f"[ERROR] Outbox: gave up on {kind} to {target_kind} {target_id} after {attempts} attempts ({error})"
+                )
+        else:
+            results.append((row_id, "pending", now + _backoff(attempts), error, False))
+            self.retried += 1
+            _DELIVERIES.labels(outcome="retry").inc()
+            self._period["retried"] += 1
+        return False
+
+    async def _resolve_target(self, target_kind: str, target_id: int):
+        if target_kind == "user":
+            return await self.recipients.dm_target(target_id)
+        if target_kind == "channel":
+            channel = self.bot.get_channel(target_id)
+            if channel is None:
+                try:
+                    channel = await self.bot.fetch_channel(target_id)
+                except discord.NotFound:
+                    return None
+            return channel
+        raise ValueError(f"unknown outbox target kind {target_kind!r}")
+
+    def _name(self, target_kind: str, target_id: int, target) -> str:
+        if target_kind == "user":
+            return self.recipients.display_name(target_id)
+        return getattr(target, "name", "")
+
+    @staticmethod
+    def _build(payload: dict, name: str) -> dict:
+        """safe_send keyword arguments for a stored payload, with USER_NAME_TOKEN filled in."""
+        content = payload.get("content")
+        if content:
+            content = content.replace(USER_NAME_TOKEN, name)
+
+        embed = None
+        if payload.get("embed"):
+            embed = discord.Embed.from_dict(payload["embed"])
+            if embed.title:
+                embed.title = embed.title.replace(USER_NAME_TOKEN, name)
+            if embed.description:
+                embed.description = embed.description.replace(USER_NAME_TOKEN, name)
+
+        view = None
+        view_spec = payload.get("view")
+        if view_spec:
+            factory = _VIEW_FACTORIES.get(view_spec["name"])
+            if factory is not None:
+                view = factory(**view_spec.get("args", {}))
+        return {"content": content, "embed": embed, "view": view}
+
+    async def _finish_period(self) -> None:
+        period, self._period = self._period, None
+        if period is None:
+            return
+        elapsed = time.monotonic() - period["started"]
+        rate = period["sent"] / elapsed if elapsed > 0 else float(period["sent"])
+        # Rate while batches were actually being delivered (excludes waits between retries)
+        busy_rate = period["sent"] / period["busy"] if period["busy"] > 0 else float(period["sent"])
+        counts = await get_outbox_counts()
+        await robust_log(
+            self.bot,
+            f"📬 Outbox drained: {period['sent']} sent, {period['retried']} retrying, {period['dead']} dead "
+            f"in {elapsed:.1f}s ({rate:.1f}/s; {period['batches']} batches, {busy_rate:.1f}/s while sending) "
+            f"| oldest delivered waited {period['max_age']:.1f}s, "
+            f"slowest batch done {period['max_latency']:.1f}s after due "
+            f"| pending {counts.get('pending', 0)}, dead {counts.get('dead', 0)}"
+        )
+
+    async def _maybe_purge(self) -> None:
+        now = time.time()
+        if now - self._last_purge < 3600:
+            return
+        self._last_purge = now
+        try:
+            await purge_outbox(now - OUTBOX_RETENTION_HOURS * 3600)
+        except Exception as e:
+            await robust_log(self.bot, "[ERROR] Outbox purge failed", exc=e)
+
+    def sends_per_second(self) -> float:
+        """Deliveries per second over the last minute."""
+        cutoff = time.monotonic() - _RATE_WINDOW
+        while self._recent and self._recent[0] < cutoff:
+            self._recent.popleft()
+        return len(self._recent) / _RATE_WINDOW
+
+    async def _collect_metrics(self) -> None:
+        counts = await get_outbox_counts()
+        for status in ("pending", "sending", "sent", "dead"):
+            _DEPTH.labels(status=status).set(counts.get(status, 0))
+
+    async def get_stats(self) -> dict:
+        """Throughput, totals since start, queue depth by status and DM resolution counters."""
+        return {
+            "sends_per_sec": round(self.sends_per_second(), 2),
+            "sent": self.sent,
+            "retried": self.retried,
+            "dead": self.dead,
+            "depth": await get_outbox_counts(),
+            "recipients": self.recipients.stats(),
+        }
@@ -0,0 +1,144 @@
+# GBPBot - profiler.py
+# Version: 1.0.0
+# Last Updated: 2026-10-17
+# Notes:
+# - On-demand cProfile of the next N calls of a coroutine (a loop iteration, an outbox batch, a slash command).
+# - Nothing is installed while idle: a session swaps the target attribute for a profiling wrapper and puts the
+#   original back when it finishes (or times out), so there is no overhead when no session is running.
+# - cProfile follows the event loop thread, so while a profiled call awaits, other tasks that run in between
+#   are captured too. Overlapping calls share one enable/disable window.
+# - One session at a time (cProfile can't nest).
+# - Results: top cumulative-time functions as text plus the raw stats (marshal; loadable with pstats.Stats).
+# -----------------------
+# CHANGE LOG
+# -----------------------
+# [2026-10-17] v1.0.0 - Initial creation: ProfileSession (attribute patching, call counting, timeout),
+#                      hotspot formatting and .prof export.
+
+import asyncio
+import cProfile
+import functools
+import io
+import marshal
+import os
+import time
+from typing import List, Optional, Tuple
+
+# Only one session may run at a time
+_active: Optional["ProfileSession"] = None
+
+
+class ProfileSession:
+    """
+    Profiles the next `count` calls of owner.<attr> (an async callable).
+
+    Usage:
+        session = ProfileSession(cog, "send_due_reminders", count=3)
+        await session.run(timeout=300)
+        text = session.hotspots(); data = session.dump()
+    """
+
+    def __init__(self, owner, attr: str, count: int = 1, label: Optional[str] = None):
+        self.owner = owner
+        self.attr = attr
+        self.count = max(1, count)
+        self.label = label or attr
+        self.profile = cProfile.Profile()
+        self.started = 0        # calls entered while profiling
+        self.finished = 0       # profiled calls completed
+        self.wall = 0.0         # summed wall time of profiled calls
+        self._inflight = 0
+        self._done: Optional[asyncio.Future] = None
+        self._had_own = False
+        self._original = None
+
+    # Patching
+    def _install(self) -> None:
+        global _active
+        if _active is not None:
+            raise RuntimeError(f"a profile of {_active.label} is already running")
+        # Instance attributes (e.g. Loop.coro) are put back as-is; methods found on the class are un-shadowed
+        self._had_own = self.attr in vars(self.owner)
+        self._original = getattr(self.owner, self.attr)
+        setattr(self.owner, self.attr, self._wrap(self._original))
+        _active = self
+
+    def _uninstall(self) -> None:
+        global _active
+        if _active is not self:
+            return
+        if self._had_own:
+            setattr(self.owner, self.attr, self._original)
+        else:
+            delattr(self.owner, self.attr)
+        _active = None
+
+    def _wrap(self, fn):
+        @functools.wraps(fn)
+        async def profiled(*args, **kwargs):
+            if self.started >= self.count:
+                return await fn(*args, **kwargs)
+            self.started += 1
+            if self._inflight == 0:
+                self.profile.enable()
+            self._inflight += 1
+            start = time.perf_counter()
+            try:
+                return await fn(*args, **kwargs)
+            finally:
+                self.wall += time.perf_counter() - start
+                self._inflight -= 1
+                if self._inflight == 0:
+                    self.profile.disable()
+                self.finished += 1
+                if self.finished >= self.count:
+                    self._finish()
+        return profiled
+
+    def _finish(self) -> None:
+        self._uninstall()
+        if self._done is not None and not self._done.done():
+            self._done.set_result(None)
+
+    async def run(self, timeout: float) -> bool:
+        """Install, wait for `count` calls (or the timeout), uninstall. Returns False if it timed out."""
+        self._done = asyncio.get_running_loop().create_future()
+        self._install()
+        try:
+            await asyncio.wait_for(asyncio.shield(self._done), timeout)
+            return True
+        except asyncio.TimeoutError:
+            return False
+        finally:
+            self._uninstall()
+            if self._inflight:
+                # Timed out mid-call: stop collecting now
+                self.profile.disable()
+
+    # Results
+    def _stats(self) -> dict:
+        """{(file, line, function): (primitive calls, calls, own s, cumulative s, callers)}; empty if nothing ran."""
+        self.profile.create_stats()
+        return self.profile.stats
+
+    def top(self, limit: int = 15) -> List[Tuple[float, float, int, str]]:
+        """(cumulative s, own s, calls, "file:line(function)") sorted by cumulative time."""
+        rows = []
+        for (filename, line, name), (_, ncalls, tottime, cumtime, _) in self._stats().items():
+            where = f"{os.path.basename(filename)}:{line}" if line else "~"
+            rows.append((cumtime, tottime, ncalls, f"{where}({name})"))
+        rows.sort(reverse=True)
+        return rows[:limit]
+
+    def hotspots(self, limit: int = 15, width: int = 60) -> str:
+        """Fixed-width hotspot table (fits an embed description)."""
+        lines = [f"{'cum s':>8} {'own s':>8} {'calls':>7}  function"]
+        for cumtime, tottime, ncalls, label in self.top(limit):
+            if len(label) > width:
+                label = "…" + label[-(width - 1):]
+            lines.append(f"{cumtime:8.3f} {tottime:8.3f} {ncalls:7d}  {label}")
+        return "\n".join(lines)
+
+    def dump(self) -> io.BytesIO:
+        """Raw stats in pstats' file format (pstats.Stats("file.prof"), snakeviz, etc.)."""
+        return io.BytesIO(marshal.dumps(self._stats()))
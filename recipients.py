@@ -0,0 +1,151 @@
+# GBPBot - recipients.py
+# Version: 1.0.2
+# Last Updated: 2026-10-17
+# Notes:
+# - Resolves a user id to something DM-able without REST calls in the common case.
+# - Lookup order: in-memory LRU -> users.dm_channel_id (persisted) -> bot.get_user / fetch_user + create_dm.
+# - Persisted ids are sent to via bot.get_partial_messageable(..., type=private): no user object, no DM creation.
+# - Newly learned DM channel ids are written back in one transaction per batch (flush()).
+# - Lookups are counted by source in gbpbot_dm_resolutions_total (metrics.py).
+# - The outbox calls forget() only when a send returns NotFound (the DM channel id is stale); rate-limit
+#   rejections and transient errors keep the id.
+# -----------------------
+# CHANGE LOG
+# -----------------------
+# [2026-10-17] v1.0.2 - Lookups counted in gbpbot_dm_resolutions_total{source} (cache/stored/fetch_user/create_dm).
+# [2026-10-17] v1.0.1 - Notes: forget() is for stale DM channel ids only.
+# [2026-10-17] v1.0.0 - Initial creation: RecipientResolver (LRU + persisted DM channel ids), prefetch/flush, stats.
+
+import os
+from collections import OrderedDict
+from typing import Dict, Iterable, Optional
+
+import discord
+
+from db import get_dm_channel_ids, save_dm_channel_ids
+from metrics import REGISTRY
+
+
+def _get_env(name: str):
+    v = os.getenv(name)
+    if v is None:
+        return None
+    v = v.strip()
+    return v if v else None
+
+
+def _get_int_env(name: str, default: int) -> int:
+    raw = _get_env(name)
+    if not raw:
+        return default
+    try:
+        return int(raw)
+    except ValueError:
+        return default
+
+
+# Resolved DM targets kept in memory (0 disables the LRU; persisted ids are still used)
+DM_CACHE_SIZE = max(0, _get_int_env("DM_CACHE_SIZE", 10000))
+
+_RESOLUTIONS = REGISTRY.counter("gbpbot_dm_resolutions_total", "DM target lookups by source", ["source"])
+_FROM_CACHE = _RESOLUTIONS.labels(source="cache")
+_FROM_STORED = _RESOLUTIONS.labels(source="stored")
+_FETCH_USER = _RESOLUTIONS.labels(source="fetch_user")
+_CREATE_DM = _RESOLUTIONS.labels(source="create_dm")
+
+
+class RecipientResolver:
+    """
+    user_id -> DM-able target.
+
+    Usage (per outbox batch):
+        await resolver.prefetch(user_ids)       # one DB query for ids not in the LRU
+        target = await resolver.dm_target(uid)  # usually no REST call
+        await resolver.flush()                  # persist newly created DM channel ids
+    """
+
+    def __init__(self, bot, capacity: int = DM_CACHE_SIZE):
+        self.bot = bot
+        self.capacity = capacity
+        self._targets: "OrderedDict[int, discord.abc.Messageable]" = OrderedDict()
+        self._stored: Dict[int, int] = {}        # prefetched dm_channel_ids for the current batch
+        self._pending: Dict[int, Optional[int]] = {}  # writes waiting for flush()
+        self.hits = 0
+        self.stored_hits = 0
+        self.fetch_user_calls = 0
+        self.create_dm_calls = 0
+
+    def _remember(self, user_id: int, target) -> None:
+        if self.capacity <= 0:
+            return
+        self._targets[user_id] = target
+        self._targets.move_to_end(user_id)
+        while len(self._targets) > self.capacity:
+            self._targets.popitem(last=False)
+
+    async def prefetch(self, user_ids: Iterable[int]) -> None:
+        """Load persisted DM channel ids for every user not already in the LRU, in one query."""
+        missing = [uid for uid in user_ids if uid not in self._targets]
+        self._stored = await get_dm_channel_ids(missing) if missing else {}
+
+    async def dm_target(self, user_id: int) -> Optional[discord.abc.Messageable]:
+        """A DM channel (or partial) for the user, or None if the user doesn't exist."""
+        target = self._targets.get(user_id)
+        if target is not None:
+            self._targets.move_to_end(user_id)
+            self.hits += 1
+            _FROM_CACHE.inc()
+            return target
+
+        channel_id = self._stored.get(user_id)
+        if channel_id is not None:
+            self.stored_hits += 1
+            _FROM_STORED.inc()
+            target = self.bot.get_partial_messageable(channel_id, type=discord.ChannelType.private)
+            self._remember(user_id, target)
+            return target
+
+        user = self.bot.get_user(user_id)
+        if user is None:
+            self.fetch_user_calls += 1
+            _FETCH_USER.inc()
+            try:
+                user = await self.bot.fetch_user(user_id)
+            except discord.NotFound:
+                return None
+
+        target = user.dm_channel
+        if target is None:
+            self.create_dm_calls += 1
+            _CREATE_DM.inc()
+            target = await user.create_dm()
+        self._pending[user_id] = target.id
+        self._remember(user_id, target)
+        return target
+
+    def display_name(self, user_id: int) -> str:
+        """The user's name if the gateway cache has it, else a mention (renders as the name in Discord)."""
+        user = self.bot.get_user(user_id)
+        return user.name if user is not None else f"<@{user_id}>"
+
+    def forget(self, user_id: int) -> None:
+        """Drop a stale DM channel (send returned NotFound) so the next attempt resolves it again and clears the stored id."""
+        self._targets.pop(user_id, None)
+        self._stored.pop(user_id, None)
+        self._pending[user_id] = None
+
+    async def flush(self) -> None:
+        """Persist DM channel ids learned (or invalidated) since the last flush."""
+        pending, self._pending = self._pending, {}
+        if pending:
+            await save_dm_channel_ids(pending.items())
+
+    def stats(self) -> dict:
+        return {
+            "size": len(self._targets),
+            "capacity": self.capacity,
+            "hits": self.hits,
+            "stored_hits": self.stored_hits,
+            "fetch_user_calls": self.fetch_user_calls,
+            "create_dm_calls": self.create_dm_calls,
+        }
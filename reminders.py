@@ -1,14 +1,74 @@
 # GBPBot - reminders.py
-# Version: 1.10.2
-# Last Updated: 2026-01-18
+# Version: 1.22.2
+# Last Updated: 2026-10-17
 # Notes:
 # - Flat-structure refactor: imports no longer reference utils/.
 # - Keeps env-driven SABBAT_CHANNEL_ID for Discloud deployments.
 # - Keeps portable date formatting and moon-phase bugfix.
 # - Loop starts made idempotent to avoid "already running" errors.
+# - daily_loop sleeps until the next (region timezone, hour) bucket is due (scheduler.py) and processes one bucket per firing.
+# - Reminders are rendered here and enqueued into the durable outbox; outbox.OutboxWorker delivers them.
+# - Every reminder carries a sent_reminders ledger key, so restarts and reruns never queue it twice.
+# - sabbat_loop groups subscribers by (hemisphere, region-local date); announcements are computed once per group.
+# - Reminder buttons are persistent DynamicItems (custom_id "gbp:rem:<action>:<region>") registered once in setup().
+# - Daily reminder embeds share a per-(region, local date) template; only the quote/prompt are added per user.
+# - Moon phases and next full moon come from the precomputed lunar calendar (lunar.py), 8 phases.
+# - Sabbat dates are astronomical (sabbat_calendar.py: ephem solstices/equinoxes/cross-quarters, per timezone).
+# - SABBAT_CHANNEL_ID gets each announcement once, from a broadcast stage separate from the DM fan-out.
+# - On startup daily_loop resumes from its persisted cursor (up to REMINDER_CATCHUP_HOURS back) to catch up missed buckets.
+# - Loop iterations are timed (gbpbot_loop_seconds, excluding daily_loop's sleep) and queued reminders counted (metrics.py).
 # -----------------------
 # CHANGE LOG
 # -----------------------
+# [2026-10-17] v1.22.2 - daily_loop only advances (and persists) its cursor once a bucket's reminders are queued;
+#                       a failed bucket is retried after DAILY_RETRY_SECONDS instead of being skipped.
+# [2026-10-17] v1.22.1 - Removed get_sabbat_dates_for_hemisphere (unused; callers use sabbat_calendar directly).
+# [2026-10-17] v1.22.0 - Metrics: daily_loop/sabbat_loop iteration time and failures, reminders queued/skipped by kind.
+# [2026-10-17] v1.21.0 - ReminderButtons is built from ReminderButton DynamicItems whose custom_ids encode the region;
+#                       registered once with bot.add_dynamic_items() in setup(), so buttons keep working after a
+#                       restart and the view store no longer grows with every message sent.
+#                     - reminder_view(region) reuses one view per region (used by the outbox and /reminder).
+# [2026-10-17] v1.20.0 - Daily reminders render from a cached (region, local date) template (title, colour, greeting,
+#                       date/moon and region lines built once per bucket); per user only the description is joined.
+#                     - Quote/prompt corpora fetched once per bucket; no discord.Embed object or prefs dict per recipient.
+#                     - render_daily_reminder() is a module-level function (benchmarks.py render).
+# [2026-10-17] v1.19.0 - moon_phase_emoji/next_full_moon_for_tz are O(1) lookups in lunar.lunar_calendar
+#                       (no ephem.Moon per reminder, no full-moon search per click).
+#                     - Phase emoji now covers all 8 phases (first/last quarter and gibbous were never shown)
+#                       and is evaluated for the region's local date.
+# [2026-10-17] v1.18.0 - Sabbat dates come from sabbat_calendar (true solstice/equinox/cross-quarter instants,
+#                       local date per region timezone) instead of fixed month/day constants.
+#                     - Next Sabbat button and sabbat_loop use O(1) calendar lookups; groups are keyed by
+#                       (hemisphere, tz, local date); channel broadcasts use UTC dates.
+#                     - Calendar is loaded off the event loop in cog_load.
+# [2026-10-17] v1.17.0 - Fixed SABBAT_CHANNEL_ID receiving the same announcement once per subscriber:
+#                       broadcast_sabbat_announcements() queues one post per (hemisphere, sabbat, delta, date),
+#                       deduplicated by a persisted sabbat_announcements marker, independent of the DM stage.
+# [2026-10-17] v1.16.0 - sabbat_loop: one get_subscribed_ids_by_region() query; subscribers grouped by
+#                       (hemisphere, local date in the region's timezone) instead of server-local date.today().
+#                     - sabbat_announcements(hemisphere, date) computes the 7/1/0-day notices once per group (cached)
+#                       and each notice is queued for exactly that group's recipients.
+# [2026-10-17] v1.15.0 - Daily reminders ledgered as (user, "daily", local date), sabbat DMs as
+#                       (user, "sabbat:<name>:<days before>", local date); duplicates are skipped at enqueue.
+#                     - daily_loop persists its bucket cursor (bot_state) and on startup replays buckets missed
+#                       during downtime, up to REMINDER_CATCHUP_HOURS (default 3; 0 disables).
+#                     - Ledger entries older than 7 days are purged once a day.
+# [2026-10-17] v1.14.0 - Daily and sabbat reminders are enqueued into the SQLite outbox (one transaction per batch)
+#                       and delivered by the cog's OutboxWorker (retries with backoff, dead-letter, resume after restart).
+#                     - send_daily_reminder/send_sabbat_reminders replaced by render_daily_reminder/render_sabbat_reminders.
+#                     - ReminderButtons registered as outbox view "reminder_buttons" (rebuilt from the region at delivery).
+# [2026-10-17] v1.13.0 - Daily and sabbat DMs go through fanout.FanOut (bounded concurrency, global pacing)
+#                       instead of one-after-another awaits; per-batch throughput/latency logged.
+#                     - send_daily_reminder returns True/False/None (sent/failed/not due).
+# [2026-10-17] v1.12.0 - daily_loop no longer wakes every minute: it sleeps until the next (region tz, local hour)
+#                       bucket from scheduler.next_bucket() and processes exactly that bucket (DST-aware).
+#                     - send_daily_reminder(bucket=...) uses the bucket's local date instead of re-checking the clock.
+# [2026-10-17] v1.11.2 - Daily reminders and Random Quote/Prompt button use db.random_quote()/random_prompt()
+#                       (cached corpus) instead of re-reading both tables per recipient/click.
+# [2026-10-17] v1.11.1 - Day filtering uses reminder_days_mask (weekday bit in SQL; no per-row string splitting).
+# [2026-10-17] v1.11.0 - daily_loop no longer scans every subscriber each minute:
+#                       one get_due_users(region, hour, weekday) query per region entering a new local hour.
+#                     - Each region/hour is processed once (previously reminders repeated every minute of the hour).
 # [2026-01-18] v1.10.2 - Flat-structure imports: logger/safe_send/constants.
 #                     - Make loop starts idempotent (prevents double-start errors).
 # [2026-01-18] v1.10.1 - Discloud-ready config: SABBAT_CHANNEL_ID now loads from env var (optional).
@@ -17,18 +77,29 @@
 # [2025-09-21 18:00 BST] v1.10.0 - Added hemisphere-aware sabbat reminders for DMs and optional channel posts.
 
 import os
+import asyncio
+import functools
+import random
+import time
 import discord
 from discord.ext import commands, tasks
 import datetime
-import ephem
 from zoneinfo import ZoneInfo
-import random
 
-from db import get_user_preferences, get_all_quotes, get_all_journal_prompts, get_all_subscribed_users
+from db import (
+    get_user_preferences, random_quote, random_prompt, get_all_quotes, get_all_journal_prompts,
+    DEFAULT_QUOTES, DEFAULT_PROMPTS, get_subscribed_ids_by_region, get_due_users,
+    enqueue_outbox, purge_sent_reminders, get_state, set_state
+)
 from logger import robust_log
 from safe_send import safe_send
 from version_tracker import GBPBot_version, get_file_version
-from constants import REGIONS, SABBATS_HEMISPHERES
+from constants import REGIONS
+from scheduler import ReminderBucket, cursor_at, next_bucket, dump_cursor, load_cursor
+from sabbat_calendar import sabbat_calendar
+from lunar import lunar_calendar
+from outbox import OutboxWorker, outbox_item, register_view, USER_NAME_TOKEN
+from metrics import REGISTRY
 
 # -----------------------
 # Optional Config (Environment)
@@ -43,6 +114,26 @@ try:
 except ValueError:
     SABBAT_CHANNEL_ID = None
 
+# How far back daily_loop replays missed (region, hour) buckets after downtime (0 disables catch-up)
+_CATCHUP_RAW = os.getenv("REMINDER_CATCHUP_HOURS", "").strip()
+try:
+    REMINDER_CATCHUP_HOURS = max(0.0, float(_CATCHUP_RAW)) if _CATCHUP_RAW else 3.0
+except ValueError:
+    REMINDER_CATCHUP_HOURS = 3.0
+
+# bot_state key holding the last processed bucket
+DAILY_CURSOR_STATE = "daily_cursor"
+# Ledger entries are only needed while a reminder could still be re-queued
+LEDGER_RETENTION_DAYS = 7
+# Pause before retrying a bucket whose query/enqueue failed (its cursor isn't advanced)
+DAILY_RETRY_SECONDS = 30
+
+LOOP_SECONDS = REGISTRY.histogram("gbpbot_loop_seconds", "Loop iteration run time (daily_loop excludes its sleep)", ["loop"])
+LOOP_ERRORS = REGISTRY.counter("gbpbot_loop_errors_total", "Loop iterations that failed", ["loop"])
+REMINDERS_QUEUED = REGISTRY.counter(
+    "gbpbot_reminders_queued_total", "Reminders enqueued (queued) or skipped as already sent (duplicate)", ["kind", "result"]
+)
+
 # -----------------------
 # Helpers
 # -----------------------
@@ -51,50 +142,119 @@ def format_date(d: datetime.date) -> str:
     return d.strftime("%d %B %Y").lstrip("0")
 
 def next_full_moon_for_tz(tz_name: str) -> datetime.date:
-    now = datetime.datetime.now(ZoneInfo(tz_name))
-    fm_utc = ephem.next_full_moon(now).datetime()
-    return fm_utc.astimezone(ZoneInfo(tz_name)).date()
-
-def moon_phase_emoji(date_val: datetime.date) -> str:
-    moon = ephem.Moon(ephem.Date(date_val))
-    phase = moon.phase
-    if phase < 10:
-        return "🌑"
-    elif phase < 50:
-        return "🌒"
-    elif phase < 60:
-        return "🌕"
-    elif phase < 90:
-        return "🌘"
-    else:
-        return "🌑"
-
-def get_sabbat_dates_for_hemisphere(hemisphere: str, year: int):
-    return {name: datetime.date(year, m, d) for name, (m, d) in SABBATS_HEMISPHERES[hemisphere].items()}
+    today = datetime.datetime.now(ZoneInfo(tz_name)).date()
+    return lunar_calendar.next_full_moon(tz_name, today)
+
+def moon_phase_emoji(date_val: datetime.date, tz_name: str = "UTC") -> str:
+    return lunar_calendar.phase_emoji(date_val, tz_name)
+
+@functools.lru_cache(maxsize=64)
+def _daily_template(region: str, local_date: datetime.date):
+    """
+    Static parts of a region's daily reminder on one local date: (embed dict without description,
+    description header). Shared by every recipient in the bucket; the name is stamped at delivery.
+    """
+    region_data = REGIONS[region]
+    tz = region_data["tz"]
+    base = {
+        "type": "rich",
+        "title": f"{region_data['emoji']} Daily Reminder",
+        "color": region_data.get("color", 0x2F3136),
+    }
+    header = (
+        f"Good morning, {USER_NAME_TOKEN}! 🌞\n"
+        f"Today is **{format_date(local_date)}** {moon_phase_emoji(local_date, tz)}\n"
+        f"Region: **{region_data['name']}** | Timezone: **{tz}**\n\n"
+    )
+    return base, header
+
+def render_daily_reminder(user_id: int, region: str, local_date: datetime.date, quote: str, prompt: str) -> dict:
+    """One user's daily reminder as an outbox item, built from the cached (region, local date) template."""
+    base, header = _daily_template(region, local_date)
+    embed = dict(base)
+    embed["description"] = f"{header}💫 Quote: {quote}\n📝 Journal Prompt: {prompt}"
+    return outbox_item(
+        "user", user_id, "daily", embed=embed,
+        view="reminder_buttons", region=region,
+        ledger=(user_id, "daily", local_date.isoformat())
+    )
+
+# Days before a sabbat that get an announcement
+SABBAT_NOTICE_DAYS = (7, 1, 0)
+
+@functools.lru_cache(maxsize=64)
+def sabbat_announcements(hemisphere: str, tz: str, local_date: datetime.date):
+    """
+    (sabbat name, days before, message) for every announcement due on local_date in the hemisphere/timezone.
+    Cached: computed once per group per local day, however many subscribers receive it.
+    """
+    announcements = []
+    for name, delta, _ in sabbat_calendar.announcements(hemisphere, tz, local_date, SABBAT_NOTICE_DAYS):
+        if delta == 7:
+            msg = f"🪐 Upcoming Sabbat ({hemisphere.title()} Hemisphere): **{name}** in 7 days"
+        elif delta == 1:
+            msg = f"🌿 **{name}** is tomorrow! ({hemisphere.title()} Hemisphere Sabbat)"
+        else:
+            msg = f"🔥 Happy **{name}**! Today is the Sabbat in the {hemisphere.title()} Hemisphere 🔥"
+        announcements.append((name, delta, msg))
+    return tuple(announcements)
 
 # -----------------------
 # Reminder Buttons
 # -----------------------
-class ReminderButtons(discord.ui.View):
-    def __init__(self, region_data):
-        super().__init__(timeout=None)
-        self.region_data = region_data
-
-    @discord.ui.button(label="Next Sabbat", style=discord.ButtonStyle.primary)
-    async def next_sabbat(self, interaction: discord.Interaction, button: discord.ui.Button):
+# Short, custom_id-safe keys for region names (custom_ids carry the region across restarts)
+REGION_SLUGS = {name: name.lower().replace(" & ", "-").replace(" ", "-") for name in REGIONS}
+_SLUG_REGIONS = {slug: name for name, slug in REGION_SLUGS.items()}
+
+# action -> (label, style), in button order
+_REMINDER_ACTIONS = {
+    "sabbat": ("Next Sabbat", discord.ButtonStyle.primary),
+    "moon": ("Next Full Moon", discord.ButtonStyle.secondary),
+    "quote": ("Random Quote / Prompt", discord.ButtonStyle.success),
+}
+
+
+class ReminderButton(
+    discord.ui.DynamicItem[discord.ui.Button],
+    template=r"gbp:rem:(?P<action>sabbat|moon|quote):(?P<region>[a-z-]+)"
+):
+    """
+    One reminder button; its custom_id encodes the action and region (e.g. "gbp:rem:moon:europe").
+    Registered once via bot.add_dynamic_items(), so clicks work after a restart and the view store
+    keeps a single pattern instead of an entry per sent message.
+    """
+
+    def __init__(self, action: str, region: str):
+        label, style = _REMINDER_ACTIONS[action]
+        super().__init__(
+            discord.ui.Button(label=label, style=style, custom_id=f"gbp:rem:{action}:{REGION_SLUGS[region]}")
+        )
+        self.action = action
+        self.region = region
+
+    @classmethod
+    async def from_custom_id(cls, interaction: discord.Interaction, item: discord.ui.Button, match):
+        return cls(match["action"], _SLUG_REGIONS[match["region"]])
+
+    async def callback(self, interaction: discord.Interaction):
+        region_data = REGIONS[self.region]
+        if self.action == "sabbat":
+            await self.next_sabbat(interaction, region_data)
+        elif self.action == "moon":
+            await self.next_moon(interaction, region_data)
+        else:
+            await self.random_quote_prompt(interaction)
+
+    @staticmethod
+    async def next_sabbat(interaction: discord.Interaction, region_data: dict):
         try:
-            tz = self.region_data["tz"]
-            emoji = self.region_data["emoji"]
-            region_name = self.region_data["name"]
-            hemisphere = self.region_data.get("hemisphere", "north")
+            tz = region_data["tz"]
+            emoji = region_data["emoji"]
+            region_name = region_data["name"]
+            hemisphere = region_data.get("hemisphere", "north")
 
             today = datetime.datetime.now(ZoneInfo(tz)).date()
-            sabbats = get_sabbat_dates_for_hemisphere(hemisphere, today.year)
-            upcoming = [(n, d) for n, d in sabbats.items() if d >= today]
-            if not upcoming:
-                upcoming = list(sabbats.items())
-
-            name, date_val = sorted(upcoming, key=lambda x: x[1])[0]
+            name, date_val = sabbat_calendar.next_sabbat(hemisphere, tz, today)
             await safe_send(
                 interaction,
                 f"{emoji} Next Sabbat: **{name}** on **{format_date(date_val)}**\n"
@@ -106,16 +266,16 @@ class ReminderButtons(discord.ui.View):
             await robust_log(interaction.client, "[ERROR] Failed Next Sabbat button", exc=e)
             await safe_send(interaction, "⚠️ Could not fetch next Sabbat.", ephemeral=True, view=None)
 
-    @discord.ui.button(label="Next Full Moon", style=discord.ButtonStyle.secondary)
-    async def next_moon(self, interaction: discord.Interaction, button: discord.ui.Button):
+    @staticmethod
+    async def next_moon(interaction: discord.Interaction, region_data: dict):
         try:
-            tz = self.region_data["tz"]
-            emoji = self.region_data["emoji"]
-            region_name = self.region_data["name"]
+            tz = region_data["tz"]
+            emoji = region_data["emoji"]
+            region_name = region_data["name"]
 
             fm = next_full_moon_for_tz(tz)
             now_local = datetime.datetime.now(ZoneInfo(tz)).date()
-            phase_emoji = moon_phase_emoji(now_local)
+            phase_emoji = moon_phase_emoji(now_local, tz)
 
             await safe_send(
                 interaction,
@@ -128,25 +288,55 @@ class ReminderButtons(discord.ui.View):
             await robust_log(interaction.client, "[ERROR] Failed Next Full Moon button", exc=e)
             await safe_send(interaction, "⚠️ Could not fetch next full moon.", ephemeral=True, view=None)
 
-    @discord.ui.button(label="Random Quote / Prompt", style=discord.ButtonStyle.success)
-    async def random_quote_prompt(self, interaction: discord.Interaction, button: discord.ui.Button):
+    @staticmethod
+    async def random_quote_prompt(interaction: discord.Interaction):
         try:
-            quote_list = await get_all_quotes()
-            prompt_list = await get_all_journal_prompts()
-            quote = random.choice(quote_list) if quote_list else "No quotes available."
-            prompt = random.choice(prompt_list) if prompt_list else "No journal prompts available."
+            quote = await random_quote()
+            prompt = await random_prompt()
             content = f"💫 Quote: {quote}\n📝 Journal Prompt: {prompt}"
             await safe_send(interaction, content, ephemeral=True, view=None)
         except Exception as e:
             await robust_log(interaction.client, "[ERROR] Failed Random Quote/Prompt button", exc=e)
             await safe_send(interaction, "⚠️ Could not fetch quote or journal prompt.", ephemeral=True, view=None)
 
+
+class ReminderButtons(discord.ui.View):
+    """The three reminder buttons for a region. Prefer reminder_view(), which reuses one instance per region."""
+
+    def __init__(self, region_data):
+        super().__init__(timeout=None)
+        self.region_data = region_data
+        for action in _REMINDER_ACTIONS:
+            self.add_item(ReminderButton(action, region_data["name"]))
+
+
+_REMINDER_VIEWS = {}
+
+def reminder_view(region: str) -> ReminderButtons:
+    """
+    Shared ReminderButtons for a region. Every item is a DynamicItem, so sending it never adds
+    per-message entries to discord.py's view store; memory stays flat however many reminders go out.
+    """
+    view = _REMINDER_VIEWS.get(region)
+    if view is None:
+        view = _REMINDER_VIEWS[region] = ReminderButtons(REGIONS[region])
+    return view
+
+
+# Outbox rows store the region name; the view is attached when the message is delivered
+register_view("reminder_buttons", reminder_view)
+
 # -----------------------
 # Reminders Cog
 # -----------------------
 class RemindersCog(commands.Cog):
     def __init__(self, bot):
         self.bot = bot
+        # Position of the last processed (region, hour) bucket; None until daily_loop first runs
+        self._bucket_cursor = None
+        self._ledger_purged_on = None
+        # Durable delivery for daily and sabbat reminders (started in cog_load)
+        self.outbox = OutboxWorker(bot)
 
         # Idempotent starts: prevents "Task already running" if started elsewhere
         try:
@@ -161,73 +351,99 @@ class RemindersCog(commands.Cog):
         except Exception:
             pass
 
-    async def send_daily_reminder(self, user_id, prefs):
-        try:
-            if not prefs.get("subscribed") or not prefs.get("daily"):
-                return
-
-            user = self.bot.get_user(user_id)
-            if not user:
-                try:
-                    user = await self.bot.fetch_user(user_id)
-                except Exception as e:
-                    await robust_log(self.bot, f"Failed to fetch user {user_id}", exc=e)
-                    return
-
-            region_data = REGIONS.get(prefs.get("region"))
-            if not region_data:
-                return
-
-            tz = ZoneInfo(region_data["tz"])
-            now = datetime.datetime.now(tz)
-
-            if now.strftime("%a") not in prefs.get("days", []):
-                return
-            if now.hour != prefs.get("hour"):
-                return
-
-            quote_list = await get_all_quotes()
-            prompt_list = await get_all_journal_prompts()
-            moon_emoji = moon_phase_emoji(now.date())
-
-            embed = discord.Embed(
-                title=f"{region_data['emoji']} Daily Reminder",
-                description=(
-                    f"Good morning, {user.name}! 🌞\n"
-                    f"Today is **{format_date(now.date())}** {moon_emoji}\n"
-                    f"Region: **{region_data['name']}** | Timezone: **{tz}**\n\n"
-                    f"💫 Quote: {random.choice(quote_list)}\n"
-                    f"📝 Journal Prompt: {random.choice(prompt_list)}"
-                ),
-                color=region_data.get("color", 0x2F3136)
-            )
+    async def cog_load(self):
+        # One-off ephem work / cache file read; keep it off the event loop
+        await asyncio.to_thread(sabbat_calendar.ensure_loaded)
+        await asyncio.to_thread(lunar_calendar.year, datetime.date.today().year)
+        self.outbox.start()
 
-            await safe_send(user, embed=embed, view=ReminderButtons(region_data))
-            await robust_log(self.bot, f"Sent daily reminder to {user.id}")
+    async def cog_unload(self):
+        await self.outbox.stop()
 
+    async def _bucket_corpus(self):
+        """Quote and prompt corpora, fetched once per bucket (defaults if the DB is unavailable)."""
+        try:
+            return await get_all_quotes(), await get_all_journal_prompts()
         except Exception as e:
-            await robust_log(self.bot, f"[ERROR] Sending daily reminder to {user_id}", exc=e)
-
-    @tasks.loop(minutes=1)
+            await robust_log(self.bot, "[ERROR] Loading quotes/prompts for daily reminders", exc=e)
+            return DEFAULT_QUOTES, DEFAULT_PROMPTS
+
+    async def send_due_reminders(self, bucket: ReminderBucket):
+        """
+        One indexed query for the (region, hour, weekday) bucket, then enqueue a reminder for every due user.
+        Raises if the query or the enqueue fails, so daily_loop retries the bucket.
+        """
+        users = await get_due_users(bucket.region, bucket.hour, bucket.weekday)
+        if not users or bucket.region not in REGIONS:
+            return
+
+        quotes, prompts = await self._bucket_corpus()
+        items = [
+            render_daily_reminder(
+                row[0], bucket.region, bucket.local_date, random.choice(quotes), random.choice(prompts)
+            )
+            for row in users
+        ]
+
+        queued = await enqueue_outbox(items, bot=self.bot, raise_errors=True)
+        self.outbox.notify()
+        skipped = len(items) - queued
+        REMINDERS_QUEUED.labels(kind="daily", result="queued").inc(queued)
+        REMINDERS_QUEUED.labels(kind="daily", result="duplicate").inc(skipped)
+        await robust_log(
+            self.bot,
+            f"🗓️ Queued {queued} daily reminder(s) for {bucket.region} {bucket.local_date} {bucket.hour:02d}:00"
+            + (f" ({skipped} already sent)" if skipped else "")
+        )
+
+    async def _initial_cursor(self):
+        """
+        Where daily_loop starts: just after the last bucket processed before the restart, but no more than
+        REMINDER_CATCHUP_HOURS ago (buckets in between are replayed). Without saved state, from now.
+        """
+        now = discord.utils.utcnow()
+        saved = load_cursor(await get_state(DAILY_CURSOR_STATE))
+        if saved is None or REMINDER_CATCHUP_HOURS <= 0:
+            return cursor_at(now)
+
+        cursor = max(saved, cursor_at(now - datetime.timedelta(hours=REMINDER_CATCHUP_HOURS)))
+        if cursor[0] < now:
+            await robust_log(self.bot, f"⏪ Catching up daily reminders due since {cursor[0]:%Y-%m-%d %H:%M} UTC")
+        return cursor
+
+    async def _purge_ledger(self, today: datetime.date):
+        if self._ledger_purged_on == today:
+            return
+        self._ledger_purged_on = today
+        await purge_sent_reminders(today - datetime.timedelta(days=LEDGER_RETENTION_DAYS))
+
+    @tasks.loop()
     async def daily_loop(self):
+        """
+        Sleeps until the next (region timezone, local hour) bucket is due, then processes exactly
+        that bucket. Buckets sharing an instant run back-to-back without sleeping, as do buckets
+        replayed after downtime.
+        """
         try:
-            users = await get_all_subscribed_users()
-            for row in users:
-                try:
-                    user_id, region, zodiac, hour, days, daily = row
-                    prefs = {
-                        "region": region,
-                        "zodiac": zodiac,
-                        "hour": hour,
-                        "days": days.split(",") if days else [],
-                        "subscribed": True,
-                        "daily": bool(daily)
-                    }
-                    await self.send_daily_reminder(user_id, prefs)
-                except Exception as e:
-                    await robust_log(self.bot, f"[ERROR] Failed sending reminder to user {row[0]}", exc=e)
+            if self._bucket_cursor is None:
+                self._bucket_cursor = await self._initial_cursor()
+
+            bucket = next_bucket(self._bucket_cursor)
+            await discord.utils.sleep_until(bucket.when)
+
+            with LOOP_SECONDS.labels(loop="daily").time():
+                await self.send_due_reminders(bucket)
+                # Advanced only once the bucket is queued: if it raised, the next iteration retries it
+                # (the ledger keeps a retry from queuing anyone twice)
+                self._bucket_cursor = bucket.key
+                # Persisted after enqueueing; a crash in between is covered by the ledger on replay
+                await set_state(DAILY_CURSOR_STATE, dump_cursor(bucket.key))
+                await self._purge_ledger(bucket.when.date())
         except Exception as e:
+            LOOP_ERRORS.labels(loop="daily").inc()
             await robust_log(self.bot, "[ERROR] Failed running daily loop", exc=e)
+            # The bucket is already due, so without a pause a persistent DB error would spin
+            await asyncio.sleep(DAILY_RETRY_SECONDS)
 
     @daily_loop.before_loop
     async def before_daily_loop(self):
@@ -237,61 +453,93 @@ class RemindersCog(commands.Cog):
     # -----------------------
     # Sabbat Loop
     # -----------------------
+    def render_sabbat_announcements(self, hemisphere: str, tz: str, local_date: datetime.date, user_ids):
+        """
+        Outbox items for the hemisphere's announcements due on local_date, sent to one recipient set:
+        a DM per user, ledgered per sabbat and delta.
+        """
+        items = []
+        for name, delta, msg in sabbat_announcements(hemisphere, tz, local_date):
+            ledger_kind = f"sabbat:{name}:{delta}"
+            for user_id in user_ids:
+                items.append(outbox_item(
+                    "user", user_id, "sabbat", content=msg,
+                    ledger=(user_id, ledger_kind, local_date.isoformat())
+                ))
+        return items
+
+    async def broadcast_sabbat_announcements(self):
+        """
+        Queue each due announcement for SABBAT_CHANNEL_ID exactly once. Runs whether or not anyone is
+        subscribed; the sabbat_announcements marker (committed with the enqueue) dedupes across regions
+        sharing a hemisphere, hourly reruns and restarts.
+        """
+        if not SABBAT_CHANNEL_ID:
+            return
+
+        # The channel is shared across regions, so announcements follow UTC dates
+        local_date = discord.utils.utcnow().date()
+        hemispheres = sorted({data.get("hemisphere", "north") for data in REGIONS.values()})
+        items = [
+            outbox_item(
+                "channel", SABBAT_CHANNEL_ID, "sabbat_channel", content=msg,
+                announcement=(hemisphere, name, delta, local_date.isoformat())
+            )
+            for hemisphere in hemispheres
+            for name, delta, msg in sabbat_announcements(hemisphere, "UTC", local_date)
+        ]
+        if items and await enqueue_outbox(items, bot=self.bot):
+            self.outbox.notify()
+
     @tasks.loop(minutes=60)
     async def sabbat_loop(self):
+        """
+        One grouped subscriber query, then per (hemisphere, timezone, local date) the announcements are computed
+        once and queued for everyone in that group. Local dates come from each region's timezone.
+        """
+        started = time.perf_counter()
         try:
-            users = await get_all_subscribed_users()
-            today = datetime.date.today()
-
-            for row in users:
-                try:
-                    user_id, region, zodiac, hour, days, daily = row
-                    region_data = REGIONS.get(region)
-                    if not region_data:
-                        continue
-
-                    hemisphere = region_data.get("hemisphere", "north")
-                    sabbats = get_sabbat_dates_for_hemisphere(hemisphere, today.year)
-                    delta_msgs = {7: "in 7 days", 1: "tomorrow", 0: "today!"}
-
-                    user = self.bot.get_user(user_id)
-                    if not user:
-                        try:
-                            user = await self.bot.fetch_user(user_id)
-                        except Exception:
-                            continue
-
-                    for name, date_val in sabbats.items():
-                        delta = (date_val - today).days
-                        if delta in delta_msgs:
-                            if delta == 7:
-                                msg = f"🪐 Upcoming Sabbat ({hemisphere.title()} Hemisphere): **{name}** {delta_msgs[delta]}"
-                            elif delta == 1:
-                                msg = f"🌿 **{name}** is tomorrow! ({hemisphere.title()} Hemisphere Sabbat)"
-                            else:
-                                msg = f"🔥 Happy **{name}**! Today is the Sabbat in the {hemisphere.title()} Hemisphere 🔥"
-
-                            await safe_send(user, msg)
-
-                            if SABBAT_CHANNEL_ID:
-                                try:
-                                    channel = self.bot.get_channel(SABBAT_CHANNEL_ID)
-                                    if channel is None:
-                                        channel = await self.bot.fetch_channel(SABBAT_CHANNEL_ID)
-                                    await safe_send(channel, msg)
-                                except Exception as e:
-                                    await robust_log(
-                                        self.bot,
-                                        f"[ERROR] Failed sabbat channel post (channel_id={SABBAT_CHANNEL_ID})",
-                                        exc=e
-                                    )
-
-                except Exception as e:
-                    await robust_log(self.bot, f"[ERROR] Sabbat reminder for user {row[0]}", exc=e)
+            by_region = await get_subscribed_ids_by_region()
+
+            groups = {}
+            for region, user_ids in by_region.items():
+                region_data = REGIONS.get(region)
+                if not region_data:
+                    continue
+                local_date = datetime.datetime.now(ZoneInfo(region_data["tz"])).date()
+                key = (region_data.get("hemisphere", "north"), region_data["tz"], local_date)
+                groups.setdefault(key, []).extend(user_ids)
+
+            items = []
+            for (hemisphere, tz, local_date), user_ids in groups.items():
+                items.extend(self.render_sabbat_announcements(hemisphere, tz, local_date, user_ids))
+
+            if items:
+                queued = await enqueue_outbox(items, bot=self.bot)
+                self.outbox.notify()
+                REMINDERS_QUEUED.labels(kind="sabbat", result="queued").inc(queued)
+                REMINDERS_QUEUED.labels(kind="sabbat", result="duplicate").inc(len(items) - queued)
+                if queued:
+                    dates = ", ".join(sorted({d.isoformat() for _, _, d in groups}))
+                    await robust_log(self.bot, f"🗓️ Queued {queued} sabbat message(s) for {dates}")
 
         except Exception as e:
+            LOOP_ERRORS.labels(loop="sabbat").inc()
             await robust_log(self.bot, "[ERROR] Sabbat loop failed", exc=e)
 
+        # Channel stage: independent of the DM fan-out (and of its failures)
+        try:
+            await self.broadcast_sabbat_announcements()
+        except Exception as e:
+            LOOP_ERRORS.labels(loop="sabbat").inc()
+            await robust_log(
+                self.bot,
+                f"[ERROR] Failed sabbat channel post (channel_id={SABBAT_CHANNEL_ID})",
+                exc=e
+            )
+
+        LOOP_SECONDS.labels(loop="sabbat").observe(time.perf_counter() - started)
+
     @sabbat_loop.before_loop
     async def before_sabbat_loop(self):
         await self.bot.wait_until_ready()
@@ -301,5 +549,7 @@ class RemindersCog(commands.Cog):
 # Setup
 # -----------------------
 async def setup(bot):
+    # Runs from bot.setup_hook (load_extension); one registration serves every reminder message ever sent
+    bot.add_dynamic_items(ReminderButton)
     await bot.add_cog(RemindersCog(bot))
     await robust_log(bot, f"✅ RemindersCog loaded | version {get_file_version('reminders.py')}")
@@ -0,0 +1,264 @@
+# GBPBot - sabbat_calendar.py
+# Version: 1.0.0
+# Last Updated: 2026-10-17
+# Notes:
+# - Astronomical sabbat dates: solstices, equinoxes and cross-quarters are the instants the Sun's apparent
+#   ecliptic longitude reaches SABBAT_LONGITUDES (constants.py), found with ephem.
+# - Southern hemisphere sabbats sit 180 degrees opposite (Yule at the June solstice, etc.).
+# - Instants are precomputed for a span of years and persisted to a small JSON cache file, so a restart
+#   doesn't redo the ephem searches; years outside the span are computed (and saved) on demand.
+# - Local dates are per timezone (a solstice at 02:00 UTC is still the previous day in New York).
+# - Lookups are O(1): per (hemisphere, tz) a date -> sabbat dict and a day-indexed "next sabbat" array.
+# -----------------------
+# CHANGE LOG
+# -----------------------
+# [2026-10-17] v1.0.0 - Initial creation: ephem longitude solver, JSON cache, SabbatCalendar lookups.
+
+import datetime
+import json
+import math
+import os
+import threading
+import traceback
+from array import array
+from typing import Dict, List, Optional, Tuple
+from zoneinfo import ZoneInfo
+
+import ephem
+
+from constants import SABBAT_LONGITUDES
+
+
+def _get_env(name: str):
+    v = os.getenv(name)
+    if v is None:
+        return None
+    v = v.strip()
+    return v if v else None
+
+
+def _get_int_env(name: str, default: int) -> int:
+    raw = _get_env(name)
+    if not raw:
+        return default
+    try:
+        return int(raw)
+    except ValueError:
+        return default
+
+
+# Years precomputed on load: from last year through SABBAT_CALENDAR_YEARS ahead
+SABBAT_CALENDAR_YEARS = max(1, _get_int_env("SABBAT_CALENDAR_YEARS", 10))
+SABBAT_CALENDAR_FILE = _get_env("SABBAT_CALENDAR_FILE") or "sabbat_calendar.json"
+
+# Bump when the solver changes so stale cache files are recomputed
+_CACHE_VERSION = 1
+_TROPICAL_YEAR = 365.2422
+UTC = datetime.timezone.utc
+
+
+# -----------------------
+# Solver
+# -----------------------
+def _solar_longitude(d: float) -> float:
+    """Apparent geocentric ecliptic longitude of the Sun (radians, equinox of date)."""
+    sun = ephem.Sun()
+    sun.compute(d, epoch=d)
+    return float(ephem.Ecliptic(ephem.Equatorial(sun.ra, sun.dec, epoch=d)).lon)
+
+
+def _longitude_instant(year: int, degrees: float) -> datetime.datetime:
+    """UTC instant in calendar year `year` at which the Sun reaches `degrees` of ecliptic longitude."""
+    target = math.radians(degrees)
+    equinox = float(ephem.next_vernal_equinox(str(year)))
+    # Longitudes past ~280 degrees fall in Jan/Feb, i.e. before that year's March equinox
+    offset = degrees if degrees < 280 else degrees - 360
+    guess = equinox + offset / 360.0 * _TROPICAL_YEAR
+
+    def error(d):
+        return (_solar_longitude(d) - target + math.pi) % (2 * math.pi) - math.pi
+
+    instant = ephem.newton(error, guess, guess + 0.5)
+    return ephem.Date(instant).datetime().replace(tzinfo=UTC)
+
+
+def _hemisphere_longitude(name: str, hemisphere: str) -> float:
+    lon = SABBAT_LONGITUDES[name]
+    return lon if hemisphere == "north" else (lon + 180) % 360
+
+
+# -----------------------
+# Calendar
+# -----------------------
+class SabbatCalendar:
+    """
+    Precomputed sabbat instants with O(1) date lookups.
+
+    Usage:
+        sabbat_calendar.next_sabbat("north", "Europe/London", today)  -> ("Samhain", date(...))
+        sabbat_calendar.announcements("south", "Australia/Sydney", today, (7, 1, 0))
+    """
+
+    def __init__(self, path: str = SABBAT_CALENDAR_FILE, years_ahead: int = SABBAT_CALENDAR_YEARS):
+        self.path = path
+        self.years_ahead = years_ahead
+        self._lock = threading.Lock()
+        # year -> {longitude degrees: unix timestamp}
+        self._instants: Dict[int, Dict[int, float]] = {}
+        # (hemisphere, tz) -> {local date: sabbat name}
+        self._by_date: Dict[Tuple[str, str], Dict[datetime.date, str]] = {}
+        # (hemisphere, tz) -> (first ordinal, array of event indices, events sorted by date)
+        self._next: Dict[Tuple[str, str], Tuple[int, array, List[Tuple[datetime.date, str]]]] = {}
+        self._loaded = False
+
+    # Loading / persistence
+    def ensure_loaded(self) -> None:
+        """Load the cache file and compute any missing years in the span (blocking; call once at startup)."""
+        if self._loaded:
+            return
+        with self._lock:
+            if self._loaded:
+                return
+            self._load_file()
+            this_year = datetime.date.today().year
+            self._ensure_years(range(this_year - 1, this_year + self.years_ahead + 1))
+            self._loaded = True
+
+    def _load_file(self) -> None:
+        try:
+            with open(self.path, "r", encoding="utf-8") as f:
+                data = json.load(f)
+            if data.get("version") != _CACHE_VERSION:
+                return
+            self._instants = {
+                int(year): {int(lon): float(ts) for lon, ts in lons.items()}
+                for year, lons in data.get("instants", {}).items()
+            }
+        except FileNotFoundError:
+            pass
+        except Exception as e:
+            # A corrupt cache is just recomputed
+            print(f"Sabbat calendar cache unreadable ({self.path}): {e}")
+
+    def _save_file(self) -> None:
+        data = {
+            "version": _CACHE_VERSION,
+            "instants": {
+                str(year): {str(lon): ts for lon, ts in sorted(lons.items())}
+                for year, lons in sorted(self._instants.items())
+            },
+        }
+        tmp = f"{self.path}.tmp"
+        try:
+            with open(tmp, "w", encoding="utf-8") as f:
+                json.dump(data, f, separators=(",", ":"))
+            os.replace(tmp, self.path)
+        except Exception as e:
+            print(f"Sabbat calendar cache not saved ({self.path}): {e}\n{traceback.format_exc()}")
+
+    def _ensure_years(self, years) -> None:
+        """Compute missing years (caller holds the lock); persists and resets indexes if anything changed."""
+        longitudes = sorted({_hemisphere_longitude(n, h) for n in SABBAT_LONGITUDES for h in ("north", "south")})
+        changed = False
+        for year in years:
+            lons = self._instants.setdefault(year, {})
+            for lon in longitudes:
+                if int(lon) not in lons:
+                    lons[int(lon)] = _longitude_instant(year, lon).timestamp()
+                    changed = True
+        if changed:
+            self._save_file()
+            self._by_date.clear()
+            self._next.clear()
+
+    def _years_span(self) -> Tuple[int, int]:
+        return min(self._instants), max(self._instants)
+
+    def _extend_to(self, year: int) -> None:
+        with self._lock:
+            first, last = self._years_span()
+            if first <= year <= last:
+                return
+            self._ensure_years(range(min(first, year), max(last, year) + 1))
+
+    # Lookups
+    def instant(self, name: str, hemisphere: str, year: int) -> datetime.datetime:
+        """UTC instant of a sabbat in calendar year `year`."""
+        self.ensure_loaded()
+        if year not in self._instants:
+            self._extend_to(year)
+        lon = int(_hemisphere_longitude(name, hemisphere))
+        return datetime.datetime.fromtimestamp(self._instants[year][lon], UTC)
+
+    def dates(self, hemisphere: str, tz: str, year: int) -> Dict[str, datetime.date]:
+        """{sabbat name: local date in tz} for a calendar year."""
+        zone = ZoneInfo(tz)
+        return {
+            name: self.instant(name, hemisphere, year).astimezone(zone).date()
+            for name in SABBAT_LONGITUDES
+        }
+
+    def _events(self, hemisphere: str, tz: str) -> List[Tuple[datetime.date, str]]:
+        first, last = self._years_span()
+        return sorted(
+            (date_val, name)
+            for year in range(first, last + 1)
+            for name, date_val in self.dates(hemisphere, tz, year).items()
+        )
+
+    def on_date(self, hemisphere: str, tz: str, local_date: datetime.date) -> Optional[str]:
+        """Name of the sabbat falling on local_date in tz, if any."""
+        self.ensure_loaded()
+        key = (hemisphere, tz)
+        table = self._by_date.get(key)
+        if table is None:
+            table = self._by_date[key] = {date_val: name for date_val, name in self._events(hemisphere, tz)}
+        first, last = self._years_span()
+        if not first <= local_date.year <= last:
+            self._extend_to(local_date.year)
+            return self.on_date(hemisphere, tz, local_date)
+        return table.get(local_date)
+
+    def next_sabbat(self, hemisphere: str, tz: str, local_date: datetime.date) -> Tuple[str, datetime.date]:
+        """The first sabbat on or after local_date in tz."""
+        self.ensure_loaded()
+        key = (hemisphere, tz)
+        index = self._next.get(key)
+        if index is None:
+            events = self._events(hemisphere, tz)
+            start = datetime.date(self._years_span()[0], 1, 1).toordinal()
+            # slots[day] = index of the first event on or after that day
+            slots = array("H")
+            i = 0
+            for ordinal in range(start, events[-1][0].toordinal() + 1):
+                while events[i][0].toordinal() < ordinal:
+                    i += 1
+                slots.append(i)
+            index = self._next[key] = (start, slots, events)
+
+        start, slots, events = index
+        offset = local_date.toordinal() - start
+        if not 0 <= offset < len(slots):
+            self._extend_to(local_date.year + (1 if offset >= 0 else 0))
+            return self.next_sabbat(hemisphere, tz, local_date)
+        date_val, name = events[slots[offset]]
+        return name, date_val
+
+    def announcements(
+        self,
+        hemisphere: str,
+        tz: str,
+        local_date: datetime.date,
+        deltas=(7, 1, 0)
+    ) -> List[Tuple[str, int, datetime.date]]:
+        """(name, days before, sabbat date) for each sabbat exactly `delta` days after local_date."""
+        found = []
+        for delta in deltas:
+            date_val = local_date + datetime.timedelta(days=delta)
+            name = self.on_date(hemisphere, tz, date_val)
+            if name is not None:
+                found.append((name, delta, date_val))
+        return found
+
+
+sabbat_calendar = SabbatCalendar()
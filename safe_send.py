@@ -1,33 +1,213 @@
 # GBPBot - safe_send.py
-# Version: 1.9.1.0
-# Last Updated: 2026-01-18
+# Version: 1.10.4.0
+# Last Updated: 2026-10-17
 # Notes:
 # - Flat-structure refactor of utils/safe_send.py -> safe_send.py
 # - Uses logger.robust_log (flat import)
 # - Handles already-responded interactions safely (response -> followup fallback)
 # - Allows optional bot= for reliable log channel posting
+# - Returns True when the message was delivered, False otherwise (still never raises)
+# - send_outcome() returns the outcome itself, so retrying callers (outbox) can tell permanent failures from transient ones
+# - Proactive pacing: process-wide token buckets for DMs, channel posts and interaction followups
+#   (initial interaction responses are never paced or rejected: an unanswered interaction fails for the user)
 # -----------------------
 # CHANGE LOG
 # -----------------------
+# [2026-10-17] v1.10.4.0 - Initial interaction responses bypass the rate limiter (exempt from Discord's global limit,
+#                       and a rejection left the interaction unacknowledged); the interaction bucket paces followups only.
+# [2026-10-17] v1.10.3.0 - Failures are classified: "forbidden" (DMs closed / missing permissions) and "not_found"
+#                       (deleted channel or user) vs "failed" (transient). Added send_outcome() and PERMANENT_OUTCOMES.
+# [2026-10-17] v1.10.2.0 - Metrics: gbpbot_sends_total{bucket,outcome} (sent/failed/rejected), token wait histogram per bucket,
+#                       interaction response latency. Delivery logic moved to _send() (returns the outcome).
+# [2026-10-17] v1.10.1.0 - Expected failures (Forbidden: DMs closed / missing permissions) log at WARNING, without a traceback.
+# [2026-10-17] v1.10.0.0 - Added TokenBucket rate limiting (dm/channel/interaction buckets) in front of every send.
+#                       - SAFE_SEND_<DM|CHANNEL|INTERACTION>_<RATE|BURST|MAX_WAIT> env overrides.
+#                       - Sends that would queue longer than MAX_WAIT are rejected (counted, returns False).
+#                       - Added get_rate_limit_stats() (queueing delay and rejected counts per bucket).
+# [2026-10-17] v1.9.2.0 - safe_send now returns True/False so callers (fan-out stats) can count outcomes.
 # [2026-01-18] v1.9.1.0 - Flat-structure import changes + fixed robust_log call signature.
 #                      - Added optional bot= passthrough and interaction.client fallback.
 # [2025-09-21] v1.9.0.0 - Robust safe_send fully integrated across all cogs; fixed is_finished errors.
 
+import asyncio
+import logging
+import os
+import time
 import traceback
 import discord
 from discord import Interaction
 
 from logger import robust_log
+from metrics import REGISTRY
 
 
-async def safe_send(
+def _get_env(name: str):
+    v = os.getenv(name)
+    if v is None:
+        return None
+    v = v.strip()
+    return v if v else None
+
+
+def _get_float_env(name: str, default: float) -> float:
+    raw = _get_env(name)
+    if not raw:
+        return default
+    try:
+        return float(raw)
+    except ValueError:
+        return default
+
+
+# -----------------------
+# Metrics
+# -----------------------
+_SENDS = REGISTRY.counter("gbpbot_sends_total", "safe_send results by rate-limit bucket", ["bucket", "outcome"])
+_QUEUE_DELAY = REGISTRY.histogram(
+    "gbpbot_send_queue_delay_seconds", "Time sends waited for a rate-limit token", ["bucket"]
+)
+_INTERACTION_RESPONSE = REGISTRY.histogram(
+    "gbpbot_interaction_response_seconds", "Seconds from interaction creation to safe_send's initial response"
+)
+
+
+# -----------------------
+# Rate Limiting
+# -----------------------
+class TokenBucket:
+    """
+    Process-wide token bucket (event loop thread only).
+
+    - rate tokens/second refill up to `burst`.
+    - When empty, a caller reserves the next token (tokens go negative) and sleeps until it is due,
+      so waiters are served in arrival order.
+    - If the wait would exceed max_wait seconds the send is rejected instead of queued.
+    """
+
+    def __init__(self, name: str, rate: float, burst: float, max_wait: float):
+        self.name = name
+        self.rate = rate
+        self.burst = max(1.0, burst)
+        self.max_wait = max_wait
+        self.tokens = self.burst
+        self._last = time.monotonic()
+        self._delay_metric = _QUEUE_DELAY.labels(bucket=name)
+        self.acquired = 0
+        self.queued = 0
+        self.rejected = 0
+        self.total_delay = 0.0
+        self.max_delay = 0.0
+
+    def _refill(self) -> None:
+        now = time.monotonic()
+        self.tokens = min(self.burst, self.tokens + (now - self._last) * self.rate)
+        self._last = now
+
+    async def acquire(self) -> bool:
+        """Wait for a token. Returns False (rejected) if the queueing delay would exceed max_wait."""
+        if self.rate <= 0:
+            self.acquired += 1
+            return True
+
+        self._refill()
+        if self.tokens >= 1:
+            self.tokens -= 1
+            self.acquired += 1
+            self._delay_metric.observe(0.0)
+            return True
+
+        delay = (1 - self.tokens) / self.rate
+        if delay > self.max_wait:
+            self.rejected += 1
+            return False
+
+        self.tokens -= 1
+        self.queued += 1
+        self.total_delay += delay
+        self.max_delay = max(self.max_delay, delay)
+        await asyncio.sleep(delay)
+        self.acquired += 1
+        self._delay_metric.observe(delay)
+        return True
+
+    def stats(self) -> dict:
+        return {
+            "rate": self.rate,
+            "burst": self.burst,
+            "tokens": round(self.tokens, 2),
+            "acquired": self.acquired,
+            "queued": self.queued,
+            "rejected": self.rejected,
+            "avg_queue_delay": (self.total_delay / self.queued) if self.queued else 0.0,
+            "max_queue_delay": self.max_delay,
+        }
+
+
+def _bucket_from_env(kind: str, rate: float, burst: float, max_wait: float) -> TokenBucket:
+    prefix = f"SAFE_SEND_{kind.upper()}_"
+    return TokenBucket(
+        kind,
+        rate=_get_float_env(prefix + "RATE", rate),
+        burst=_get_float_env(prefix + "BURST", burst),
+        max_wait=_get_float_env(prefix + "MAX_WAIT", max_wait),
+    )
+
+
+# Separate budgets so a DM fan-out can't starve interaction followups. Initial interaction responses
+# skip the buckets entirely: callbacks don't count toward Discord's global limit and must answer within 3s.
+# Defaults keep the sum under Discord's 50 req/s global limit. RATE=0 disables a bucket.
+RATE_LIMITS = {
+    "dm": _bucket_from_env("dm", rate=25, burst=25, max_wait=30),
+    "channel": _bucket_from_env("channel", rate=5, burst=5, max_wait=30),
+    "interaction": _bucket_from_env("interaction", rate=15, burst=15, max_wait=2),
+}
+
+
+def _bucket_for(target) -> TokenBucket:
+    if isinstance(target, Interaction):
+        return RATE_LIMITS["interaction"]
+    if isinstance(target, (discord.abc.User, discord.DMChannel)):
+        return RATE_LIMITS["dm"]
+    if getattr(target, "type", None) == discord.ChannelType.private:
+        # PartialMessageable for a DM channel
+        return RATE_LIMITS["dm"]
+    return RATE_LIMITS["channel"]
+
+
+def get_rate_limit_stats() -> dict:
+    """Per-bucket counters: acquired, queued, rejected, average/max queueing delay (seconds)."""
+    return {kind: bucket.stats() for kind, bucket in RATE_LIMITS.items()}
+
+
+async def _acquire(target, bot) -> bool:
+    bucket = _bucket_for(target)
+    if await bucket.acquire():
+        return True
+    # Console only: posting to the log channel would spend the budget we just ran out of
+    await robust_log(None, f"[safe_send] Rejected {bucket.name} send (queue delay over {bucket.max_wait}s)")
+    return False
+
+
+# Failures a retry can't fix: DMs closed / missing permissions, deleted channel or user
+PERMANENT_OUTCOMES = frozenset({"forbidden", "not_found"})
+
+
+def _failure_outcome(e: Exception) -> str:
+    if isinstance(e, discord.Forbidden):
+        return "forbidden"
+    if isinstance(e, discord.NotFound):
+        return "not_found"
+    return "failed"
+
+
+async def _send(
     target,
     content=None,
     embed=None,
     view=None,
     ephemeral: bool = False,
     bot=None
-):
+) -> str:
     """
     Safely send a message to a user/channel or interaction.
 
@@ -43,6 +223,10 @@ async def safe_send(
         view: discord.ui.View
         ephemeral: only applies to interactions
         bot: optional commands.Bot/client for robust_log channel posting
+
+    Returns:
+        "sent", "rejected" (rate-limit queue too long), "forbidden", "not_found" or "failed" (any other error).
+        Errors are logged, never raised.
     """
     try:
         # Interaction handling
@@ -52,45 +236,91 @@ async def safe_send(
                 bot = getattr(target, "client", None)
 
             try:
+                # Not paced: rejecting here would leave the interaction unacknowledged ("This interaction failed")
                 await target.response.send_message(
                     content=content,
                     embed=embed,
                     view=view,
                     ephemeral=ephemeral
                 )
-                return
+                _INTERACTION_RESPONSE.observe(
+                    (discord.utils.utcnow() - target.created_at).total_seconds()
+                )
+                return "sent"
             except Exception:
                 # If already responded or response failed, try followup
                 try:
+                    if not await _acquire(target, bot):
+                        return "rejected"
                     await target.followup.send(
                         content=content,
                         embed=embed,
                         view=view,
                         ephemeral=ephemeral
                     )
-                    return
+                    return "sent"
                 except Exception as e2:
                     await robust_log(
                         bot,
                         "[safe_send] followup.send failed",
                         exc=e2
                     )
-                    return
+                    return _failure_outcome(e2)
 
         # Non-interaction: DM/channel/etc
         if hasattr(target, "send"):
+            if not await _acquire(target, bot):
+                return "rejected"
             await target.send(content=content, embed=embed, view=view)
-            return
+            return "sent"
 
         # Unknown target
         await robust_log(
             bot,
             f"[safe_send] Target has no send() method: {target!r}"
         )
+        return "failed"
 
     except Exception as e:
         await robust_log(
             bot,
             f"[safe_send] Failed send: {e}",
-            exc=e
+            exc=e,
+            # Closed DMs / missing permissions are routine; no traceback for those
+            level=logging.WARNING if isinstance(e, discord.Forbidden) else None
         )
+        return _failure_outcome(e)
+
+
+async def send_outcome(
+    target,
+    content=None,
+    embed=None,
+    view=None,
+    ephemeral: bool = False,
+    bot=None
+) -> str:
+    """
+    Like safe_send, but returns the outcome string from _send ("sent", "rejected", "forbidden",
+    "not_found" or "failed"). Outcomes in PERMANENT_OUTCOMES won't succeed if retried.
+    """
+    outcome = await _send(target, content=content, embed=embed, view=view, ephemeral=ephemeral, bot=bot)
+    _SENDS.labels(bucket=_bucket_for(target).name, outcome=outcome).inc()
+    return outcome
+
+
+async def safe_send(
+    target,
+    content=None,
+    embed=None,
+    view=None,
+    ephemeral: bool = False,
+    bot=None
+) -> bool:
+    """
+    Safely send a message to a user/channel or interaction (see _send).
+
+    Returns:
+        True if the message was sent, False otherwise (errors are logged, never raised).
+    """
+    return await send_outcome(target, content=content, embed=embed, view=view, ephemeral=ephemeral, bot=bot) == "sent"
@@ -0,0 +1,101 @@
+# GBPBot - scheduler.py
+# Version: 1.1.1
+# Last Updated: 2026-10-17
+# Notes:
+# - Pure (Discord-free) scheduling helpers for the daily reminder loop.
+# - A "bucket" is one (region timezone, local wall-clock hour) pair; reminders fire when it becomes due.
+# - DST-aware: skipped hours (spring forward) fire at the first instant after the gap,
+#   repeated hours (fall back) fire once, at their first occurrence.
+# -----------------------
+# CHANGE LOG
+# -----------------------
+# [2026-10-17] v1.1.1 - Fixed skipped (spring-forward) hours being lost for every region but the first to reach that
+#                      instant: candidates are scanned from one wall hour before the cursor.
+# [2026-10-17] v1.1.0 - Added dump_cursor()/load_cursor() so the daily loop can persist its position across restarts.
+# [2026-10-17] v1.0.0 - Initial creation: next_bucket() computes the next due (region, hour) bucket.
+
+import datetime
+from typing import NamedTuple, Optional, Tuple
+from zoneinfo import ZoneInfo
+
+from constants import REGIONS
+
+UTC = datetime.timezone.utc
+
+# Region order fixes tie-breaking when several buckets are due at the same instant
+_REGION_ORDER = tuple(REGIONS)
+_REGION_TZ = {name: ZoneInfo(data["tz"]) for name, data in REGIONS.items()}
+
+# How many local wall-clock hours ahead to scan per region (covers a 1h DST gap with room to spare)
+_SCAN_HOURS = 3
+
+# Buckets are ordered by (utc instant, region index, local hour)
+BucketKey = Tuple[datetime.datetime, int, int]
+
+
+class ReminderBucket(NamedTuple):
+    when: datetime.datetime      # UTC instant at which the bucket is due
+    region: str                  # REGIONS key
+    local_date: datetime.date    # local calendar date of the bucket
+    hour: int                    # local wall-clock hour (matches users.reminder_hour)
+
+    @property
+    def weekday(self) -> int:
+        """0=Mon ... 6=Sun (matches db.DAY_NAMES / reminder_days_mask bits)."""
+        return self.local_date.weekday()
+
+    @property
+    def key(self) -> BucketKey:
+        return (self.when, _REGION_ORDER.index(self.region), self.hour)
+
+    def local_time(self) -> datetime.datetime:
+        """The bucket instant in the region's timezone."""
+        return self.when.astimezone(_REGION_TZ[self.region])
+
+
+def cursor_at(when: datetime.datetime) -> BucketKey:
+    """A cursor positioned just before any bucket due at `when` (so those are still returned)."""
+    return (when.astimezone(UTC), -1, -1)
+
+
+def dump_cursor(cursor: BucketKey) -> str:
+    """Serialize a cursor for db.set_state()."""
+    when, region_idx, hour = cursor
+    return f"{when.astimezone(UTC).isoformat()}|{region_idx}|{hour}"
+
+
+def load_cursor(raw: Optional[str]) -> Optional[BucketKey]:
+    """Inverse of dump_cursor(); None if missing or unparseable."""
+    try:
+        when, region_idx, hour = raw.split("|")
+        return (datetime.datetime.fromisoformat(when).astimezone(UTC), int(region_idx), int(hour))
+    except (AttributeError, ValueError):
+        return None
+
+
+def _region_candidates(region: str, after: datetime.datetime):
+    tz = _REGION_TZ[region]
+    # Start one wall hour early: a skipped hour shares its UTC instant with the hour after the gap, so once
+    # the cursor sits on that instant the skipped hour is behind `after` in wall-clock terms
+    base = (after - datetime.timedelta(hours=1)).astimezone(tz).replace(minute=0, second=0, microsecond=0, tzinfo=None)
+    for k in range(_SCAN_HOURS + 2):
+        wall = base + datetime.timedelta(hours=k)
+        # fold=0: first occurrence of a repeated hour; a skipped hour maps to the end of the gap
+        when = wall.replace(tzinfo=tz, fold=0).astimezone(UTC)
+        yield ReminderBucket(when, region, wall.date(), wall.hour)
+
+
+def next_bucket(cursor: BucketKey) -> ReminderBucket:
+    """
+    The earliest bucket strictly after `cursor` across all REGIONS.
+
+    Several buckets can share an instant (e.g. every whole-hour region at hh:00 UTC);
+    they are returned one per call, so each firing processes exactly one bucket.
+    """
+    best: Optional[ReminderBucket] = None
+    for region in _REGION_ORDER:
+        # Candidates come out in key order, so the first one strictly past the cursor is the region's next bucket
+        bucket = next(b for b in _region_candidates(region, cursor[0]) if b.key > cursor)
+        if best is None or bucket.key < best.key:
+            best = bucket
+    return best
@@ -0,0 +1,75 @@
+# GBPBot - test_scheduler.py
+# Version: 1.0.0
+# Last Updated: 2026-10-17
+# Notes:
+# - Regression tests for scheduler.next_bucket across DST transitions (no Discord connection or DB needed).
+# - Run: python -m pytest -q test_scheduler.py
+# -----------------------
+# CHANGE LOG
+# -----------------------
+# [2026-10-17] v1.0.0 - Initial creation: every (region, local date, hour) fires exactly once across each
+#                      region's spring-forward and fall-back days.
+
+import collections
+import datetime
+
+import pytest
+
+import scheduler
+from constants import REGIONS
+
+UTC = datetime.timezone.utc
+YEAR = 2026
+
+
+def _transition_days(tz) -> list:
+    """Local dates in YEAR on which the zone's UTC offset changes (empty for zones without DST)."""
+    days = []
+    day = datetime.date(YEAR, 1, 1)
+    while day.year == YEAR:
+        start = datetime.datetime.combine(day, datetime.time(), tz)
+        end = datetime.datetime.combine(day + datetime.timedelta(days=1), datetime.time(), tz)
+        if start.utcoffset() != end.utcoffset():
+            days.append(day)
+        day += datetime.timedelta(days=1)
+    return days
+
+
+def _walk(start: datetime.datetime, end: datetime.datetime) -> list:
+    """Every bucket next_bucket() yields from `start` until the first one due at or after `end`."""
+    buckets = []
+    cursor = scheduler.cursor_at(start)
+    while True:
+        bucket = scheduler.next_bucket(cursor)
+        if bucket.when >= end:
+            return buckets
+        buckets.append(bucket)
+        cursor = bucket.key
+
+
+TRANSITIONS = [
+    (region, day)
+    for region in REGIONS
+    for day in _transition_days(scheduler._REGION_TZ[region])
+]
+
+
+def test_transitions_found():
+    # Guards against the parametrized test silently running on nothing
+    assert len({day for _, day in TRANSITIONS}) >= 4
+
+
+@pytest.mark.parametrize("region,day", TRANSITIONS, ids=[f"{r}-{d}" for r, d in TRANSITIONS])
+def test_every_hour_fires_once_across_transition(region, day):
+    # Two days either side, so every region's local dates around the transition are fully covered
+    start = datetime.datetime.combine(day - datetime.timedelta(days=2), datetime.time(), UTC)
+    buckets = _walk(start, start + datetime.timedelta(days=5))
+
+    keys = [b.key for b in buckets]
+    assert keys == sorted(keys) and len(set(keys)) == len(keys)
+
+    fired = collections.Counter((b.region, b.local_date, b.hour) for b in buckets)
+    for name in REGIONS:
+        for local_date in (day - datetime.timedelta(days=1), day, day + datetime.timedelta(days=1)):
+            for hour in range(24):
+                assert fired[(name, local_date, hour)] == 1, (name, local_date, hour)
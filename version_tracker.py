@@ -1,6 +1,6 @@
 # GBPBot - version_tracker.py
-# Version: 1.0.9
-# Last Updated: 2026-01-18
+# Version: 1.0.49
+# Last Updated: 2026-10-17
 # Notes:
 # - Centralized file version tracking for GBPBot.
 # - Backward-compatible aliases included (VERSIONS, file_versions).
@@ -8,6 +8,86 @@
 # -----------------------
 # CHANGE LOG
 # -----------------------
+# [2026-10-17] v1.0.49
+# - Updated tracked versions for commands.py (1.9.8.1): /profiler lint fix
+# [2026-10-17] v1.0.48
+# - Updated tracked versions for the render benchmark's delivery-side timing: benchmarks.py
+# [2026-10-17] v1.0.47
+# - Updated tracked versions for ledger release on dead-lettered rows: db.py, outbox.py
+# [2026-10-17] v1.0.46
+# - Updated tracked versions for retried outbox outcome writes: outbox.py
+# [2026-10-17] v1.0.45
+# - Updated tracked versions for unpaced interaction responses: safe_send.py
+# [2026-10-17] v1.0.44
+# - Updated tracked versions for outbox batch completion latency: db.py, outbox.py, fanout.py
+# [2026-10-17] v1.0.43
+# - Updated tracked versions for scheduler.py (1.1.1) and added test_scheduler.py (1.0.0): spring-forward hours fire in every region
+# [2026-10-17] v1.0.42
+# - Updated tracked versions for daily bucket retry: db.py, reminders.py
+# [2026-10-17] v1.0.41
+# - Updated tracked versions for cumulative metrics as counters: db.py, outbox.py, recipients.py
+# [2026-10-17] v1.0.40
+# - Updated tracked versions for DB metric labels: db.py
+# [2026-10-17] v1.0.39
+# - Updated tracked versions for removing the fixed-date sabbat helpers: constants.py, reminders.py
+# [2026-10-17] v1.0.38
+# - Updated tracked versions for outbox fan-out stats: fanout.py, outbox.py
+# [2026-10-17] v1.0.37
+# - Updated tracked versions for outbox retry window: outbox.py
+# [2026-10-17] v1.0.36
+# - Updated tracked versions for DM id invalidation: outbox.py, recipients.py
+# [2026-10-17] v1.0.35
+# - Updated tracked versions for permanent send failures: safe_send.py, outbox.py
+# [2026-10-17] v1.0.34
+# - Updated tracked versions for the profiler: commands.py 1.9.8.0, profiler.py 1.0.0 (new).
+# [2026-10-17] v1.0.33
+# - Updated tracked versions for metrics: metrics.py 1.0.0 (new), db.py 1.2.6.0, safe_send.py 1.10.2.0, reminders.py 1.22.0, outbox.py 1.0.5, bot.py 1.9.7.0.
+# [2026-10-17] v1.0.32
+# - Updated tracked versions for structured logging: logger.py 1.3.0, safe_send.py 1.10.1.0.
+# [2026-10-17] v1.0.31
+# - Updated tracked versions for buffered log shipping: logger.py 1.2.0.
+# [2026-10-17] v1.0.30
+# - Updated tracked versions for the DM channel cache: db.py 1.2.5.0, outbox.py 1.0.4, recipients.py 1.0.0 (new).
+# [2026-10-17] v1.0.29
+# - Updated tracked versions for reminders.py (1.21.0) and commands.py (1.9.7.0): persistent reminder buttons.
+# [2026-10-17] v1.0.28
+# - Updated tracked versions for reminders.py (1.20.0), outbox.py (1.0.3), benchmarks.py (1.1.0): shared per-bucket reminder rendering.
+# [2026-10-17] v1.0.27
+# - Updated tracked version for reminders.py (1.19.0) and added lunar.py (1.0.0): precomputed lunar calendar.
+# [2026-10-17] v1.0.26
+# - Updated tracked versions for reminders.py (1.18.0), constants.py (1.0.3) and added sabbat_calendar.py (1.0.0): astronomical sabbat calendar.
+# [2026-10-17] v1.0.25
+# - Updated tracked versions for db.py (1.2.4.0), reminders.py (1.17.0), outbox.py (1.0.2): one sabbat channel post per announcement.
+# [2026-10-17] v1.0.24
+# - Updated tracked versions for db.py (1.2.3.0) and reminders.py (1.16.0): grouped per-hemisphere sabbat loop.
+# [2026-10-17] v1.0.23
+# - Updated tracked versions for db.py (1.2.2.0), reminders.py (1.15.0), outbox.py (1.0.1), scheduler.py (1.1.0): sent-reminder ledger + downtime catch-up.
+# [2026-10-17] v1.0.22
+# - Updated tracked versions for db.py (1.2.1.0) and reminders.py (1.14.0) and added outbox.py (1.0.0): durable reminder outbox.
+# [2026-10-17] v1.0.21
+# - safe_send.py 1.10.0.0 (token-bucket rate limiting), fanout.py 1.1.0 (global pacer removed)
+# [2026-10-17] v1.0.20
+# - Updated tracked version for reminders.py (1.13.0) and added fanout.py (1.0.0): concurrent DM fan-out.
+# [2026-10-17] v1.0.19
+# - Updated tracked version for reminders.py (1.12.0) and added scheduler.py (1.0.0): bucketed reminder scheduler.
+# [2026-10-17] v1.0.18
+# - Updated tracked version for db.py (1.2.0.0): PRAGMA user_version migration engine.
+# [2026-10-17] v1.0.17
+# - Updated tracked versions for db.py (1.1.7.0) and commands.py (1.9.6.0): bulk preference lookup.
+# [2026-10-17] v1.0.16
+# - Updated tracked version for db.py (1.1.6.0): atomic UPSERT for preferences + bulk variant.
+# [2026-10-17] v1.0.15
+# - Updated tracked versions for db.py (1.1.5.0), reminders.py (1.11.2), commands.py (1.9.5.0): cached quote/prompt corpus.
+# [2026-10-17] v1.0.14
+# - Updated tracked version for db.py (1.1.4.0): write-through preference cache.
+# [2026-10-17] v1.0.13
+# - Updated tracked versions for db.py (1.1.3.0) and reminders.py (1.11.1): reminder_days bitmask.
+# [2026-10-17] v1.0.12
+# - Updated tracked versions for db.py (1.1.2.0) and reminders.py (1.11.0): indexed due-users query.
+# [2026-10-17] v1.0.11
+# - Updated tracked version for db.py (1.1.1.0): DB work moved to a dedicated executor.
+# [2026-10-17] v1.0.10
+# - Updated tracked versions for db.py (1.1.0.0) and bot.py (1.9.6.0) for the pooled connection layer.
 # [2026-01-18] v1.0.9
 # - Updated tracked versions for db.py (1.0.5.0) and commands.py (1.9.4.0) for /profile edit buttons + set_daily helper.
 # [2026-01-18] v1.0.8
@@ -24,13 +104,25 @@ GBPBot_version = "1.10.1"
 
 # Core files expected in the flat (single-directory) Discloud layout
 FILE_VERSIONS = {
-    "bot.py": "1.9.5.1",
-    "db.py": "1.0.5.0",
+    "bot.py": "1.9.7.0",
+    "db.py": "1.2.7.0",
     "onboarding.py": "1.9.2.1",
-    "reminders.py": "1.10.1",
-    "commands.py": "1.9.4.0",
-    "logger.py": "1.1.0",
-    "version_tracker.py": "1.0.9",
+    "reminders.py": "1.22.2",
+    "commands.py": "1.9.8.1",
+    "logger.py": "1.3.0",
+    "scheduler.py": "1.1.1",
+    "fanout.py": "1.1.2",
+    "safe_send.py": "1.10.4.0",
+    "outbox.py": "1.0.13",
+    "constants.py": "1.0.4",
+    "sabbat_calendar.py": "1.0.0",
+    "lunar.py": "1.0.0",
+    "benchmarks.py": "1.1.1",
+    "recipients.py": "1.0.2",
+    "metrics.py": "1.0.0",
+    "profiler.py": "1.0.0",
+    "test_scheduler.py": "1.0.0",
+    "version_tracker.py": "1.0.49",
 }
 
 # Aliases for backward compatibility (older code may import these names)